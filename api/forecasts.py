@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Dict, Any, Union
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, date
-import pandas as pd
+import json
+import time
+from itertools import chain
 
 import models
-from database import get_db
+from config import get_settings
+from database import get_db, get_read_db
 from schemas.forecasts import (
     ForecastRequest,
     ForecastResponse,
@@ -13,21 +17,57 @@ from schemas.forecasts import (
     ForecastCreateResponse,
     ForecastProjectInfo,
     ForecastProjectDetail,
-    AlphaCompareRequest
+    AlphaCompareRequest,
+    BacktestRequest
 )
-from repositories.forecast_repository import ForecastRepository
+from repositories.base import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from repositories.forecast_repository import ForecastRepository, StoredResultDeleted
 from repositories.sale_repository import SaleRepository
 from api.auth import get_current_user_or_session, get_admin_user_or_session
+from services.timing import span
+from services.metrics import forecast_product_count, observe_kernel, record_cache
+from services.backtest_service import backtest
+from services.chart_service import DEFAULT_MAX_POINTS, chart_series
+from services.streaming_service import stream_forecasts
 from services.forecast_service import (
+    COMPARE_FIELDS,
     calculate_ses_with_steps,
     compare_alphas,
-    generate_future_forecasts
+    forecast_input_hash,
+    generate_future_forecasts,
+    partition_series
 )
 
+settings = get_settings()
+
 FUTURE_FORECAST_PERIODS = 3
 
 COMPARE_ALPHAS = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
 
+# Per-product keys a forecast result can carry, in response order
+RESULT_FIELDS = (
+    "dates", "actuals", "forecasts", "steps", "mape",
+    "next_period_forecast", "next_period_date", "future_forecasts"
+)
+
+# Result keys that live in the calculation_steps JSON column rather than scalar columns
+SERIES_FIELDS = ("dates", "actuals", "forecasts", "steps", "future_forecasts")
+
+# Per-product keys of a constant-memory stream: no per-period series, only running state
+CONSTANT_MEMORY_FIELDS = (
+    "periods", "start_date", "end_date", "mape", "metrics",
+    "next_period_forecast", "next_period_date", "future_forecasts"
+)
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated result keys to return, e.g. 'mape,next_period_forecast' (default: all)"
+)
+COMPACT_QUERY = Query(
+    False,
+    description="Return results column-wise: one list per field instead of one dict per row"
+)
+
 router = APIRouter()
 
 
@@ -49,170 +89,437 @@ def date_to_iso(d: Union[date, str, None]) -> Union[str, None]:
     return d
 
 
-@router.post("")
-async def create_forecast(
-    request: ForecastRequest,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_admin_user_or_session)
-):
-    """Create a forecast using Single Exponential Smoothing (admin only)."""
-    sale_repo = SaleRepository(db)
-    forecast_repo = ForecastRepository(db)
-
-    # Get sales data
-    sales_query = sale_repo.get_all_ordered()
+def parse_fields(fields: Optional[str], allowed: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Parse a comma-separated `fields` query value into a subset of `allowed` (in canonical order)."""
+    if not fields:
+        return allowed
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    return tuple(f for f in allowed if f in requested)
+
+
+def to_columnar(rows: Dict[str, Dict[str, Any]], key_name: str, fields: Tuple[str, ...]) -> Dict[str, list]:
+    """Pivot {key: {field: value}} into {key_name: [keys...], field: [values...]}."""
+    columns: Dict[str, list] = {key_name: list(rows)}
+    for field in fields:
+        columns[field] = [row.get(field) for row in rows.values()]
+    return columns
+
+
+def forecast_result(forecast: models.Forecast, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Build the per-product result dict for a stored forecast, touching calculation_steps only if needed."""
+    steps = (forecast.steps_data or {}) if any(f in SERIES_FIELDS for f in fields) else {}
+    result: Dict[str, Any] = {}
+    for field in fields:
+        if field == "mape":
+            result[field] = forecast.mape
+        elif field == "next_period_forecast":
+            result[field] = forecast.next_period_forecast
+        elif field == "next_period_date":
+            result[field] = forecast.next_period_date
+        else:
+            result[field] = steps.get(field, [])
+    return result
 
-    # Filter by product
-    if request.product_name:
-        sales_query = [s for s in sales_query if s.product_name == request.product_name]
 
-    # Filter by date range (convert strings to date objects for comparison)
+def load_forecast_sales(request: ForecastRequest, sale_repo: SaleRepository) -> List[Tuple[str, date, int]]:
+    """Fetch the (product_name, date, qty) rows a forecast request covers; 400 if the filters match nothing."""
     start_date = parse_date(request.start_date) if request.start_date else None
     end_date = parse_date(request.end_date) if request.end_date else None
-    next_period_date = parse_date(request.next_period_date) if request.next_period_date else None
 
-    if start_date:
-        sales_query = [s for s in sales_query if s.date >= start_date]
-    if end_date:
-        sales_query = [s for s in sales_query if s.date <= end_date]
+    with span("load_sales"):
+        rows = sale_repo.get_series_rows(request.product_name, start_date, end_date)
 
-    if not sales_query:
+    if not rows:
         raise HTTPException(status_code=400, detail="No data available for the specified filters")
 
-    # Convert date objects to ISO strings for JSON serialization
-    data = [{"date": date_to_iso(s.date), "product_name": s.product_name, "qty": s.qty} for s in sales_query]
-    df = pd.DataFrame(data)
-    # Ensure dates remain as strings (pandas might convert to datetime)
-    df["date"] = df["date"].astype(str)
-
-    results: Dict[str, Any] = {}
-    total_mape = 0
-    product_count = 0
+    return rows
 
-    for product_name, group in df.groupby("product_name"):
-        group = group.sort_values("date")
-        dates = group["date"].tolist()  # Ensure strings
-        actuals = group["qty"].tolist()
 
-        # Calculate SES
-        calc_result = calculate_ses_with_steps(actuals, dates, request.alpha)
-        forecasts = calc_result["forecasts"]
-        steps = calc_result["steps"]
-        mape = calc_result["mape"]
+def iter_product_forecasts(
+    request: ForecastRequest,
+    rows: List[Tuple[str, date, int]],
+    forecast_repo: ForecastRepository,
+    created_by: int,
+    fields: Tuple[str, ...] = RESULT_FIELDS
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run SES per product and persist each forecast, yielding (product_name, result)
+    as soon as that product's row is committed. A product whose inputs match a
+    stored run links to that run instead of recomputing and re-storing it; the
+    stored series are then only read back if `fields` asks for them.
+    """
+    wants_series = any(f in SERIES_FIELDS for f in fields)
+    next_period_date = parse_date(request.next_period_date) if request.next_period_date else None
 
-        # Last forecast already folds in the final actual, so it doubles as the next-period forecast
-        next_forecast = forecasts[-1]
+    # Rows arrive ordered by product and date, so partitioning is a single pass
+    partitions = partition_series(rows)
+    while True:
+        with span("partition"):
+            partition = next(partitions, None)
+        if partition is None:
+            return
+        product_name, dates, actuals = partition
 
         # Project a few more days forward (flat SES projection) beyond the requested next period
         future_start = date_to_iso(next_period_date) or dates[-1]
-        future_forecasts = generate_future_forecasts(next_forecast, future_start, FUTURE_FORECAST_PERIODS)
-
-        # Save forecast to database (convert dates to ISO strings for JSON)
-        forecast_repo.create_forecast(
-            project_name=request.project_name,
-            created_at=datetime.utcnow(),
-            created_by=current_user.id,
-            alpha=request.alpha,
-            product_name=product_name,
-            next_period_forecast=next_forecast,
-            next_period_date=next_period_date,
-            mape=mape,
-            calculation_steps={
-                "dates": [date_to_iso(d) for d in dates],
-                "actuals": actuals,
-                "forecasts": forecasts,
-                "steps": steps,
-                "future_forecasts": future_forecasts
-            }
-        )
 
-        results[product_name] = {
+        # Identical inputs (series, alpha, horizon) were already computed and stored: reuse that run
+        stored = None
+        if settings.forecast_dedup_enabled:
+            input_hash = forecast_input_hash(dates, actuals, request.alpha, future_start, FUTURE_FORECAST_PERIODS)
+            with span("dedup"):
+                stored = forecast_repo.find_result(input_hash)
+            record_cache("forecast_result", hit=stored is not None)
+        else:
+            input_hash = None
+
+        while True:
+            if stored is not None:
+                calculation_steps = None
+                mape = stored.mape
+                next_forecast = stored.next_period_forecast
+            else:
+                # Calculate SES
+                with span("ses"):
+                    started = time.perf_counter()
+                    calc_result = calculate_ses_with_steps(actuals, dates, request.alpha)
+                    observe_kernel("ses", started, series_length=len(actuals))
+                mape = calc_result["mape"]
+
+                # Last forecast already folds in the final actual, so it doubles as the next-period forecast
+                next_forecast = calc_result["forecasts"][-1]
+                calculation_steps = {
+                    "dates": dates,
+                    "actuals": actuals,
+                    "forecasts": calc_result["forecasts"],
+                    "steps": calc_result["steps"],
+                    "future_forecasts": generate_future_forecasts(next_forecast, future_start, FUTURE_FORECAST_PERIODS)
+                }
+
+            # Save forecast to database (convert dates to ISO strings for JSON)
+            with span("persist"):
+                try:
+                    forecast_repo.create_forecast(
+                        project_name=request.project_name,
+                        created_at=datetime.utcnow(),
+                        created_by=created_by,
+                        alpha=request.alpha,
+                        product_name=product_name,
+                        next_period_forecast=next_forecast,
+                        next_period_date=next_period_date,
+                        mape=mape,
+                        calculation_steps=calculation_steps,
+                        input_hash=input_hash,
+                        result=stored
+                    )
+                except StoredResultDeleted:
+                    # Its last project was deleted after find_result: compute and store the run afresh
+                    stored = None
+                    continue
+            break
+
+        if stored is not None and wants_series:
+            # Read only now: once linked and committed the run is no orphan, so it cannot vanish meanwhile
+            calculation_steps = stored.calculation_steps
+
+        series = calculation_steps or {}
+        yield product_name, {
             "dates": dates,
             "actuals": actuals,
-            "forecasts": forecasts,
-            "steps": steps,
+            "forecasts": series.get("forecasts", []),
+            "steps": series.get("steps", []),
             "mape": mape,
             "next_period_forecast": next_forecast,
             "next_period_date": date_to_iso(next_period_date),
-            "future_forecasts": future_forecasts
+            "future_forecasts": series.get("future_forecasts", [])
         }
-        total_mape += mape
+
+
+@router.post("")
+async def create_forecast(
+    request: ForecastRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    compact: bool = COMPACT_QUERY,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_admin_user_or_session)
+):
+    """Create a forecast using Single Exponential Smoothing (admin only)."""
+    selected = parse_fields(fields, RESULT_FIELDS)
+    rows = load_forecast_sales(request, SaleRepository(db))
+    forecast_repo = ForecastRepository(db)
+
+    results: Dict[str, Any] = {}
+    total_mape = 0
+    product_count = 0
+
+    for product_name, result in iter_product_forecasts(request, rows, forecast_repo, current_user.id, selected):
+        results[product_name] = {field: result[field] for field in selected}
+        total_mape += result["mape"]
         product_count += 1
 
+    forecast_product_count.observe(product_count, endpoint="create")
     return {
-        "results": results,
+        "results": to_columnar(results, "product_name", selected) if compact else results,
         "overall_mape": total_mape / product_count if product_count > 0 else 0,
         "created_at": datetime.utcnow().isoformat()
     }
 
 
+@router.post("/stream")
+async def create_forecast_stream(
+    request: ForecastRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    constant_memory: bool = Query(
+        False,
+        description="Read sales through a server-side cursor and keep only each product's running "
+                    "SES state; results carry periods, dates, mape, metrics and the next-period "
+                    "forecasts instead of per-period series"
+    ),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_admin_user_or_session)
+):
+    """
+    Create a forecast like POST /api/forecast, streamed as NDJSON (admin only).
+
+    Emits one {"type": "result", "product_name": ..., ...} line per product as soon
+    as it is computed and saved, then a final {"type": "summary", "overall_mape": ...}
+    line. Only one product's result is held in memory at a time.
+
+    With constant_memory=true the sales themselves are never loaded as a whole
+    either: see stream_constant_memory.
+    """
+    if constant_memory:
+        return stream_constant_memory(request, parse_fields(fields, CONSTANT_MEMORY_FIELDS), db, current_user.id)
+
+    selected = parse_fields(fields, RESULT_FIELDS)
+    # Resolve filters up front so "no data" is still a regular 400, not a broken stream
+    rows = load_forecast_sales(request, SaleRepository(db))
+    forecast_repo = ForecastRepository(db)
+    created_by = current_user.id
+
+    def ndjson_lines() -> Iterator[str]:
+        total_mape = 0
+        product_count = 0
+        for product_name, result in iter_product_forecasts(request, rows, forecast_repo, created_by, selected):
+            line = {"type": "result", "product_name": product_name}
+            line.update((field, result[field]) for field in selected)
+            yield json.dumps(line, default=str) + "\n"
+            total_mape += result["mape"]
+            product_count += 1
+
+        forecast_product_count.observe(product_count, endpoint="stream")
+        yield json.dumps({
+            "type": "summary",
+            "product_count": product_count,
+            "overall_mape": total_mape / product_count if product_count > 0 else 0,
+            "created_at": datetime.utcnow().isoformat()
+        }) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+def stream_constant_memory(
+    request: ForecastRequest,
+    selected: Tuple[str, ...],
+    db: Session,
+    created_by: int
+) -> StreamingResponse:
+    """
+    The constant_memory mode of POST /api/forecast/stream.
+
+    Sales are read in batches of settings.forecast_stream_batch_size from a
+    server-side cursor and folded into streaming_service.stream_forecasts, which
+    keeps one product's SES state at a time and emits each product as it ends.
+    A server-side cursor owns its connection until exhausted (MySQL cannot
+    interleave other statements), so the forecasts are saved once the scan is
+    done: a few scalars per product, with only future_forecasts as
+    calculation_steps and no reuse of stored runs.
+    """
+    # Checked before the cursor opens: an error inside the stream would truncate it after the 200
+    if not 0 < request.alpha <= 1:
+        raise HTTPException(status_code=400, detail="Alpha must be in (0, 1]")
+    start_date = parse_date(request.start_date) if request.start_date else None
+    end_date = parse_date(request.end_date) if request.end_date else None
+    next_period_date = parse_date(request.next_period_date) if request.next_period_date else None
+    batches = SaleRepository(db).stream_series_rows(
+        request.product_name, start_date, end_date, settings.forecast_stream_batch_size
+    )
+    # Peek one batch so "no data" is still a regular 400, not a broken stream
+    with span("load_sales"):
+        first = next(batches, None)
+    if not first:
+        batches.close()
+        raise HTTPException(status_code=400, detail="No data available for the specified filters")
+
+    def ndjson_lines() -> Iterator[str]:
+        total_mape = 0
+        pending = []
+        results = stream_forecasts(
+            chain([first], batches), request.alpha, date_to_iso(next_period_date), FUTURE_FORECAST_PERIODS
+        )
+        for product_name, result in results:
+            result["next_period_date"] = date_to_iso(next_period_date)
+            line = {"type": "result", "product_name": product_name}
+            line.update((field, result[field]) for field in selected)
+            yield json.dumps(line, default=str) + "\n"
+            total_mape += result["mape"]
+            pending.append((product_name, result["next_period_forecast"], result["mape"], result["future_forecasts"]))
+
+        forecast_repo = ForecastRepository(db)
+        created_at = datetime.utcnow()
+        with span("persist"):
+            for product_name, next_forecast, mape, future_forecasts in pending:
+                forecast_repo.create_forecast(
+                    project_name=request.project_name,
+                    created_at=created_at,
+                    created_by=created_by,
+                    alpha=request.alpha,
+                    product_name=product_name,
+                    next_period_forecast=next_forecast,
+                    next_period_date=next_period_date,
+                    mape=mape,
+                    calculation_steps={"future_forecasts": future_forecasts}
+                )
+
+        forecast_product_count.observe(len(pending), endpoint="stream")
+        yield json.dumps({
+            "type": "summary",
+            "product_count": len(pending),
+            "overall_mape": total_mape / len(pending),
+            "created_at": created_at.isoformat()
+        }) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
 @router.post("/compare-alpha")
 async def compare_alpha(
     request: AlphaCompareRequest,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = FIELDS_QUERY,
+    compact: bool = COMPACT_QUERY,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_admin_user_or_session)
 ):
     """Compare SES results across alpha 0.1-0.9 for one product (admin only, not saved)."""
-    sale_repo = SaleRepository(db)
-    sales_query = [s for s in sale_repo.get_all_ordered() if s.product_name == request.product_name]
-
+    selected = parse_fields(fields, COMPARE_FIELDS)
     start_date = parse_date(request.start_date) if request.start_date else None
     end_date = parse_date(request.end_date) if request.end_date else None
 
-    if start_date:
-        sales_query = [s for s in sales_query if s.date >= start_date]
-    if end_date:
-        sales_query = [s for s in sales_query if s.date <= end_date]
+    with span("load_sales"):
+        rows = SaleRepository(db).get_series_rows(request.product_name, start_date, end_date)
 
-    if not sales_query:
+    if not rows:
         raise HTTPException(status_code=400, detail="No data available for the specified filters")
 
-    sales_query = sorted(sales_query, key=lambda s: s.date)
-    dates = [date_to_iso(s.date) for s in sales_query]
-    actuals = [s.qty for s in sales_query]
+    _, dates, actuals = next(partition_series(rows))
 
-    result = compare_alphas(actuals, dates, COMPARE_ALPHAS)
+    with span("ses"):
+        started = time.perf_counter()
+        result = compare_alphas(actuals, dates, COMPARE_ALPHAS, fields=selected)
+        observe_kernel("compare_alphas", started, series_length=len(actuals))
+    if compact:
+        per_alpha_fields = tuple(f for f in selected if f not in ("dates", "actuals"))
+        result["by_alpha"] = to_columnar(
+            {entry["alpha"]: entry for entry in result["by_alpha"].values()}, "alpha", per_alpha_fields
+        )
     result["product_name"] = request.product_name
     return result
 
 
+@router.post("/backtest")
+def backtest_forecast(
+    request: BacktestRequest,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_admin_user_or_session)
+):
+    """
+    Rolling-origin backtest of SES per product and alpha (admin only, not saved).
+
+    Forecasts are issued at every origin from the history up to it (expanding
+    window, or the last `window` periods) and scored out-of-sample at horizons
+    1..`horizon`. Returns per-product and catalog-wide accuracy metrics
+    (MAE/RMSE/MAPE/sMAPE/MASE/bias), the best alpha by `metric`, and with
+    `include_errors` each product's origins x horizons error matrix.
+
+    A plain def, so FastAPI runs it on the threadpool: a backtest can take
+    seconds of CPU and must not stall the event loop meanwhile.
+    """
+    if any(not 0 < alpha <= 1 for alpha in request.alphas):
+        raise HTTPException(status_code=400, detail="Alphas must be in (0, 1]")
+    start_date = parse_date(request.start_date) if request.start_date else None
+    end_date = parse_date(request.end_date) if request.end_date else None
+
+    with span("load_sales"):
+        rows = SaleRepository(db).get_series_rows(request.product_name, start_date, end_date)
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="No data available for the specified filters")
+
+    with span("backtest"):
+        result = backtest(
+            partition_series(rows),
+            request.alphas,
+            horizon=request.horizon,
+            min_train=request.min_train,
+            window=request.window,
+            origin_step=request.origin_step,
+            metric=request.metric,
+            include_errors=request.include_errors,
+            jobs=settings.backtest_jobs
+        )
+    forecast_product_count.observe(result["summary"]["product_count"], endpoint="backtest")
+    return result
+
+
 @router.get("/latest")
 async def get_latest_forecast(
-    db: Session = Depends(get_db),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user_or_session)
 ):
     """Get the most recent forecast."""
+    selected = parse_fields(fields, RESULT_FIELDS)
+    wants_series = any(f in SERIES_FIELDS for f in selected)
+
     forecast_repo = ForecastRepository(db)
-    latest = forecast_repo.get_latest()
+    latest = forecast_repo.get_latest(include_steps=wants_series)
 
     if not latest:
         raise HTTPException(status_code=404, detail="No forecast found")
 
-    steps = latest.calculation_steps or {}
-    return {
+    response = {
         "id": latest.id,
         "created_at": latest.created_at.isoformat(),
         "alpha": latest.alpha,
         "product_name": latest.product_name,
-        "next_period_forecast": latest.next_period_forecast,
-        "next_period_date": latest.next_period_date,
-        "mape": latest.mape,
-        "dates": steps.get("dates", []),
-        "actuals": steps.get("actuals", []),
-        "forecasts": steps.get("forecasts", []),
-        "steps": steps.get("steps", []),
-        "future_forecasts": steps.get("future_forecasts", [])
     }
+    response.update(forecast_result(latest, selected))
+    return response
 
 
 @router.get("/history", response_model=list[ForecastOut])
 async def get_forecast_history(
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user_or_session)
 ):
-    """Get all forecasts history."""
+    """Get forecast history (newest first), one page at a time; next cursor in X-Next-Cursor."""
     forecast_repo = ForecastRepository(db)
-    forecasts = forecast_repo.get_all_ordered()
+    try:
+        forecasts, next_cursor = forecast_repo.get_page(limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [{
         "id": f.id,
         "created_at": f.created_at.isoformat(),
@@ -224,9 +531,35 @@ async def get_forecast_history(
     } for f in forecasts]
 
 
+@router.get("/chart-series")
+async def get_chart_series(
+    forecast_id: Optional[List[int]] = Query(None, description="Forecast id; repeat for several"),
+    project_name: Optional[str] = Query(None, description="All forecasts of this project"),
+    max_points: int = Query(DEFAULT_MAX_POINTS, ge=3, le=10000, description="Point budget per series (LTTB)"),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user_or_session)
+):
+    """Chart series (dates, actuals, forecasts) for forecasts or a project, downsampled with LTTB."""
+    if not forecast_id and not project_name:
+        raise HTTPException(status_code=400, detail="Pass forecast_id or project_name")
+
+    forecast_repo = ForecastRepository(db)
+    if forecast_id:
+        forecasts = forecast_repo.get_by_ids(forecast_id)
+    else:
+        forecasts = forecast_repo.get_by_project(project_name)
+
+    if not forecasts:
+        raise HTTPException(status_code=404, detail="No forecast found")
+
+    with span("downsample"):
+        series = [chart_series(f, max_points) for f in forecasts]
+    return {"max_points": max_points, "series": series}
+
+
 @router.get("/projects", response_model=list[ForecastProjectInfo])
 async def get_forecast_projects(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_admin_user_or_session)
 ):
     """Get all forecast projects (admin only)."""
@@ -237,29 +570,22 @@ async def get_forecast_projects(
 @router.get("/project/{project_name}")
 async def get_forecast_project(
     project_name: str,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = FIELDS_QUERY,
+    compact: bool = COMPACT_QUERY,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user_or_session)
 ):
     """Get details of a specific forecast project."""
+    selected = parse_fields(fields, RESULT_FIELDS)
+    wants_series = any(f in SERIES_FIELDS for f in selected)
+
     forecast_repo = ForecastRepository(db)
-    forecasts = forecast_repo.get_by_project(project_name)
+    forecasts = forecast_repo.get_by_project(project_name, include_steps=wants_series)
 
     if not forecasts:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    results = {}
-    for f in forecasts:
-        steps = f.calculation_steps or {}
-        results[f.product_name] = {
-            "dates": steps.get("dates", []),
-            "actuals": steps.get("actuals", []),
-            "forecasts": steps.get("forecasts", []),
-            "steps": steps.get("steps", []),
-            "mape": f.mape,
-            "next_period_forecast": f.next_period_forecast,
-            "next_period_date": f.next_period_date,
-            "future_forecasts": steps.get("future_forecasts", [])
-        }
+    results = {f.product_name: forecast_result(f, selected) for f in forecasts}
 
     overall_mape = sum(f.mape for f in forecasts) / len(forecasts) if forecasts else 0
 
@@ -267,11 +593,23 @@ async def get_forecast_project(
         "project_name": project_name,
         "created_at": forecasts[0].created_at.isoformat(),
         "alpha": forecasts[0].alpha,
-        "results": results,
+        "results": to_columnar(results, "product_name", selected) if compact else results,
         "overall_mape": overall_mape
     }
 
 
+@router.delete("/project/{project_name}")
+async def delete_forecast_project(
+    project_name: str,
+    db: Session = Depends(get_db),
+    admin: models.User = Depends(get_admin_user_or_session)
+):
+    """Delete every forecast of a project (admin only)."""
+    deleted = ForecastRepository(db).delete_project(project_name)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return {"status": "ok", "deleted": deleted}
+
 
 @router.post("/reset-data")
 async def reset_data(
@@ -284,6 +622,8 @@ async def reset_data(
     # Clear data
     db.query(models.Sale).delete()
     db.query(models.Forecast).delete()
+    db.query(models.ForecastProject).delete()
+    db.query(models.ForecastResult).delete()
 
     # Reseed
     seed_service = SeedService(db)
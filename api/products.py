@@ -4,7 +4,7 @@ from typing import List
 from datetime import datetime
 
 import models
-from database import get_db
+from database import get_db, get_read_db
 from schemas.products import ProductCreate, ProductOut
 from repositories.product_repository import ProductRepository
 from api.auth import get_current_user_or_session, get_admin_user_or_session
@@ -14,7 +14,7 @@ router = APIRouter()
 
 @router.get("", response_model=List[ProductOut])
 async def get_products(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user_or_session)
 ):
     """Get all products."""
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional, Union
 from datetime import date
 import models
-from database import get_db
+from config import get_settings
+from database import SessionLocal, get_db, get_read_db
 from schemas.sales import SaleCreate, SaleOut
+from repositories.base import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from repositories.sale_repository import SaleRepository
 from api.auth import get_current_user_or_session, get_admin_user_or_session
+from services.write_buffer import GroupCommitBuffer
+
+settings = get_settings()
 
 
 def parse_date(value: Union[str, date]) -> date:
@@ -20,32 +25,65 @@ def parse_date(value: Union[str, date]) -> date:
 router = APIRouter()
 
 
+def flush_sales(rows: List[dict]):
+    """Write one group of buffered sales in a single transaction."""
+    db = SessionLocal()
+    try:
+        SaleRepository(db).create_sales(rows)
+    finally:
+        db.close()
+
+
+# Coalesces concurrent POST /api/sales into group commits when enabled
+sale_write_buffer: Optional[GroupCommitBuffer] = (
+    GroupCommitBuffer(
+        flush_sales,
+        max_batch=settings.sale_write_batch_size,
+        max_delay_ms=settings.sale_write_max_delay_ms,
+        name="sales"
+    )
+    if settings.sale_write_buffer_enabled else None
+)
+
+
 @router.get("", response_model=List[SaleOut])
 async def get_sales(
+    response: Response,
     product_name: Optional[str] = Query(None, description="Filter by product name (partial match)"),
     date_from: Optional[str] = Query(None, description="Filter by date from (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Filter by date to (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user_or_session)
 ):
-    """Get all sales records with optional filters."""
-    sale_repo = SaleRepository(db)
+    """
+    Get sales records (newest first) with optional filters, one page at a time.
 
-    # Use filtered method if any filter is provided, otherwise get all
-    if product_name or date_from or date_to:
-        return sale_repo.get_filtered(
+    The cursor for the next page is returned in the X-Next-Cursor header;
+    the header is absent on the last page.
+    """
+    sale_repo = SaleRepository(db)
+    try:
+        sales, next_cursor = sale_repo.get_page(
+            limit=limit,
+            cursor=cursor,
             product_name=product_name,
             date_from=date_from,
             date_to=date_to
         )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    return sale_repo.get_all_ordered()
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return sales
 
 
 @router.get("/product/{product_name}")
 async def get_sales_by_product(
     product_name: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user_or_session)
 ):
     """Get all sales for a specific product."""
@@ -61,10 +99,13 @@ async def add_sale(
     admin: models.User = Depends(get_admin_user_or_session)
 ):
     """Add a new sale record (admin only)."""
-    sale_repo = SaleRepository(db)
     # Convert date string to date object if needed
     date_obj = parse_date(sale.date)
-    sale_repo.create_sale(date=date_obj, product_name=sale.product_name, qty=sale.qty)
+    if sale_write_buffer is not None:
+        # Acknowledged only after the group commit containing this row succeeds
+        await sale_write_buffer.submit({"date": date_obj, "product_name": sale.product_name, "qty": sale.qty})
+    else:
+        SaleRepository(db).create_sale(date=date_obj, product_name=sale.product_name, qty=sale.qty)
     return {"status": "ok", "msg": "Sale added"}
 
 
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Compare engine profiles (database.DB_PROFILES) under concurrent read/write mixes.
+
+Each profile gets a fresh SQLite file seeded with sales rows; worker threads then
+run for a fixed time, each operation being either a read (one product's sales,
+ordered by date — the forecast access pattern) or a write (insert one sale and
+commit). Reports throughput, p50/p95 latency and "database is locked" errors.
+
+Usage:
+    python -m benchmarks.bench_db_profiles
+    python -m benchmarks.bench_db_profiles --threads 16 --write-ratios 0.05 0.5 --seconds 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import Base, DB_PROFILES, create_app_engine
+
+PRODUCTS = [f"Product {i}" for i in range(20)]
+
+
+def seed(engine, rows: int):
+    start = date(2024, 1, 1)
+    batch = [
+        {"date": start + timedelta(days=i // len(PRODUCTS)), "product_name": PRODUCTS[i % len(PRODUCTS)], "qty": i % 30}
+        for i in range(rows)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Sale), batch)
+
+
+def worker(Session, write_ratio: float, deadline: float, latencies: list, errors: list, seed_value: int):
+    rng = random.Random(seed_value)
+    session = Session()
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    session.add(models.Sale(date=date(2025, 1, 1), product_name=rng.choice(PRODUCTS), qty=rng.randint(1, 30)))
+                    session.commit()
+                else:
+                    session.execute(
+                        select(models.Sale.date, models.Sale.qty)
+                        .where(models.Sale.product_name == rng.choice(PRODUCTS))
+                        .order_by(models.Sale.date)
+                    ).all()
+                    session.rollback()
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                session.rollback()
+                errors.append(1)
+    finally:
+        session.close()
+
+
+def run_profile(profile: str, threads: int, write_ratio: float, seconds: float, rows: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_app_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        Base.metadata.create_all(bind=engine)
+        seed(engine, rows)
+        Session = sessionmaker(bind=engine)
+
+        latencies, errors = [], []
+        deadline = time.perf_counter() + seconds
+        pool = [
+            threading.Thread(target=worker, args=(Session, write_ratio, deadline, latencies, errors, i))
+            for i in range(threads)
+        ]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": profile,
+        "write_ratio": write_ratio,
+        "ops_per_s": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", nargs="+", default=list(DB_PROFILES))
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--write-ratios", nargs="+", type=float, default=[0.05, 0.2, 0.5])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'writes':>6} {'ops/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for write_ratio in args.write_ratios:
+        for profile in args.profiles:
+            r = run_profile(profile, args.threads, write_ratio, args.seconds, args.rows)
+            print(f"{r['profile']:<12} {r['write_ratio']:>6.0%} {r['ops_per_s']:>10.0f} "
+                  f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
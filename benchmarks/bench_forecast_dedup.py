@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Repeated forecast runs with and without reuse of stored results.
+
+Runs POST /api/forecast (all products, a new project each time) several times
+over unchanged sales, once with FORECAST_DEDUP_ENABLED off and once on, on a
+synthetic SQLite dataset. Reports the latency of the first and of the
+repeated runs, and how much calculation_steps JSON and database file the runs
+added.
+
+Usage:
+    python -m benchmarks.bench_forecast_dedup
+    python -m benchmarks.bench_forecast_dedup --products 50 --days 730 --runs 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.dataset import prepare_sqlite_dataset
+
+
+def storage(engine) -> dict:
+    with engine.connect() as conn:
+        json_bytes = sum(
+            conn.exec_driver_sql(f"SELECT COALESCE(SUM(LENGTH(calculation_steps)), 0) FROM {table}").scalar()
+            for table in ("forecasts", "forecast_results")
+        )
+        page_count = conn.exec_driver_sql("PRAGMA page_count").scalar()
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+    return {"json_bytes": json_bytes, "file_bytes": page_count * page_size}
+
+
+def run_mode(client, headers, engine, settings, dedup: bool, runs: int) -> dict:
+    from database import SessionLocal
+    from repositories.forecast_repository import ForecastRepository
+
+    db = SessionLocal()
+    try:
+        ForecastRepository(db).delete_all()
+    finally:
+        db.close()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    before = storage(engine)
+
+    settings.forecast_dedup_enabled = dedup
+    latencies = []
+    for i in range(runs):
+        started = time.perf_counter()
+        response = client.post("/api/forecast?fields=mape", json={"alpha": 0.3, "project_name": f"bench {i}"}, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f"POST /api/forecast -> {response.status_code}: {response.text[:200]}")
+
+    after = storage(engine)
+    return {
+        "mode": "dedup" if dedup else "recompute",
+        "first_ms": latencies[0] * 1000,
+        "repeat_ms": statistics.median(latencies[1:]) * 1000 if runs > 1 else 0.0,
+        "json_kb": (after["json_bytes"] - before["json_bytes"]) / 1024,
+        "file_kb": (after["file_bytes"] - before["file_bytes"]) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_sqlite_dataset(os.path.join(workdir, "dedup.db"), args.products, args.days)
+
+        from fastapi.testclient import TestClient
+        from api.forecasts import settings
+        from database import engine
+        from main import app
+
+        with TestClient(app) as client:
+            token = client.post("/token", data={"username": "admin", "password": "admin123"}).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            print(f"{args.runs} runs x {args.products} products x {args.days} days")
+            print(f"{'mode':<10} {'first ms':>9} {'repeat ms':>10} {'steps JSON KB':>14} {'file KB':>9}")
+            for dedup in (False, True):
+                r = run_mode(client, headers, engine, settings, dedup, args.runs)
+                print(f"{r['mode']:<10} {r['first_ms']:>9.1f} {r['repeat_ms']:>10.1f} "
+                      f"{r['json_kb']:>14.0f} {r['file_kb']:>9.0f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
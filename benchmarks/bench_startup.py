@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Startup time: from `import main` to the first 200 on /health.
+
+Each sample runs in a fresh interpreter so nothing is cached in-process:
+  in-process  import main, run the ASGI startup events, GET /health via the test client
+  uvicorn     spawn `uvicorn main:app` and poll /health until it answers 200
+              (includes interpreter start; skipped with --no-uvicorn)
+
+Also lists which heavy optional modules (pandas, numpy, passlib, jose, bcrypt)
+were imported by startup; they should all load lazily. Exits 1 if the median
+in-process time exceeds --budget-ms or any of them was imported. Runs against a
+throwaway SQLite file: with a MySQL URL the engine imports PyMySQL at startup,
+which loads cryptography and bcrypt, so the check only holds for SQLite.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Expected absent after startup on SQLite; PyMySQL (the MySQL driver) brings in bcrypt via cryptography
+HEAVY_MODULES = ("pandas", "numpy", "passlib", "jose", "bcrypt")
+
+IN_PROCESS_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/health").status_code == 200
+    elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def in_process_sample(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IN_PROCESS_PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def uvicorn_sample(env: dict) -> float:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < 30:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        raise RuntimeError("uvicorn did not answer /health within 30s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import-to-first-200 startup time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="fail if the in-process median exceeds this")
+    parser.add_argument("--no-uvicorn", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'startup.db')}"}
+
+        samples = [in_process_sample(env) for _ in range(args.runs)]
+        in_process = statistics.median(s["seconds"] for s in samples) * 1000
+        heavy = sorted({m for s in samples for m in s["heavy"]})
+        runs = ", ".join(f"{s['seconds'] * 1000:.0f}" for s in samples)
+        print(f"in-process  median {in_process:8.1f} ms  (runs: {runs})")
+
+        if not args.no_uvicorn:
+            spawn = [uvicorn_sample(env) * 1000 for _ in range(args.runs)]
+            runs = ", ".join(f"{v:.0f}" for v in spawn)
+            print(f"uvicorn     median {statistics.median(spawn):8.1f} ms  (runs: {runs})")
+
+    failed = False
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if in_process > args.budget_ms:
+        print(f"Over budget: {in_process:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print(f"Within budget ({args.budget_ms:.0f} ms), no heavy modules at startup")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
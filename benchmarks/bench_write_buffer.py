@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Single-sale ingest: one commit per sale vs group commit (services/write_buffer.py).
+
+Simulates N concurrent POS clients, each inserting sales one at a time and
+waiting for the acknowledgement before sending the next, against a fresh
+SQLite file. "direct" mirrors SaleRepository.create_sale (own transaction and
+refresh per row, in the threadpool like a sync request would); "buffered" goes
+through GroupCommitBuffer. Reports rows/s and per-sale latency percentiles.
+
+Usage:
+    python -m benchmarks.bench_write_buffer
+    python -m benchmarks.bench_write_buffer --clients 1 8 64 --seconds 5 --profile durable
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from database import Base, DB_PROFILES, create_app_engine
+from repositories.sale_repository import SaleRepository
+from services.write_buffer import GroupCommitBuffer
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)]
+
+
+async def run_mode(mode: str, clients: int, seconds: float, profile: str, batch: int, delay_ms: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_app_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        def create_one(row):
+            db = Session()
+            try:
+                SaleRepository(db).create_sale(**row)
+            finally:
+                db.close()
+
+        def flush(rows):
+            db = Session()
+            try:
+                SaleRepository(db).create_sales(rows)
+            finally:
+                db.close()
+
+        buffer = GroupCommitBuffer(flush, max_batch=batch, max_delay_ms=delay_ms, name="bench")
+        latencies = []
+        deadline = time.perf_counter() + seconds
+
+        async def client(n):
+            i = 0
+            while time.perf_counter() < deadline:
+                row = {"date": date(2025, 1, 1), "product_name": f"Client {n}", "qty": i}
+                started = time.perf_counter()
+                if mode == "buffered":
+                    await buffer.submit(row)
+                else:
+                    await run_in_threadpool(create_one, row)
+                latencies.append(time.perf_counter() - started)
+                i += 1
+
+        await asyncio.gather(*(client(n) for n in range(clients)))
+        await buffer.close()
+        engine.dispose()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "clients": clients,
+        "rows_per_s": len(latencies) / seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "avg_batch": buffer.rows / buffer.batches if buffer.batches else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--profile", default="balanced", choices=list(DB_PROFILES))
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<9} {'clients':>7} {'rows/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for clients in args.clients:
+        for mode in ("direct", "buffered"):
+            r = asyncio.run(run_mode(mode, clients, args.seconds, args.profile, args.batch, args.delay_ms))
+            print(f"{r['mode']:<9} {r['clients']:>7} {r['rows_per_s']:>10.0f} "
+                  f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['avg_batch']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Throwaway SQLite datasets for benchmarks and load tests.
+
+DATABASE_URL is pointed at the given file before the app modules are
+imported, so benchmarks never touch a configured development or production
+database. Call prepare_sqlite_dataset before importing `database` or `main`.
+"""
+import os
+
+
+def prepare_sqlite_dataset(path: str, n_products: int, n_days: int, seed: int = 42) -> str:
+    """Create the schema, default users and a synthetic sales history in `path`; returns the URL."""
+    url = f"sqlite:///{os.path.abspath(path)}"
+    os.environ["DATABASE_URL"] = url
+
+    from database import Base, SessionLocal, engine
+    from services.seed_service import SeedService
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        service = SeedService(db)
+        service.create_default_users()
+        # Sales exist afterwards, so the app's startup seeding is a no-op
+        service.seed_synthetic(n_products, n_days, seed=seed)
+    finally:
+        db.close()
+    return url
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+HTTP load test: many concurrent admins and owners running scripted scenarios.
+
+Each virtual user has its own httpx.AsyncClient (and so its own session
+cookie), logs in through the /login form, then loops over its role's
+scenarios, chosen by weight, until the run ends. Admins run dashboard,
+forecast create, compare-alpha and sales listing; owners read the forecasts
+pages. Reports throughput, p50/p95/p99 latency and the error rate per route.
+
+Targets:
+    --in-process      the app inside this process via httpx.ASGITransport (default)
+    --launch          a local uvicorn started on a synthetic SQLite dataset
+    --url URL         an already running server (must have admin/owner users)
+
+Usage:
+    python -m benchmarks.loadtest --admins 8 --owners 16 --duration 30
+    python -m benchmarks.loadtest --launch --workers 2 --json report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.dataset import prepare_sqlite_dataset
+
+CREDENTIALS = {"admin": ("admin", "admin123"), "owner": ("owner", "owner123")}
+
+
+class Recorder:
+    """Latency samples and error counts per route label."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = True
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send one request and record it under `route`; 4xx/5xx and transport errors count as errors."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response, failed = None, True
+        if self.recording:
+            self.latencies[route].append(time.perf_counter() - started)
+            if failed:
+                self.errors[route] += 1
+        return None if failed else response
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)]
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, dict]:
+    report = {}
+    for route, samples in sorted(recorder.latencies.items()):
+        samples = sorted(samples)
+        report[route] = {
+            "requests": len(samples),
+            "rps": len(samples) / duration,
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "mean_ms": statistics.fmean(samples) * 1000,
+            "errors": recorder.errors[route],
+            "error_rate": recorder.errors[route] / len(samples),
+        }
+    return report
+
+
+# ============= SCENARIOS =============
+
+Scenario = Callable[[Recorder, httpx.AsyncClient, dict], Awaitable[None]]
+
+
+async def login(rec: Recorder, client: httpx.AsyncClient, ctx: dict):
+    username, password = CREDENTIALS[ctx["role"]]
+    client.cookies.clear()
+    await rec.request(client, "POST /login", "POST", "/login", data={"username": username, "password": password})
+
+
+async def dashboard(rec: Recorder, client: httpx.AsyncClient, ctx: dict):
+    await rec.request(client, "GET /dashboard", "GET", "/dashboard")
+
+
+async def forecasts_page(rec: Recorder, client: httpx.AsyncClient, ctx: dict):
+    await rec.request(client, "GET /forecasts", "GET", "/forecasts")
+    await rec.request(client, "GET /api/forecast/latest", "GET", "/api/forecast/latest?fields=mape,next_period_forecast")
+
+
+async def forecast_create(rec: Recorder, client: httpx.AsyncClient, ctx: dict):
+    body = {"alpha": ctx["rng"].choice([0.1, 0.3, 0.5]), "product_name": ctx["rng"].choice(ctx["products"]), "project_name": "loadtest"}
+    await rec.request(client, "POST /api/forecast", "POST", "/api/forecast?fields=mape,next_period_forecast", json=body)
+
+
+async def compare_alpha(rec: Recorder, client: httpx.AsyncClient, ctx: dict):
+    body = {"product_name": ctx["rng"].choice(ctx["products"])}
+    await rec.request(client, "POST /api/forecast/compare-alpha", "POST", "/api/forecast/compare-alpha?fields=mape", json=body)
+
+
+async def sales_listing(rec: Recorder, client: httpx.AsyncClient, ctx: dict):
+    response = await rec.request(client, "GET /api/sales", "GET", "/api/sales?limit=100")
+    cursor = response.headers.get("x-next-cursor") if response is not None else None
+    if cursor:
+        await rec.request(client, "GET /api/sales", "GET", f"/api/sales?limit=100&cursor={cursor}")
+
+
+# (scenario, weight) per role; login also runs once when each user starts
+SCENARIOS: Dict[str, List[Tuple[Scenario, int]]] = {
+    "admin": [(dashboard, 3), (sales_listing, 4), (compare_alpha, 2), (forecast_create, 1), (login, 1)],
+    "owner": [(forecasts_page, 6), (login, 1)],
+}
+
+
+async def virtual_user(rec: Recorder, transport_kwargs: dict, role: str, deadline: float, products: List[str], seed: int):
+    ctx = {"role": role, "products": products, "rng": random.Random(seed)}
+    scenarios, weights = zip(*SCENARIOS[role])
+    async with httpx.AsyncClient(**transport_kwargs, follow_redirects=False, timeout=60) as client:
+        await login(rec, client, ctx)
+        while time.perf_counter() < deadline:
+            scenario = ctx["rng"].choices(scenarios, weights)[0]
+            await scenario(rec, client, ctx)
+
+
+async def run_load(transport_kwargs: dict, admins: int, owners: int, duration: float, warmup: float, products: List[str]) -> Tuple[Recorder, float]:
+    rec = Recorder()
+    rec.recording = warmup <= 0
+    started = time.perf_counter()
+    deadline = started + warmup + duration
+
+    async def end_warmup():
+        if warmup > 0:
+            await asyncio.sleep(warmup)
+            rec.latencies.clear()
+            rec.errors.clear()
+            rec.recording = True
+
+    users = [virtual_user(rec, transport_kwargs, "admin", deadline, products, i) for i in range(admins)]
+    users += [virtual_user(rec, transport_kwargs, "owner", deadline, products, 1000 + i) for i in range(owners)]
+    await asyncio.gather(end_warmup(), *users)
+    return rec, time.perf_counter() - started - max(warmup, 0)
+
+
+# ============= TARGETS =============
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def launch_uvicorn(database_url: str, workers: int) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": database_url}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30s")
+
+
+def print_report(report: Dict[str, dict], duration: float):
+    total = sum(r["requests"] for r in report.values())
+    errors = sum(r["errors"] for r in report.values())
+    print(f"\n{'route':<34} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err %':>6}")
+    for route, r in report.items():
+        print(f"{route:<34} {r['requests']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['error_rate'] * 100:>6.2f}")
+    print(f"\nTotal: {total} requests in {duration:.1f}s = {total / duration:.1f} req/s, "
+          f"error rate {errors / total * 100 if total else 0:.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scenario-based HTTP load test.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--in-process", action="store_true", help="drive the app in this process (default)")
+    target.add_argument("--launch", action="store_true", help="start a local uvicorn on a synthetic dataset")
+    target.add_argument("--url", help="base URL of an already running server")
+    parser.add_argument("--admins", type=int, default=4)
+    parser.add_argument("--owners", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds run before measuring")
+    parser.add_argument("--products", type=int, default=20, help="synthetic products (in-process/launch)")
+    parser.add_argument("--days", type=int, default=365, help="synthetic days per product (in-process/launch)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (--launch)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    from services.synthetic_data import product_names
+    products = product_names(args.products)
+    process = None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.url:
+            transport_kwargs = {"base_url": args.url}
+        else:
+            url = prepare_sqlite_dataset(os.path.join(workdir, "loadtest.db"), args.products, args.days)
+            if args.launch:
+                process, base_url = launch_uvicorn(url, args.workers)
+                transport_kwargs = {"base_url": base_url}
+            else:
+                from main import app
+                transport_kwargs = {"transport": httpx.ASGITransport(app=app), "base_url": "http://loadtest"}
+
+        target_name = args.url or (transport_kwargs["base_url"] if args.launch else "in-process")
+        print(f"Load test against {target_name}: {args.admins} admins, {args.owners} owners, "
+              f"{args.warmup:.0f}s warm-up + {args.duration:.0f}s")
+        try:
+            rec, duration = asyncio.run(
+                run_load(transport_kwargs, args.admins, args.owners, args.duration, args.warmup, products)
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+    report = summarize(rec, duration)
+    print_report(report, duration)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target": target_name, "admins": args.admins, "owners": args.owners,
+                       "duration_s": duration, "routes": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the forecast kernels and the API hot paths.
+
+Kernel cases time calculate_ses_with_steps, calculate_mape, compare_alphas, the
+rolling-origin backtest, the per-product partitioning step (against the old
+pandas groupby when pandas is installed) and the constant-memory streaming
+kernel across series lengths and product counts. Render cases time the
+page templates with the compiled-template cache against the old cache_size=0
+environment that recompiled on every render. API cases load a synthetic dataset
+into a throwaway SQLite file and time POST /api/forecast, POST
+/api/forecast/compare-alpha and GET /api/sales through the ASGI test client.
+
+Results are written as JSON; `compare` flags cases whose median got slower
+than a saved baseline by more than a threshold (exit code 1 if any did).
+
+Usage:
+    python -m benchmarks.suite run                                  # -> benchmarks/results/latest.json
+    python -m benchmarks.suite run --quick --only kernel
+    python -m benchmarks.suite run --only render
+    cp benchmarks/results/latest.json benchmarks/results/baseline.json
+    python -m benchmarks.suite compare benchmarks/results/baseline.json benchmarks/results/latest.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.dataset import prepare_sqlite_dataset
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "latest.json")
+
+SERIES_LENGTHS = (30, 365, 1825, 3650)
+PRODUCT_COUNTS = (1, 10, 100)
+ALPHAS = [round(0.1 * i, 1) for i in range(1, 10)]
+
+
+def measure(func: Callable[[], object], repeats: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Time `func` like timeit: calibrate a loop count that runs for at least
+    `min_time`, then take `repeats` samples of seconds per call.
+    """
+    func()  # warm-up
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    samples = [elapsed / loops]
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - started) / loops)
+
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "loops": loops,
+        "repeats": len(samples),
+    }
+
+
+def synthetic_series(length: int, seed: int = 0) -> Tuple[List[float], List[str]]:
+    from services.synthetic_data import product_series
+    values = np.nan_to_num(product_series(seed, length, seed=seed), nan=0.0)
+    dates = [(date(2020, 1, 1) + timedelta(days=i)).isoformat() for i in range(length)]
+    return values.astype(int).tolist(), dates
+
+
+# ============= KERNEL CASES =============
+
+def kernel_cases(quick: bool) -> Dict[str, Callable[[], object]]:
+    from services.backtest_service import backtest
+    from services.forecast_service import calculate_mape, calculate_ses_with_steps, compare_alphas, partition_series
+    from services.streaming_service import stream_forecasts
+
+    lengths = SERIES_LENGTHS[:2] if quick else SERIES_LENGTHS
+    products = PRODUCT_COUNTS[:2] if quick else PRODUCT_COUNTS
+    cases: Dict[str, Callable[[], object]] = {}
+
+    for length in lengths:
+        series, dates = synthetic_series(length)
+        forecasts = calculate_ses_with_steps(series, dates, 0.3, include_steps=False)["forecasts"]
+        cases[f"kernel.ses_with_steps[n={length}]"] = lambda s=series, d=dates: calculate_ses_with_steps(s, d, 0.3)
+        cases[f"kernel.ses_no_steps[n={length}]"] = (
+            lambda s=series, d=dates: calculate_ses_with_steps(s, d, 0.3, include_steps=False)
+        )
+        cases[f"kernel.mape[n={length}]"] = lambda s=series, f=forecasts: calculate_mape(s[1:], f[1:])
+        cases[f"kernel.compare_alphas[n={length}]"] = lambda s=series, d=dates: compare_alphas(s, d, ALPHAS)
+
+    # Product counts: what one multi-product request does, at a typical year of history
+    for count in products:
+        batch = [synthetic_series(365, seed=i) for i in range(count)]
+        cases[f"kernel.ses_with_steps[products={count},n=365]"] = (
+            lambda b=batch: [calculate_ses_with_steps(s, d, 0.3) for s, d in b]
+        )
+        cases[f"kernel.compare_alphas[products={count},n=365]"] = (
+            lambda b=batch: [compare_alphas(s, d, ALPHAS, fields=("mape",)) for s, d in b]
+        )
+    # Rolling-origin backtest: every origin, 7 horizons and 9 alphas per product
+    for count in products:
+        batch = [(f"Product {i}", *reversed(synthetic_series(365, seed=i))) for i in range(count)]
+        cases[f"kernel.backtest[products={count},n=365]"] = lambda b=batch: backtest(b, ALPHAS, horizon=7)
+    # Partitioning sales rows into per-product series (the forecast request's pre-SES step)
+    for count in products:
+        rows = [
+            (f"Product {p:03d}", day, qty)
+            for p in range(count)
+            for day, qty in zip(*reversed(synthetic_series(365, seed=p)))
+        ]
+        cases[f"kernel.partition[products={count},n=365]"] = lambda r=rows: list(partition_series(r))
+        if pandas_available():
+            cases[f"kernel.partition_pandas[products={count},n=365]"] = lambda r=rows: partition_with_pandas(r)
+        # Constant-memory mode: the same rows in cursor-sized batches, SES and metrics per batch
+        cases[f"kernel.ses_stream[products={count},n=365]"] = (
+            lambda r=rows: list(stream_forecasts((r[i:i + 5000] for i in range(0, len(r), 5000)), 0.3))
+        )
+    return cases
+
+
+def pandas_available() -> bool:
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def partition_with_pandas(rows):
+    """The DataFrame/groupby partitioning the forecast endpoint used before; kept as a reference point."""
+    import pandas as pd
+    df = pd.DataFrame(rows, columns=["product_name", "date", "qty"])
+    df["date"] = df["date"].astype(str)
+    result = []
+    for product_name, group in df.groupby("product_name"):
+        group = group.sort_values("date")
+        result.append((product_name, group["date"].tolist(), group["qty"].tolist()))
+    return result
+
+
+# ============= RENDER CASES =============
+
+RENDER_PAGES = ("login.html", "dashboard.html", "sales.html", "forecasts.html", "chart.html")
+
+
+def render_cases() -> Dict[str, Callable[[], object]]:
+    from jinja2 import Environment, FileSystemLoader
+    from services.templating import create_template_env, precompile
+
+    user = {"username": "admin", "role": "admin"}
+    context = {"user": user, "recent_sales": [], "projects": [], "sales": [], "next_cursor": None}
+    cached = create_template_env("templates")
+    # What main.py used before: no template cache, so every render parses and compiles
+    uncached = Environment(loader=FileSystemLoader("templates"), cache_size=0)
+    for env in (cached, uncached):
+        env.filters["date_format"] = lambda value: value
+    precompile(cached)
+
+    cases: Dict[str, Callable[[], object]] = {}
+    for page in RENDER_PAGES:
+        cases[f"render.cached[{page}]"] = lambda p=page: cached.get_template(p).render(context)
+        cases[f"render.uncached[{page}]"] = lambda p=page: uncached.get_template(p).render(context)
+    return cases
+
+
+# ============= API CASES =============
+
+def api_cases(quick: bool, workdir: str) -> Tuple[Dict[str, Callable[[], object]], Callable[[], None]]:
+    """Build API cases against a synthetic SQLite dataset in `workdir`."""
+    n_products, n_days = (5, 180) if quick else (20, 730)
+    prepare_sqlite_dataset(os.path.join(workdir, "bench.db"), n_products, n_days)
+
+    from fastapi.testclient import TestClient
+    from database import engine
+    from main import app
+    from services.synthetic_data import product_names
+
+    client = TestClient(app)
+    client.__enter__()
+    token = client.post("/token", data={"username": "admin", "password": "admin123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    product = product_names(n_products)[0]
+
+    def call(method: str, url: str, **kwargs):
+        response = client.request(method, url, headers=headers, **kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    size = f"products={n_products},days={n_days}"
+    cases = {
+        f"api.forecast_create[{size}]": lambda: call("POST", "/api/forecast", json={"alpha": 0.3, "project_name": "bench"}),
+        f"api.forecast_create_one[{size}]": (
+            lambda: call("POST", "/api/forecast", json={"alpha": 0.3, "product_name": product, "project_name": "bench"})
+        ),
+        f"api.compare_alpha[{size}]": lambda: call("POST", "/api/forecast/compare-alpha", json={"product_name": product}),
+        f"api.compare_alpha_mape[{size}]": (
+            lambda: call("POST", "/api/forecast/compare-alpha?fields=mape", json={"product_name": product})
+        ),
+        f"api.sales_page[{size}]": lambda: call("GET", "/api/sales"),
+        f"api.sales_page_product[{size}]": lambda: call("GET", f"/api/sales?product_name={product}"),
+    }
+
+    def close():
+        client.__exit__(None, None, None)
+        engine.dispose()
+
+    return cases, close
+
+
+# ============= RUN / COMPARE =============
+
+def run(args) -> dict:
+    results: Dict[str, dict] = {}
+    repeats = 3 if args.quick else 5
+    min_time = 0.05 if args.quick else 0.2
+
+    def run_cases(cases: Dict[str, Callable[[], object]], case_min_time: float):
+        for name, func in cases.items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(func, repeats=repeats, min_time=case_min_time)
+            print(f"  {name:<55} {results[name]['median_s'] * 1000:>10.3f} ms")
+
+    if args.only in (None, "kernel"):
+        print("Kernel cases")
+        run_cases(kernel_cases(args.quick), min_time)
+
+    if args.only in (None, "render"):
+        print("Render cases")
+        run_cases(render_cases(), min_time)
+
+    if args.only in (None, "api"):
+        print("API cases")
+        with tempfile.TemporaryDirectory() as workdir:
+            cases, close = api_cases(args.quick, workdir)
+            try:
+                # Requests are slow enough that a handful of calls per sample is plenty
+                run_cases(cases, min_time / 4)
+            finally:
+                close()
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> Tuple[List[dict], List[str]]:
+    """
+    Compare medians case by case.
+
+    Returns (rows, regressions): one row per case present in both files with
+    its ratio and status ("regression", "improvement" or "ok"), and the names
+    of cases slower than baseline by more than `threshold` (0.1 = 10%).
+    """
+    rows, regressions = [], []
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline_s": base["median_s"], "current_s": cur["median_s"], "ratio": ratio, "status": status})
+    return rows, regressions
+
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows, regressions = compare_results(baseline, current, args.threshold)
+    print(f"{'case':<55} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for row in rows:
+        flag = {"regression": "  << REGRESSION", "improvement": "  (faster)"}.get(row["status"], "")
+        print(f"{row['name']:<55} {row['baseline_s'] * 1000:>12.3f} {row['current_s'] * 1000:>12.3f} {row['ratio']:>7.2f}{flag}")
+
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"\nNot in current run: {', '.join(missing)}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Forecast engine and API benchmark suite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    run_parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer samples")
+    run_parser.add_argument("--only", choices=("kernel", "render", "api"))
+    run_parser.add_argument("--filter", help="only run cases whose name contains this text")
+
+    compare_parser = sub.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return compare(args)
+
+    report = run(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(report['results'])} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
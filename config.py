@@ -1,5 +1,7 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -9,12 +11,68 @@ class Settings(BaseSettings):
     mysql_password: str = ""
     mysql_database: str = "sales_app"
 
+    # Full SQLAlchemy URL (e.g. sqlite:///./sales_app.db); overrides the MYSQL_* settings when set
+    database_url_override: Optional[str] = Field(None, validation_alias="DATABASE_URL")
+
+    # Engine tuning profile from database.DB_PROFILES: baseline, balanced, throughput, durable
+    db_profile: str = "balanced"
+
+    # Optional read replica for GET routes; clients that wrote within the window read from the primary
+    read_database_url: Optional[str] = None
+    read_your_writes_s: float = 5.0
+
+    # Create tables and seed default data when the app starts (otherwise run init_db.py once)
+    init_db_on_startup: bool = False
+
+    # Reuse stored forecast runs with identical inputs (series, alpha, horizon) instead of recomputing
+    forecast_dedup_enabled: bool = True
+
+    # Worker threads for POST /api/forecast/backtest (products are backtested in chunks)
+    backtest_jobs: int = 4
+
+    # Rows per server-side cursor fetch in constant-memory forecast streams
+    forecast_stream_batch_size: int = 5000
+
+    # Seconds the /dashboard, /forecasts and /chart stats snapshot is reused (0 = always query)
+    dashboard_cache_ttl_s: float = 10.0
+
+    # Jinja2 templates (services/templating.py): on-disk bytecode cache (None = system temp dir),
+    # recompile when a template file changes, compile every template at startup
+    template_bytecode_dir: Optional[str] = None
+    template_auto_reload: bool = True
+    template_precompile: bool = True
+
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
 
+    # Per-request phase timing (services/timing.py)
+    timing_enabled: bool = False
+    timing_server_header: bool = False
+    timing_slow_request_ms: float = 1000.0
+
+    # In-process Prometheus metrics served at /metrics
+    metrics_enabled: bool = True
+
+    # /health/ready thresholds; crossing any of them returns 503
+    ready_db_timeout_s: float = 1.0
+    ready_pool_saturation: float = 0.9
+    ready_loop_lag_ms: float = 250.0
+
+    # Group commit for POST /api/sales (services/write_buffer.py)
+    sale_write_buffer_enabled: bool = False
+    sale_write_batch_size: int = 100
+    sale_write_max_delay_ms: float = 5.0
+
+    # SQL statement instrumentation (database.py)
+    sql_instrumentation_enabled: bool = False
+    sql_slow_query_ms: float = 100.0
+    sql_repeat_threshold: int = 5
+
     @property
     def database_url(self) -> str:
+        if self.database_url_override:
+            return self.database_url_override
         return f"mysql+pymysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
 
     class Config:
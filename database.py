@@ -1,21 +1,147 @@
-from sqlalchemy import create_engine
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from config import get_settings
+from services.metrics import db_pool_checkout_wait, registry
+from services.timing import add_span
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+
+
+# Named performance profiles, selected with DB_PROFILE.
+#   pool:           create_engine pool options (QueuePool backends only)
+#   mysql_recycle:  seconds before a MySQL connection is recycled (stays under wait_timeout)
+#   sqlite_pragmas: PRAGMAs applied to every new SQLite connection
+DB_PROFILES: Dict[str, dict] = {
+    # SQLAlchemy defaults, no pragmas: what the app shipped with originally
+    "baseline": {
+        "pool": {},
+        "mysql_recycle": None,
+        "sqlite_pragmas": {},
+    },
+    # Default: WAL so readers never wait on the writer, modest pool, liveness checks
+    "balanced": {
+        "pool": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 10, "pool_pre_ping": True},
+        "mysql_recycle": 1800,
+        "sqlite_pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "cache_size": -65536,          # 64 MiB
+            "mmap_size": 268435456,        # 256 MiB
+            "temp_store": "MEMORY",
+        },
+    },
+    # Many concurrent requests: bigger pool and caches, no pre-ping round trip
+    "throughput": {
+        "pool": {"pool_size": 30, "max_overflow": 30, "pool_timeout": 5, "pool_pre_ping": False},
+        "mysql_recycle": 3600,
+        "sqlite_pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 10000,
+            "cache_size": -262144,         # 256 MiB
+            "mmap_size": 1073741824,       # 1 GiB
+            "temp_store": "MEMORY",
+        },
+    },
+    # Every commit fsynced; for hosts where losing the last transactions on power loss is unacceptable
+    "durable": {
+        "pool": {"pool_size": 5, "max_overflow": 5, "pool_timeout": 30, "pool_pre_ping": True},
+        "mysql_recycle": 1800,
+        "sqlite_pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "busy_timeout": 10000,
+        },
+    },
+}
+
+
+def metered_pool_class(label: str):
+    """QueuePool subclass that records checkout wait time under engine=`label`."""
+
+    class MeteredQueuePool(QueuePool):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                db_pool_checkout_wait.observe(time.perf_counter() - started, engine=label)
+
+    return MeteredQueuePool
+
+
+def is_sqlite_memory(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") == "sqlite:")
+
+
+def set_sqlite_pragmas(bind, pragmas: Dict[str, object]):
+    """Apply `pragmas` to every new DB-API connection of `bind`."""
+    if not pragmas:
+        return
+
+    @event.listens_for(bind, "connect")
+    def _apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_app_engine(url: str, profile: str = "balanced", label: str = "primary"):
+    """
+    Create an engine for `url` tuned by the named profile in DB_PROFILES.
+
+    File SQLite and MySQL get a metered QueuePool sized by the profile (MySQL also
+    gets pool_recycle); SQLite additionally gets the profile's PRAGMAs. In-memory
+    SQLite keeps SQLAlchemy's default pool and only non-journal pragmas.
+    """
+    if profile not in DB_PROFILES:
+        raise ValueError(f"Unknown DB profile '{profile}'. Choose from: {', '.join(DB_PROFILES)}")
+    options = DB_PROFILES[profile]
+
+    if url.startswith("sqlite"):
+        pragmas = dict(options["sqlite_pragmas"])
+        if is_sqlite_memory(url):
+            # WAL/mmap don't apply to in-memory databases
+            pragmas.pop("journal_mode", None)
+            pragmas.pop("mmap_size", None)
+            bind = create_engine(url, connect_args={"check_same_thread": False})
+        else:
+            bind = create_engine(
+                url,
+                connect_args={"check_same_thread": False},
+                poolclass=metered_pool_class(label),
+                **options["pool"]
+            )
+        set_sqlite_pragmas(bind, pragmas)
+        return bind
+
+    kwargs = dict(options["pool"])
+    if options["mysql_recycle"]:
+        kwargs["pool_recycle"] = options["mysql_recycle"]
+    return create_engine(url, poolclass=metered_pool_class(label), **kwargs)
+
+
 # Use SQLite for development, can be overridden by DATABASE_URL env var
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-# Create engine with connect_args for SQLite
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_app_engine(SQLALCHEMY_DATABASE_URL, settings.db_profile)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -29,3 +155,257 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ============= READ/WRITE ROUTING =============
+#
+# GET routes that only call read-only repository methods take `get_read_db`;
+# everything that writes keeps `get_db` and stays on the primary. Without
+# READ_DATABASE_URL both resolve to the primary engine.
+
+# Session key holding the time of the client's last successful write
+LAST_WRITE_KEY = "last_write_at"
+
+read_engine = engine
+ReadSessionLocal = SessionLocal
+
+
+def configure_read_engine(bind=None):
+    """Route read sessions to `bind` (None routes them back to the primary engine)."""
+    global read_engine, ReadSessionLocal
+    read_engine = bind if bind is not None else engine
+    ReadSessionLocal = (
+        sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+        if read_engine is not engine else SessionLocal
+    )
+
+
+def has_replica() -> bool:
+    return read_engine is not engine
+
+
+def wrote_recently(request: Request, window_s: float) -> bool:
+    """True if this client's last write is within `window_s` seconds (read-your-writes)."""
+    last_write = (request.scope.get("session") or {}).get(LAST_WRITE_KEY)
+    return last_write is not None and time.time() - last_write < window_s
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Dependency for read-only routes: a session on the read engine.
+
+    Falls back to the primary session (`db`, which is lazy and costs nothing
+    until used) when no replica is configured or the client wrote within the
+    read-your-writes window, so it sees its own changes despite replica lag.
+    """
+    if not has_replica() or wrote_recently(request, settings.read_your_writes_s):
+        yield db
+        return
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware stamping the session with the time of each successful write.
+
+    Must sit inside SessionMiddleware (added before it) so the stamp is saved
+    in the session cookie. Only stamps while a replica is configured.
+    """
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and has_replica()
+                and "session" in scope
+            ):
+                scope["session"][LAST_WRITE_KEY] = time.time()
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+if settings.read_database_url:
+    configure_read_engine(create_app_engine(settings.read_database_url, settings.db_profile, label="replica"))
+
+
+def pool_status(bind=None) -> dict:
+    """Point-in-time pool occupancy; empty for pools without a fixed size (SQLite in-memory)."""
+    pool = (bind or engine).pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() starts at -size and only goes positive once the pool is exhausted
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+
+
+def _pool_gauge(key: str):
+    def collect():
+        samples = []
+        binds = [("primary", engine)] + ([("replica", read_engine)] if has_replica() else [])
+        for label, bind in binds:
+            status = pool_status(bind)
+            if status:
+                samples.append((f"db_pool_{key}", {"engine": label}, status[key]))
+        return samples
+    return collect
+
+
+for _key, _help in (
+    ("size", "Configured pool size."),
+    ("checked_out", "Connections currently checked out."),
+    ("checked_in", "Idle connections in the pool."),
+    ("overflow", "Connections open beyond pool size."),
+):
+    registry.register_collector(f"db_pool_{_key}", _help, _pool_gauge(_key))
+
+
+# ============= QUERY INSTRUMENTATION =============
+
+def parameters_shape(parameters, executemany: bool = False) -> str:
+    """Describe bound parameters by type only (never values), e.g. '(str, int)' or '50 × (str, int)'."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)} × {parameters_shape(first)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+class QueryStats:
+    """Statements executed within one request (or one capture_queries block)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Counter = Counter()
+        self.slow: List[Tuple[str, float, str]] = []
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Identical statements run at least `threshold` times — the usual N+1 signature."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def format(self) -> str:
+        return "\n".join(f"  {n}× {sql}" for sql, n in self.statements.most_common())
+
+
+_current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+    add_span("db", elapsed_ms)
+
+    stats = _current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    if elapsed_ms > settings.sql_slow_query_ms:
+        logger.warning(
+            "Slow query (%.1fms): %s params=%s",
+            elapsed_ms, " ".join(statement.split()), parameters_shape(parameters, executemany)
+        )
+
+
+def instrument_engine(bind):
+    """Time every statement on `bind`: slow-query log, per-request QueryStats and the "db" timing span."""
+    if not event.contains(bind, "before_cursor_execute", _before_cursor_execute):
+        event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+        event.listen(bind, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect QueryStats for statements run in this context (and threadpool calls it spawns)."""
+    stats = QueryStats()
+    token = _current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+
+
+@contextmanager
+def capture_queries(bind=None) -> Iterator[QueryStats]:
+    """
+    Collect QueryStats for every statement executed on `bind` from any thread
+    while the block runs. Independent of instrument_engine; meant for tests.
+    """
+    bind = bind or engine
+    stats = QueryStats()
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("capture_start_time", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        stats.record(statement, (time.perf_counter() - conn.info["capture_start_time"].pop()) * 1000)
+
+    event.listen(bind, "before_cursor_execute", before)
+    event.listen(bind, "after_cursor_execute", after)
+    try:
+        yield stats
+    finally:
+        event.remove(bind, "before_cursor_execute", before)
+        event.remove(bind, "after_cursor_execute", after)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that tracks queries per HTTP request and flags repeated statements."""
+
+    def __init__(self, app, repeat_threshold: int = 5):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send)
+
+        for statement, n in stats.repeated(self.repeat_threshold):
+            logger.warning(
+                "Possible N+1 in %s %s: %d× %s",
+                scope.get("method"), scope.get("path"), n, " ".join(statement.split())
+            )
+        logger.debug(
+            "%s %s issued %d queries in %.1fms",
+            scope.get("method"), scope.get("path"), stats.count, stats.total_ms
+        )
+
+
+if settings.sql_instrumentation_enabled:
+    instrument_engine(engine)
+    if has_replica():
+        instrument_engine(read_engine)
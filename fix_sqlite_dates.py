@@ -2,10 +2,16 @@
 """
 Fix SQLite date format from "DD-Mon-YY" to "YYYY-MM-DD"
 Run this before migrating to MySQL, or use migrate_to_mysql.py directly
+
+Usage:
+    python fix_sqlite_dates.py --dry-run          # count rows that would change
+    python fix_sqlite_dates.py --chunk-size 50000
 """
 
+import argparse
 import sqlite3
-from datetime import datetime
+import time
+from typing import Callable, Tuple
 
 DB_PATH = 'sales_app.db'
 
@@ -39,52 +45,72 @@ def parse_date(date_str: str) -> str | None:
     return date_str
 
 
-def fix_sales():
+# Rows still to fix: anything that is not already YYYY-MM-DD
+NOT_ISO = "NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+
+
+def fix_column(
+    conn: sqlite3.Connection,
+    table: str,
+    column: str,
+    chunk_size: int = 10_000,
+    dry_run: bool = False,
+    log: Callable[[str], None] = print
+) -> Tuple[int, int]:
+    """
+    Rewrite non-ISO dates in `table.column`, one chunk of ids per transaction.
+
+    Only rows that are not already ISO are read (keyset on id, so rows that
+    cannot be parsed are skipped rather than re-read). Each chunk is parsed in
+    Python and applied with one executemany() and a commit, so the write lock
+    is held for one chunk at a time. With `dry_run` nothing is written.
+
+    Returns:
+        (scanned, updated): non-ISO rows read and rows changed (or that would be)
+    """
+    select = (
+        f"SELECT id, {column} FROM {table} "
+        f"WHERE id > ? AND {column} IS NOT NULL AND {column} {NOT_ISO} ORDER BY id LIMIT ?"
+    )
+    update = f"UPDATE {table} SET {column} = ? WHERE id = ?"
+    last_id, scanned, updated = 0, 0, 0
+    started = time.perf_counter()
+
+    while True:
+        rows = conn.execute(select, (last_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        changes = [(new, row_id) for row_id, old in rows if (new := parse_date(old)) != old]
+        if changes and not dry_run:
+            conn.executemany(update, changes)
+            conn.commit()
+
+        scanned += len(rows)
+        updated += len(changes)
+        elapsed = time.perf_counter() - started
+        log(f"  {table}.{column}: {updated:,} rows {'to update' if dry_run else 'updated'} "
+            f"({scanned / elapsed if elapsed else 0:,.0f} rows/s)")
+
+    return scanned, updated
+
+
+def fix_sales(conn: sqlite3.Connection, chunk_size: int, dry_run: bool) -> int:
     print("Fixing sales table...")
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # Get all sales
-    cur.execute("SELECT id, date FROM sales")
-    sales = cur.fetchall()
-
-    updated = 0
-    for sale_id, date_str in sales:
-        new_date = parse_date(date_str)
-        if new_date != date_str:
-            cur.execute("UPDATE sales SET date = ? WHERE id = ?", (new_date, sale_id))
-            updated += 1
-            print(f"  Sale {sale_id}: {date_str} -> {new_date}")
+    _, updated = fix_column(conn, "sales", "date", chunk_size, dry_run)
+    print(f"✅ {'Would update' if dry_run else 'Updated'} {updated} sales records\n")
+    return updated
 
-    conn.commit()
-    conn.close()
-    print(f"✅ Updated {updated} sales records\n")
 
-
-def fix_forecasts():
+def fix_forecasts(conn: sqlite3.Connection, chunk_size: int, dry_run: bool) -> int:
     print("Fixing forecasts table...")
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("SELECT id, next_period_date FROM forecasts WHERE next_period_date IS NOT NULL")
-    forecasts = cur.fetchall()
-
-    updated = 0
-    for forecast_id, date_str in forecasts:
-        new_date = parse_date(date_str)
-        if new_date != date_str:
-            cur.execute("UPDATE forecasts SET next_period_date = ? WHERE id = ?", (new_date, forecast_id))
-            updated += 1
-            print(f"  Forecast {forecast_id}: {date_str} -> {new_date}")
+    _, updated = fix_column(conn, "forecasts", "next_period_date", chunk_size, dry_run)
+    print(f"✅ {'Would update' if dry_run else 'Updated'} {updated} forecast records\n")
+    return updated
 
-    conn.commit()
-    conn.close()
-    print(f"✅ Updated {updated} forecast records\n")
 
-
-def verify():
+def verify(conn: sqlite3.Connection):
     print("Verifying dates...")
-    conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
 
     cur.execute("SELECT date FROM sales LIMIT 5")
@@ -92,19 +118,36 @@ def verify():
     for row in cur.fetchall():
         print(f"  {row[0]}")
 
-    conn.close()
+    cur.execute(f"SELECT COUNT(*) FROM sales WHERE date {NOT_ISO}")
+    print(f"Non-ISO sales dates left: {cur.fetchone()[0]}")
 
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description="Convert DD-Mon-YY dates in the SQLite database to YYYY-MM-DD.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file to fix")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows that would change")
+    args = parser.parse_args()
+
     print("=" * 50)
-    print("SQLite Date Format Fixer")
+    print("SQLite Date Format Fixer" + (" (dry run)" if args.dry_run else ""))
     print("=" * 50 + "\n")
 
-    fix_sales()
-    fix_forecasts()
-    verify()
-
+    conn = sqlite3.connect(args.db, timeout=60)
+    try:
+        fix_sales(conn, args.chunk_size, args.dry_run)
+        fix_forecasts(conn, args.chunk_size, args.dry_run)
+        verify(conn)
+    finally:
+        conn.close()
+
+    if args.dry_run:
+        return
     print("\n✅ All dates converted to ISO format (YYYY-MM-DD)")
     print("\nNow you can:")
     print("  1. Test with SQLite: uvicorn main:app --reload")
     print("  2. Or migrate to MySQL: python migrate_to_mysql.py")
+
+
+if __name__ == "__main__":
+    main()
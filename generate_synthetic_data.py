@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Generate a large synthetic sales dataset for load testing and benchmarks.
+
+Examples:
+    python generate_synthetic_data.py --products 100 --days 730
+    DATABASE_URL=sqlite:///./bench.db python generate_synthetic_data.py --products 10000 --days 1000 --seed 7
+"""
+import argparse
+from datetime import date
+
+from database import Base, SessionLocal, engine
+from services.seed_service import SeedService
+from services.synthetic_data import DEFAULT_START, SHAPE_DEFAULTS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic daily sales (N products × M days).")
+    parser.add_argument("--products", type=int, required=True, help="number of products")
+    parser.add_argument("--days", type=int, required=True, help="number of days per product")
+    parser.add_argument("--start", type=date.fromisoformat, default=DEFAULT_START, help="first date (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="rows per INSERT/commit")
+    parser.add_argument("--prefix", default="Synthetic", help="product name prefix")
+    parser.add_argument("--replace", action="store_true", help="delete all existing sales first")
+    for key, value in SHAPE_DEFAULTS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.replace:
+            from repositories.sale_repository import SaleRepository
+            print(f"Deleted {SaleRepository(db).delete_all()} existing sales")
+
+        def progress(rows, elapsed):
+            print(f"\r  {rows:,} rows  {rows / elapsed:,.0f} rows/s", end="", flush=True)
+
+        total = args.products * args.days
+        print(f"Generating up to {total:,} sales ({args.products:,} products × {args.days:,} days, seed {args.seed})")
+        inserted = SeedService(db).seed_synthetic(
+            args.products, args.days,
+            start=args.start, seed=args.seed, chunk_rows=args.chunk_rows, prefix=args.prefix,
+            progress=progress,
+            **{key: getattr(args, key) for key in SHAPE_DEFAULTS}
+        )
+        print(f"\nDone: {inserted:,} sales inserted")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Create the database schema and seed default data.
+
+The app no longer does this on every start (set INIT_DB_ON_STARTUP=true to
+restore that); run it once per new database, and again after adding models.
+
+Usage:
+    python init_db.py            # tables + default users, products and May sales
+    python init_db.py --no-seed  # tables only
+    python init_db.py --no-seed --rebuild-projects  # recompute forecast_projects from forecasts
+"""
+import argparse
+
+from services.seed_service import init_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create tables and seed default data.")
+    parser.add_argument("--no-seed", action="store_true", help="only create missing tables")
+    parser.add_argument("--rebuild-projects", action="store_true", help="recompute the forecast_projects summary table")
+    args = parser.parse_args()
+
+    init_database(seed=not args.no_seed, rebuild_projects=args.rebuild_projects)
+    print("Tables created" + ("" if args.no_seed else " and default data seeded")
+          + (", forecast projects rebuilt" if args.rebuild_projects else ""))
+
+
+if __name__ == "__main__":
+    main()
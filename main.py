@@ -1,27 +1,30 @@
+from typing import Optional
 from fastapi import FastAPI, Request, Depends, HTTPException, status, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from jinja2 import Environment, FileSystemLoader
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse, JSONResponse
 from starlette.middleware.sessions import SessionMiddleware
 from sqlalchemy.orm import Session
 
-from database import engine, Base, get_db
+from database import get_db, get_read_db, QueryStatsMiddleware, ReadYourWritesMiddleware
 from api import auth, sales, products, forecasts
-from services.seed_service import SeedService
+from services.seed_service import init_database
 from services.auth_service import (
     create_session, get_session_user, clear_session,
     is_authenticated, is_admin, verify_password
 )
 from repositories.user_repository import UserRepository
+from services.timing import TimingMiddleware, TimedJSONResponse, phase_histograms
+from services.metrics import MetricsMiddleware, registry as metrics_registry
+from services.health import check_readiness, register_component
+from services.templating import create_template_env, precompile
+from services.dashboard_service import dashboard_snapshot
+from api.sales import sale_write_buffer
 import models
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Initialize FastAPI app
-app = FastAPI(title="Depot Jawara SES Forecasting API")
+app = FastAPI(title="Depot Jawara SES Forecasting API", default_response_class=TimedJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -35,6 +38,12 @@ app.add_middleware(
 # Add session middleware
 from config import get_settings
 settings = get_settings()
+
+# Stamps the session on writes so the read-your-writes window can pin reads to the primary;
+# added before SessionMiddleware so it runs inside it
+if settings.read_your_writes_s > 0:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 app.add_middleware(
     SessionMiddleware,
     secret_key=settings.secret_key,
@@ -43,9 +52,30 @@ app.add_middleware(
     same_site="lax",
 )
 
+# Request latency histograms for /metrics
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Per-request SQL statement tracking (N+1 detection); engine hooks live in database.py
+if settings.sql_instrumentation_enabled:
+    app.add_middleware(QueryStatsMiddleware, repeat_threshold=settings.sql_repeat_threshold)
+
+# Per-request phase timing; not installed at all unless enabled
+if settings.timing_enabled:
+    app.add_middleware(
+        TimingMiddleware,
+        server_timing_header=settings.timing_server_header,
+        slow_request_ms=settings.timing_slow_request_ms,
+    )
+
 # Setup templates and static files
-# cache_size=0 works around a Python 3.14 weakref hashability bug in Jinja2's LRU cache
-_jinja_env = Environment(loader=FileSystemLoader("templates"), cache_size=0)
+# Compiled templates are cached in a plain dict (Jinja2's weakref-keyed LRU breaks on Python 3.14)
+# and their bytecode on disk; see services/templating.py
+_jinja_env = create_template_env(
+    "templates",
+    bytecode_dir=settings.template_bytecode_dir,
+    auto_reload=settings.template_auto_reload,
+)
 templates = Jinja2Templates(env=_jinja_env)
 
 # Custom Jinja filter for date formatting
@@ -76,6 +106,26 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: DB round trip, pool saturation, event-loop lag and background components (503 if any fail)."""
+    ready, report = await check_readiness(
+        db_timeout_s=settings.ready_db_timeout_s,
+        pool_saturation=settings.ready_pool_saturation,
+        loop_lag_ms=settings.ready_loop_lag_ms,
+    )
+    return JSONResponse(
+        {"status": "ok" if ready else "unavailable", **report},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text-format metrics (request latency, forecast kernels, DB pool, caches)."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/debug/session")
 async def debug_session(request: Request):
     """Debug endpoint to check session state."""
@@ -88,16 +138,31 @@ async def debug_session(request: Request):
     }
 
 
-# Startup event - seed initial data
+@app.get("/debug/timings")
+def debug_timings():
+    """Per-route phase timing histograms (empty unless TIMING_ENABLED)."""
+    return {"enabled": settings.timing_enabled, "routes": phase_histograms.snapshot()}
+
+
+# Startup event - schema and seed data are opt-in (see init_db.py)
 @app.on_event("startup")
 async def startup_event():
-    """Seed initial data on application startup."""
-    db: Session = next(get_db())
-    try:
-        seed_service = SeedService(db)
-        seed_service.seed_all()
-    finally:
-        db.close()
+    """Create tables and seed initial data when INIT_DB_ON_STARTUP is set; compile the templates."""
+    if settings.init_db_on_startup:
+        init_database()
+    if settings.template_precompile:
+        precompile(templates.env)
+
+
+if sale_write_buffer is not None:
+    register_component("sale_write_buffer", sale_write_buffer.status)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Commit any buffered sales before the process exits."""
+    if sale_write_buffer is not None:
+        await sale_write_buffer.close()
 
 
 # ============= TEMPLATE ROUTES =============
@@ -173,7 +238,7 @@ async def legacy_owner_redirect(request: Request):
 # ============= DASHBOARD ROUTES =============
 
 @app.get("/dashboard")
-async def dashboard(request: Request, db: Session = Depends(get_db)):
+async def dashboard(request: Request, primary_db: Session = Depends(get_db)):
     """Admin dashboard page."""
     if not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
@@ -182,26 +247,14 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
     if user.get("role") != "admin":
         return RedirectResponse(url="/forecasts", status_code=302)
 
-    from repositories.product_repository import ProductRepository
-    from repositories.sale_repository import SaleRepository
-    from repositories.forecast_repository import ForecastRepository
-
-    product_repo = ProductRepository(db)
-    sale_repo = SaleRepository(db)
-    forecast_repo = ForecastRepository(db)
-
     return templates.TemplateResponse(request, "dashboard.html", {
         "user": user,
-        "total_products": product_repo.count(),
-        "total_sales": sale_repo.count(),
-        "total_forecasts": forecast_repo.count(),
-        "recent_sales": sale_repo.get_recent(limit=10),
-        "projects": forecast_repo.get_project_summaries()
+        **dashboard_snapshot.get(primary_db)
     })
 
 
 @app.get("/products")
-async def products(request: Request, db: Session = Depends(get_db)):
+async def products(request: Request, db: Session = Depends(get_read_db)):
     """Product management page."""
     if not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
@@ -220,8 +273,8 @@ async def products(request: Request, db: Session = Depends(get_db)):
 
 
 @app.get("/sales")
-async def sales(request: Request, db: Session = Depends(get_db)):
-    """Sales management page."""
+async def sales(request: Request, cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Sales management page (first page server-rendered, later pages loaded via /api/sales)."""
     if not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
 
@@ -231,18 +284,26 @@ async def sales(request: Request, db: Session = Depends(get_db)):
 
     from repositories.product_repository import ProductRepository
     from repositories.sale_repository import SaleRepository
+    from repositories.base import DEFAULT_PAGE_SIZE
     product_repo = ProductRepository(db)
     sale_repo = SaleRepository(db)
 
+    try:
+        page, next_cursor = sale_repo.get_page(limit=DEFAULT_PAGE_SIZE, cursor=cursor)
+    except ValueError:
+        # Stale or hand-edited cursor: start again from the newest sales
+        page, next_cursor = sale_repo.get_page(limit=DEFAULT_PAGE_SIZE)
+
     return templates.TemplateResponse(request, "sales.html", {
         "user": user,
         "products": product_repo.get_all(),
-        "sales": sale_repo.get_all()
+        "sales": page,
+        "next_cursor": next_cursor
     })
 
 
 @app.get("/forecast")
-async def forecast(request: Request, db: Session = Depends(get_db)):
+async def forecast(request: Request, db: Session = Depends(get_read_db)):
     """Forecast calculator page."""
     if not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
@@ -261,7 +322,7 @@ async def forecast(request: Request, db: Session = Depends(get_db)):
 
 
 @app.get("/forecast/compare")
-async def forecast_compare(request: Request, db: Session = Depends(get_db)):
+async def forecast_compare(request: Request, db: Session = Depends(get_read_db)):
     """Compare-all-alphas page."""
     if not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
@@ -280,7 +341,11 @@ async def forecast_compare(request: Request, db: Session = Depends(get_db)):
 
 
 @app.get("/forecasts")
-async def forecasts(request: Request, db: Session = Depends(get_db)):
+async def forecasts(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    primary_db: Session = Depends(get_db)
+):
     """View forecasts page."""
     if not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
@@ -289,59 +354,42 @@ async def forecasts(request: Request, db: Session = Depends(get_db)):
     from repositories.forecast_repository import ForecastRepository
     forecast_repo = ForecastRepository(db)
 
+    snapshot = dashboard_snapshot.get(primary_db)
+
     return templates.TemplateResponse(request, "forecasts.html", {
         "user": user,
         "latest_forecasts": forecast_repo.get_latest(),
-        "projects": forecast_repo.get_project_summaries(),
-        "total_forecasts": forecast_repo.count()
+        "projects": snapshot["projects"],
+        "total_forecasts": snapshot["total_forecasts"]
     })
 
 
 @app.get("/chart")
-async def chart(request: Request, db: Session = Depends(get_db)):
+async def chart(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    primary_db: Session = Depends(get_db)
+):
     """Forecast chart page."""
     if not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
 
     user = get_session_user(request)
     from repositories.forecast_repository import ForecastRepository
-    import json
-
-    forecast_repo = ForecastRepository(db)
 
-    # Get latest forecasts and convert to dict for JSON serialization
-    latest = forecast_repo.get_all_ordered()
-    latest_dicts = []
-    for f in latest:
-        # Parse calculation_steps - might be JSON string or dict
-        steps_data = f.calculation_steps
-        if isinstance(steps_data, str):
-            steps_data = json.loads(steps_data)
-
-        steps = steps_data.get("steps", []) if isinstance(steps_data, dict) else (steps_data if isinstance(steps_data, list) else [])
-
-        dates = [step.get("date") for step in steps]
-        actuals = [step.get("actual") for step in steps]
-        forecasts = [step.get("forecast") for step in steps]
-
-        latest_dicts.append({
-            "id": f.id,
-            "project_name": f.project_name,
-            "product_name": f.product_name,
-            "next_period_forecast": f.next_period_forecast,
-            "next_period_date": f.next_period_date.isoformat() if f.next_period_date else None,
-            "alpha": f.alpha,
-            "mape": f.mape,
-            "created_at": f.created_at.isoformat() if f.created_at else None,
-            "dates": dates,
-            "actuals": actuals,
-            "forecasts": forecasts
-        })
+    # Only the forecast list is inlined; the page fetches (downsampled) series from
+    # /api/forecast/chart-series for the forecasts it actually shows
+    latest_dicts = [{
+        "id": f.id,
+        "project_name": f.project_name,
+        "product_name": f.product_name,
+        "created_at": f.created_at.isoformat() if f.created_at else None
+    } for f in ForecastRepository(db).get_all_ordered(include_steps=False)]
 
     return templates.TemplateResponse(request, "chart.html", {
         "user": user,
         "latest_forecasts": latest_dicts,
-        "projects": forecast_repo.get_project_summaries()
+        "projects": dashboard_snapshot.get(primary_db)["projects"]
     })
 
 
@@ -28,6 +28,19 @@ def migrate():
         else:
             print("Column next_period_date already exists.")
 
+        # Link to the content-addressed forecast_results table (the table itself comes from init_db.py)
+        if 'result_id' not in columns:
+            print("Adding result_id column to forecasts table...")
+            cursor.execute("ALTER TABLE forecasts ADD COLUMN result_id INTEGER REFERENCES forecast_results (id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_forecasts_result_id ON forecasts (result_id)")
+            conn.commit()
+
+        # Composite indexes used by keyset pagination (create_all only adds them to new tables)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_sales_date_id ON sales (date, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_forecasts_created_at_id ON forecasts (created_at, id)")
+        conn.commit()
+        print("Pagination indexes ensured.")
+
         # Check all tables are created
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
         tables = [row[0] for row in cursor.fetchall()]
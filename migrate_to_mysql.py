@@ -2,15 +2,109 @@
 """
 Migration script: SQLite to MySQL with date format conversion
 Converts dates from "DD-Mon-YY" format to proper DATE type
+
+Tables are streamed in id order with fetchmany() and written with
+executemany(), one transaction per chunk. Secondary indexes are created only
+after a table is fully loaded, and tables are copied in parallel; foreign keys
+are added once every table is in.
+Progress is checkpointed to a JSON file; after a failure, rerun with --resume
+and each table continues after the highest id already in the target.
+
+Usage:
+    python migrate_to_mysql.py                             # target = DATABASE_URL / MYSQL_* settings
+    python migrate_to_mysql.py --resume                    # continue an interrupted run
+    python migrate_to_mysql.py --target sqlite:///copy.db  # SQLite target (used by the tests)
 """
 
+import argparse
+import json
+import os
 import sqlite3
-import pymysql
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 from config import get_settings
 
 settings = get_settings()
 
+DEFAULT_CHECKPOINT = ".migrate_checkpoint.json"
+
+# Column definitions per table (MySQL types; SQLite accepts the same names).
+# The primary key is always `id`; secondary indexes are created after the load.
+TABLES: Dict[str, dict] = {
+    "users": {
+        "columns": [
+            ("username", "VARCHAR(50) UNIQUE NOT NULL"),
+            ("hashed_password", "VARCHAR(255)"),
+            ("role", "VARCHAR(20)"),
+        ],
+        "indexes": [("idx_username", "username")],
+    },
+    "products": {
+        "columns": [
+            ("name", "VARCHAR(100) UNIQUE NOT NULL"),
+            ("created_at", "DATETIME"),
+        ],
+        "indexes": [("idx_name", "name")],
+    },
+    "sales": {
+        "columns": [
+            ("date", "DATE NOT NULL"),
+            ("product_name", "VARCHAR(100) NOT NULL"),
+            ("qty", "INT NOT NULL"),
+        ],
+        "indexes": [("idx_date", "date"), ("idx_date_id", "date, id"), ("idx_product", "product_name")],
+        "date_columns": ["date"],
+    },
+    "forecasts": {
+        "columns": [
+            ("project_name", "VARCHAR(100)"),
+            ("created_at", "DATETIME NOT NULL"),
+            ("created_by", "INT"),
+            ("alpha", "FLOAT"),
+            ("product_name", "VARCHAR(100)"),
+            ("next_period_forecast", "FLOAT"),
+            ("next_period_date", "DATE"),
+            ("mape", "FLOAT"),
+            ("calculation_steps", "JSON"),
+            ("result_id", "INT"),
+        ],
+        "indexes": [
+            ("idx_project", "project_name"), ("idx_created_at_id", "created_at, id"), ("idx_result_id", "result_id")
+        ],
+        "date_columns": ["next_period_date"],
+        # Added by migrate() once every table, users and forecast_results included, is loaded
+        "foreign_keys": [
+            ("fk_forecasts_created_by", "created_by", "users(id)"),
+            ("fk_forecasts_result_id", "result_id", "forecast_results(id)"),
+        ],
+    },
+    "forecast_results": {
+        "columns": [
+            ("input_hash", "CHAR(64) UNIQUE NOT NULL"),
+            ("created_at", "DATETIME"),
+            ("mape", "FLOAT"),
+            ("next_period_forecast", "FLOAT"),
+            ("calculation_steps", "JSON"),
+        ],
+        "indexes": [],
+    },
+    "forecast_projects": {
+        "columns": [
+            ("name", "VARCHAR(100) UNIQUE NOT NULL"),
+            ("created_at", "DATETIME"),
+            ("created_by", "VARCHAR(50)"),
+            ("alpha", "FLOAT"),
+            ("forecast_count", "INT NOT NULL"),
+            ("mape_sum", "FLOAT NOT NULL"),
+            ("mape_count", "INT NOT NULL"),
+        ],
+        "indexes": [],
+    },
+}
+
+
 # Parse DD-Mon-YY format (e.g., "31-May-25")
 def parse_date(date_str: str) -> str | None:
     if not date_str:
@@ -62,156 +156,257 @@ def parse_mysql_url(url: str):
     return user, password, host, database
 
 
-def migrate():
-    print("Starting migration: SQLite -> MySQL")
-
-    # SQLite connection
-    sqlite_conn = sqlite3.connect('sales_app.db')
-    sqlite_conn.row_factory = sqlite3.Row
-    sqlite_cur = sqlite_conn.cursor()
-
-    # Parse MySQL URL
-    user, password, host, database = parse_mysql_url(settings.database_url)
-    print(f"\nConnecting to MySQL: {user}@{host}/{database}")
-
-    # MySQL connection
-    mysql_conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        charset='utf8mb4'
-    )
-    mysql_cur = mysql_conn.cursor()
-
-    # Create database if not exists
-    mysql_cur.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
-    mysql_cur.execute(f"USE {database}")
-
-    # Drop existing tables if any
-    print("Dropping existing MySQL tables...")
-    tables = ['forecasts', 'sales', 'products', 'users']
-    for table in tables:
-        mysql_cur.execute(f"DROP TABLE IF EXISTS {table}")
-    mysql_conn.commit()
-
-    # Create tables with proper schema
-    print("Creating MySQL tables...")
-
-    mysql_cur.execute("""
-        CREATE TABLE users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            username VARCHAR(50) UNIQUE NOT NULL,
-            hashed_password VARCHAR(255),
-            role VARCHAR(20),
-            INDEX idx_username (username)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    """)
-
-    mysql_cur.execute("""
-        CREATE TABLE products (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            name VARCHAR(100) UNIQUE NOT NULL,
-            created_at DATETIME,
-            INDEX idx_name (name)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    """)
-
-    mysql_cur.execute("""
-        CREATE TABLE sales (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            date DATE NOT NULL,
-            product_name VARCHAR(100) NOT NULL,
-            qty INT NOT NULL,
-            INDEX idx_date (date),
-            INDEX idx_product (product_name)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    """)
-
-    mysql_cur.execute("""
-        CREATE TABLE forecasts (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            project_name VARCHAR(100),
-            created_at DATETIME NOT NULL,
-            created_by INT,
-            alpha FLOAT,
-            product_name VARCHAR(100),
-            next_period_forecast FLOAT,
-            next_period_date DATE,
-            mape FLOAT,
-            calculation_steps JSON,
-            INDEX idx_project (project_name),
-            FOREIGN KEY (created_by) REFERENCES users(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    """)
-
-    mysql_conn.commit()
-
-    # Migrate Users
-    print("Migrating users...")
-    sqlite_cur.execute("SELECT * FROM users")
-    users = sqlite_cur.fetchall()
-    for user in users:
-        mysql_cur.execute(
-            "INSERT INTO users (id, username, hashed_password, role) VALUES (%s, %s, %s, %s)",
-            (user['id'], user['username'], user['hashed_password'], user['role'])
-        )
-    mysql_conn.commit()
-    print(f"  Migrated {len(users)} users")
-
-    # Migrate Products
-    print("Migrating products...")
-    sqlite_cur.execute("SELECT * FROM products")
-    products = sqlite_cur.fetchall()
-    for product in products:
-        mysql_cur.execute(
-            "INSERT INTO products (id, name, created_at) VALUES (%s, %s, %s)",
-            (product['id'], product['name'], product['created_at'])
-        )
-    mysql_conn.commit()
-    print(f"  Migrated {len(products)} products")
-
-    # Migrate Sales with date conversion
-    print("Migrating sales (converting dates)...")
-    sqlite_cur.execute("SELECT * FROM sales")
-    sales = sqlite_cur.fetchall()
-    converted = 0
-    for sale in sales:
-        new_date = parse_date(sale['date'])
-        if new_date != sale['date']:
-            converted += 1
-        mysql_cur.execute(
-            "INSERT INTO sales (id, date, product_name, qty) VALUES (%s, %s, %s, %s)",
-            (sale['id'], new_date, sale['product_name'], sale['qty'])
-        )
-    mysql_conn.commit()
-    print(f"  Migrated {len(sales)} sales ({converted} dates converted)")
-
-    # Migrate Forecasts
-    print("Migrating forecasts...")
-    sqlite_cur.execute("SELECT * FROM forecasts")
-    forecasts = sqlite_cur.fetchall()
-    converted_forecast = 0
-    for forecast in forecasts:
-        new_date = parse_date(forecast['next_period_date']) if forecast['next_period_date'] else None
-        if new_date and new_date != forecast['next_period_date']:
-            converted_forecast += 1
-        mysql_cur.execute(
-            """INSERT INTO forecasts (id, project_name, created_at, created_by, alpha, product_name,
-               next_period_forecast, next_period_date, mape, calculation_steps)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (forecast['id'], forecast['project_name'], forecast['created_at'],
-             forecast['created_by'], forecast['alpha'], forecast['product_name'],
-             forecast['next_period_forecast'], new_date, forecast['mape'],
-             forecast['calculation_steps'])
+# ============= CONNECTIONS =============
+
+def connect_target(url: str, create_database: bool = False):
+    """Open a DB-API connection to the target; returns (connection, dialect)."""
+    if url.startswith("sqlite"):
+        conn = sqlite3.connect(url.split("///", 1)[1], timeout=60, check_same_thread=False)
+        return conn, "sqlite"
+
+    import pymysql
+    user, password, host, database = parse_mysql_url(url)
+    conn = pymysql.connect(host=host, user=user, password=password, charset="utf8mb4")
+    cur = conn.cursor()
+    if create_database:
+        cur.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    cur.execute(f"USE {database}")
+    # Bulk-load session: skip per-row unique/FK checks (the data comes from a consistent source)
+    cur.execute("SET unique_checks = 0")
+    cur.execute("SET foreign_key_checks = 0")
+    return conn, "mysql"
+
+
+def placeholder(dialect: str) -> str:
+    return "?" if dialect == "sqlite" else "%s"
+
+
+def create_table_sql(table: str, dialect: str) -> str:
+    spec = TABLES[table]
+    pk = "id INTEGER PRIMARY KEY" if dialect == "sqlite" else "id INT AUTO_INCREMENT PRIMARY KEY"
+    columns = ",\n    ".join([pk] + [f"{name} {ddl}" for name, ddl in spec["columns"]])
+    suffix = "" if dialect == "sqlite" else " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+    return f"CREATE TABLE {table} (\n    {columns}\n){suffix}"
+
+
+def create_index_statements(table: str, dialect: str) -> List[str]:
+    spec = TABLES[table]
+    if dialect == "sqlite":
+        return [f"CREATE INDEX {name} ON {table} ({cols})" for name, cols in spec["indexes"]]
+    # One ALTER so InnoDB builds all secondary indexes in a single pass over the table
+    return [f"ALTER TABLE {table} " + ", ".join(f"ADD INDEX {name} ({cols})" for name, cols in spec["indexes"])]
+
+
+def foreign_key_statements(table: str, dialect: str) -> List[str]:
+    foreign_keys = TABLES[table].get("foreign_keys", [])
+    if dialect == "sqlite" or not foreign_keys:
+        # SQLite cannot add foreign keys after the fact; it does not enforce them by default anyway
+        return []
+    parts = [f"ADD CONSTRAINT {name} FOREIGN KEY ({col}) REFERENCES {ref}" for name, col, ref in foreign_keys]
+    return [f"ALTER TABLE {table} " + ", ".join(parts)]
+
+
+# ============= CHECKPOINT =============
+
+class Checkpoint:
+    """Per-table progress saved as JSON after every chunk (atomic replace)."""
+
+    def __init__(self, path: str, state: Optional[dict] = None):
+        self.path = path
+        self.state = state or {"schema_created": False, "tables": {}}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        with open(path) as f:
+            return cls(path, json.load(f))
+
+    def table(self, name: str) -> dict:
+        return self.state["tables"].setdefault(
+            name, {"last_id": 0, "rows": 0, "loaded": False, "indexed": False, "constrained": False}
         )
-    mysql_conn.commit()
-    print(f"  Migrated {len(forecasts)} forecasts ({converted_forecast} dates converted)")
 
-    # Close connections
-    sqlite_conn.close()
-    mysql_conn.close()
+    def update(self, name: str, **values):
+        with self._lock:
+            self.table(name).update(values)
+            self.save()
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+# ============= COPY =============
+
+def copy_table(
+    table: str,
+    source_path: str,
+    target_url: str,
+    checkpoint: Checkpoint,
+    chunk_size: int,
+    log: Callable[[str], None] = print
+) -> int:
+    """Stream one table into the target in id order; returns rows copied by this call."""
+    spec = TABLES[table]
+    columns = ["id"] + [name for name, _ in spec["columns"]]
+    date_indexes = [columns.index(c) for c in spec.get("date_columns", [])]
+
+    source = sqlite3.connect(source_path)
+    target, dialect = connect_target(target_url)
+    try:
+        state = checkpoint.table(table)
+        if not source.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+            # Older databases predate this table (forecast_projects: rebuild with init_db.py --rebuild-projects)
+            log(f"  {table}: not in source, skipped")
+            checkpoint.update(table, loaded=True, indexed=True)
+            return 0
+        if not state["loaded"]:
+            # The target is the source of truth for progress: every chunk commits before the
+            # checkpoint is written, so a crash in between must not re-insert that chunk
+            cur = target.cursor()
+            cur.execute(f"SELECT MAX(id) FROM {table}")
+            last_id = max(state["last_id"], cur.fetchone()[0] or 0)
+
+            marks = ", ".join([placeholder(dialect)] * len(columns))
+            insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({marks})"
+            # Columns added after the source database was created are copied as NULL
+            present = {row[1] for row in source.execute(f"PRAGMA table_info({table})")}
+            select_list = ", ".join(c if c in present else f"NULL AS {c}" for c in columns)
+            reader = source.execute(f"SELECT {select_list} FROM {table} WHERE id > ? ORDER BY id", (last_id,))
+
+            copied, started = 0, time.perf_counter()
+            while True:
+                rows = reader.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if date_indexes:
+                    rows = [list(row) for row in rows]
+                    for row in rows:
+                        for i in date_indexes:
+                            row[i] = parse_date(row[i])
+                cur.executemany(insert, rows)
+                target.commit()
+
+                copied += len(rows)
+                checkpoint.update(table, last_id=rows[-1][0], rows=state["rows"] + len(rows))
+                elapsed = time.perf_counter() - started
+                log(f"  {table}: {state['rows']:,} rows ({copied / elapsed:,.0f} rows/s)")
+
+            checkpoint.update(table, loaded=True)
+        else:
+            copied = 0
+
+        if not state["indexed"] and spec["indexes"]:
+            log(f"  {table}: building indexes")
+            cur = target.cursor()
+            for statement in create_index_statements(table, dialect):
+                cur.execute(statement)
+            target.commit()
+            checkpoint.update(table, indexed=True)
+        return copied
+    finally:
+        source.close()
+        target.close()
+
+
+def add_foreign_keys(target_url: str, checkpoint: Checkpoint, log: Callable[[str], None] = print):
+    """Add the foreign keys of every table; run only after all tables are loaded."""
+    target, dialect = connect_target(target_url)
+    try:
+        cur = target.cursor()
+        for table in TABLES:
+            statements = foreign_key_statements(table, dialect)
+            if not statements or checkpoint.table(table).get("constrained"):
+                continue
+            log(f"  {table}: adding foreign keys")
+            for statement in statements:
+                cur.execute(statement)
+            target.commit()
+            checkpoint.update(table, constrained=True)
+    finally:
+        target.close()
+
+
+def create_schema(target_url: str, log: Callable[[str], None] = print):
+    conn, dialect = connect_target(target_url, create_database=True)
+    try:
+        cur = conn.cursor()
+        log("Dropping existing target tables...")
+        for table in reversed(list(TABLES)):
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+        log("Creating target tables (secondary indexes are added after the load)...")
+        for table in TABLES:
+            cur.execute(create_table_sql(table, dialect))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def migrate(
+    source_path: str = "sales_app.db",
+    target_url: Optional[str] = None,
+    chunk_size: int = 10_000,
+    jobs: int = 4,
+    resume: bool = False,
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    log: Callable[[str], None] = print
+) -> Dict[str, int]:
+    """
+    Copy every table from the SQLite file at `source_path` to `target_url`.
+
+    Returns rows copied per table by this run. With `resume`, the checkpoint
+    at `checkpoint_path` is continued instead of recreating the target schema;
+    FileNotFoundError if there is none.
+    """
+    target_url = target_url or settings.database_url
+    log(f"Starting migration: SQLite ({source_path}) -> {target_url.split('@')[-1]}")
+
+    if resume:
+        # Never fall back to a fresh run here: that would drop every table already loaded
+        if not os.path.exists(checkpoint_path):
+            raise FileNotFoundError(f"No checkpoint at {checkpoint_path}; rerun without --resume to start over")
+        checkpoint = Checkpoint.load(checkpoint_path)
+        log(f"Resuming from {checkpoint_path}")
+    else:
+        checkpoint = Checkpoint(checkpoint_path)
+        create_schema(target_url, log)
+        checkpoint.state["schema_created"] = True
+        checkpoint.save()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {
+            table: pool.submit(copy_table, table, source_path, target_url, checkpoint, chunk_size, log)
+            for table in TABLES
+        }
+        copied = {table: future.result() for table, future in futures.items()}
+    # A child table can finish before its parents, so no constraint is added until all are in
+    add_foreign_keys(target_url, checkpoint, log)
+
+    os.remove(checkpoint_path)
+    elapsed = time.perf_counter() - started
+    total = sum(copied.values())
+    log(f"\n✅ Migration complete: {total:,} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the SQLite database into MySQL (or another SQLite file).")
+    parser.add_argument("--source", default="sales_app.db", help="SQLite file to read")
+    parser.add_argument("--target", help="target URL (default: DATABASE_URL / MYSQL_* settings)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per fetchmany/executemany transaction")
+    parser.add_argument("--jobs", type=int, default=4, help="tables copied in parallel")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint instead of starting over")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    args = parser.parse_args()
+
+    try:
+        migrate(args.source, args.target, args.chunk_size, args.jobs, args.resume, args.checkpoint)
+    except FileNotFoundError as e:
+        parser.error(str(e))
 
-    print("\n✅ Migration complete!")
     print("\nNext steps:")
     print("1. Create .env file with MySQL credentials")
     print("2. Run: uvicorn main:app --reload")
@@ -219,4 +414,4 @@ def migrate():
 
 
 if __name__ == "__main__":
-    migrate()
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -27,6 +27,9 @@ class Sale(Base):
     product_name = Column(String(100), index=True)
     qty = Column(Integer)
 
+    # Keyset pagination seeks on (date, id)
+    __table_args__ = (Index("ix_sales_date_id", "date", "id"),)
+
 class Forecast(Base):
     __tablename__ = "forecasts"
 
@@ -39,6 +42,53 @@ class Forecast(Base):
     next_period_forecast = Column(Float)
     next_period_date = Column(Date, nullable=True)
     mape = Column(Float)
+    # Inline steps of rows written before forecast_results existed; newer rows link to a result instead
     calculation_steps = Column(JSON)
+    result_id = Column(Integer, ForeignKey("forecast_results.id"), nullable=True, index=True)
 
     created_by_user = relationship("User", back_populates="forecasts")
+    result = relationship("ForecastResult")
+
+    @property
+    def steps_data(self):
+        """The calculation_steps JSON, whether stored inline or in the linked result."""
+        if self.calculation_steps is not None:
+            return self.calculation_steps
+        return self.result.calculation_steps if self.result is not None else None
+
+    # Keyset pagination seeks on (created_at, id)
+    __table_args__ = (Index("ix_forecasts_created_at_id", "created_at", "id"),)
+
+
+class ForecastResult(Base):
+    """
+    One SES run's output, addressed by a hash of its inputs (series, alpha, horizon).
+
+    Forecasts with identical inputs share a row instead of each storing its own
+    calculation_steps copy; rows no forecast links to are removed on delete.
+    """
+    __tablename__ = "forecast_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    input_hash = Column(String(64), unique=True, index=True, nullable=False)
+    created_at = Column(DateTime)
+    mape = Column(Float)
+    next_period_forecast = Column(Float)
+    calculation_steps = Column(JSON)
+
+
+class ForecastProject(Base):
+    """
+    Per-project summary of the forecasts table, kept up to date by ForecastRepository
+    in the same transaction as the forecast writes (rebuild: init_db.py --rebuild-projects).
+    """
+    __tablename__ = "forecast_projects"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, index=True, nullable=False)
+    created_at = Column(DateTime)            # earliest forecast
+    created_by = Column(String(50))          # smallest creator username, as the old GROUP BY reported
+    alpha = Column(Float)                    # smallest alpha
+    forecast_count = Column(Integer, nullable=False, default=0)
+    mape_sum = Column(Float, nullable=False, default=0.0)
+    mape_count = Column(Integer, nullable=False, default=0)
@@ -1,9 +1,41 @@
-from typing import Generic, TypeVar, Type, List, Optional
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Generic, TypeVar, Type, List, Optional, Tuple
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort_value: Any, id: int) -> str:
+    """Encode the (sort value, id) of the last row on a page as an opaque URL-safe token."""
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, int]:
+    """Decode a token from encode_cursor back into typed values; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    # bool is an int subclass; the sort value was a string (ISO date) when encoded
+    if not isinstance(id, int) or isinstance(id, bool) or not isinstance(sort_value, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    python_type = sort_column.type.python_type
+    if python_type in (date, datetime):
+        sort_value = python_type.fromisoformat(sort_value)
+    return sort_value, id
+
 
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType], db: Session):
@@ -52,6 +84,30 @@ class BaseRepository(Generic[ModelType]):
     def count(self) -> int:
         return self.db.query(self.model).count()
 
+    def paginate(self, query, sort_column, limit: int, cursor: Optional[str] = None) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset-paginate `query` newest-first on (sort_column, id).
+
+        Seeks past the cursor row instead of using OFFSET, so each page is an
+        index range scan regardless of how deep it is. Returns the page and the
+        cursor for the next one (None on the last page). Rows with a NULL
+        sort_column are never returned.
+        """
+        id_column = self.model.id
+        if cursor:
+            sort_value, last_id = decode_cursor(cursor, sort_column)
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < last_id)
+            ))
+
+        # Fetch one extra row to learn whether another page exists
+        rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(getattr(rows[-1], sort_column.key), rows[-1].id)
+
     def bulk_create(self, objects: List[ModelType]) -> List[ModelType]:
         for obj in objects:
             self.db.add(obj)
@@ -1,23 +1,62 @@
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 from datetime import date
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, defer, joinedload
+from sqlalchemy import case, func, insert, select
 import models
 from repositories.base import BaseRepository
 
 
+def _least(column, value):
+    """Portable LEAST(column, value) for UPDATEs; NULLs on either side are ignored like MIN()."""
+    if value is None:
+        return column
+    return case((column.is_(None), value), (column > value, value), else_=column)
+
+
+def _min(a, b):
+    """min() that ignores None, for merging project stats in Python."""
+    if a is None or b is None:
+        return a if b is None else b
+    return min(a, b)
+
+
+class StoredResultDeleted(LookupError):
+    """The stored run a forecast was about to link to has been deleted since find_result."""
+
+
 class ForecastRepository(BaseRepository):
     def __init__(self, db: Session):
         super().__init__(models.Forecast, db)
 
-    def get_latest(self) -> Optional[models.Forecast]:
-        return self.db.query(models.Forecast).order_by(models.Forecast.created_at.desc()).first()
+    def _query(self, include_steps: bool = True):
+        """Base query; skips loading the calculation_steps JSON when it isn't needed."""
+        query = self.db.query(models.Forecast)
+        if include_steps:
+            # Steps of deduplicated forecasts live in the linked forecast_results row
+            query = query.options(joinedload(models.Forecast.result))
+        else:
+            query = query.options(defer(models.Forecast.calculation_steps))
+        return query
+
+    def get_latest(self, include_steps: bool = True) -> Optional[models.Forecast]:
+        return self._query(include_steps).order_by(models.Forecast.created_at.desc()).first()
 
-    def get_all_ordered(self) -> List[models.Forecast]:
-        return self.db.query(models.Forecast).order_by(models.Forecast.created_at.desc()).all()
+    def get_all_ordered(self, include_steps: bool = True) -> List[models.Forecast]:
+        return self._query(include_steps).order_by(models.Forecast.created_at.desc()).all()
 
-    def get_by_project(self, project_name: str) -> List[models.Forecast]:
-        return self.db.query(models.Forecast).filter(
+    def get_by_ids(self, ids: List[int]) -> List[models.Forecast]:
+        """Get forecasts by id, newest first."""
+        return self._query().filter(
+            models.Forecast.id.in_(ids)
+        ).order_by(models.Forecast.created_at.desc()).all()
+
+    def get_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[models.Forecast], Optional[str]]:
+        """Get one page of forecast history, newest first, without the calculation_steps JSON."""
+        return self.paginate(self._query(include_steps=False), models.Forecast.created_at, limit, cursor)
+
+    def get_by_project(self, project_name: str, include_steps: bool = True) -> List[models.Forecast]:
+        return self._query(include_steps).filter(
             models.Forecast.project_name == project_name
         ).all()
 
@@ -31,8 +70,20 @@ class ForecastRepository(BaseRepository):
         next_period_forecast: float,
         next_period_date: Optional[Union[str, date]],
         mape: float,
-        calculation_steps: dict
+        calculation_steps: Optional[dict] = None,
+        input_hash: Optional[str] = None,
+        result: Optional[models.ForecastResult] = None
     ) -> models.Forecast:
+        """
+        Save one forecast.
+
+        With `result` (from find_result) the forecast links to that stored run
+        and nothing is recomputed or re-stored; with `input_hash` the steps are
+        stored once in forecast_results under that hash; otherwise inline.
+
+        Raises StoredResultDeleted (nothing saved) if `result` was deleted as an
+        orphan after it was found; the caller then stores the run again.
+        """
         forecast = models.Forecast(
             project_name=project_name,
             created_at=created_at,
@@ -42,59 +93,191 @@ class ForecastRepository(BaseRepository):
             next_period_forecast=next_period_forecast,
             next_period_date=next_period_date,
             mape=mape,
-            calculation_steps=calculation_steps
+            calculation_steps=None if (result or input_hash) else calculation_steps
         )
-        self.db.add(forecast)
+        if result is not None:
+            self._link_result(forecast, result)
+        else:
+            if input_hash is not None:
+                result = self._store_result(input_hash, created_at, mape, next_period_forecast, calculation_steps)
+            forecast.result = result
+            self.db.add(forecast)
+        self._add_to_project(forecast)
         self.db.commit()
         self.db.refresh(forecast)
         return forecast
 
-    def get_project_summaries(self) -> List[dict]:
-        """Get summary of all forecast projects."""
-        projects = self.db.query(
-            models.Forecast.project_name,
-            func.min(models.Forecast.created_at).label('created_at'),
-            func.min(models.User.username).label('created_by'),
-            func.min(models.Forecast.alpha).label('alpha'),
-            func.count(models.Forecast.id).label('forecast_count'),
-            func.avg(models.Forecast.mape).label('overall_mape')
-        ).join(
-            models.User, models.User.id == models.Forecast.created_by
+    def find_result(self, input_hash: str) -> Optional[models.ForecastResult]:
+        """
+        Stored run with these inputs (see forecast_service.forecast_input_hash), if any.
+        Its calculation_steps JSON is only loaded (and parsed) when accessed.
+        """
+        return self.db.query(models.ForecastResult).options(
+            defer(models.ForecastResult.calculation_steps)
         ).filter(
-            models.Forecast.project_name.isnot(None)
-        ).group_by(
-            models.Forecast.project_name
-        ).all()
+            models.ForecastResult.input_hash == input_hash
+        ).first()
+
+    def _link_result(self, forecast: models.Forecast, result: models.ForecastResult):
+        """
+        Add `forecast` linked to a stored run, or raise StoredResultDeleted if the
+        run is gone. Checked after the insert: by then SQLite holds the write lock
+        and MySQL the row's shared lock, so a concurrent delete_orphan_results has
+        either already removed it or waits until this transaction commits.
+        """
+        result_id, input_hash = result.id, result.input_hash
+        try:
+            with self.db.begin_nested():
+                forecast.result = result
+                self.db.add(forecast)
+                self.db.flush()
+                alive = self.db.query(models.ForecastResult.id).filter(
+                    models.ForecastResult.id == result_id
+                ).with_for_update(read=True).first()
+                if alive is None:
+                    raise StoredResultDeleted(input_hash)
+        except IntegrityError as e:
+            # MySQL's foreign key refused the link
+            raise StoredResultDeleted(input_hash) from e
+
+    def _store_result(self, input_hash: str, created_at, mape: float, next_period_forecast: float, calculation_steps: dict):
+        try:
+            with self.db.begin_nested():
+                result = models.ForecastResult(
+                    input_hash=input_hash,
+                    created_at=created_at,
+                    mape=mape,
+                    next_period_forecast=next_period_forecast,
+                    calculation_steps=calculation_steps
+                )
+                self.db.add(result)
+            return result
+        except IntegrityError:
+            # A concurrent request stored the same run first
+            return self.find_result(input_hash)
+
+    def delete_orphan_results(self) -> int:
+        """Delete stored runs no forecast links to any more (caller commits)."""
+        linked = select(models.Forecast.result_id).where(models.Forecast.result_id.isnot(None))
+        return self.db.query(models.ForecastResult).filter(
+            models.ForecastResult.id.notin_(linked)
+        ).delete(synchronize_session=False)
+
+    def _add_to_project(self, forecast: models.Forecast):
+        """Fold a new forecast into its forecast_projects row, in the caller's transaction."""
+        creator = self.db.get(models.User, forecast.created_by) if forecast.created_by else None
+        # The project list has always been joined to users: forecasts without a creator are not listed
+        if forecast.project_name is None or creator is None:
+            return
+        project = models.ForecastProject
+        username = creator.username
+        has_mape = forecast.mape is not None
+
+        # Atomic in-place update, so concurrent forecasts for one project don't lose counts
+        updated = self.db.query(project).filter(project.name == forecast.project_name).update({
+            project.forecast_count: project.forecast_count + 1,
+            project.mape_sum: project.mape_sum + (forecast.mape if has_mape else 0.0),
+            project.mape_count: project.mape_count + int(has_mape),
+            project.created_at: _least(project.created_at, forecast.created_at),
+            project.created_by: _least(project.created_by, username),
+            project.alpha: _least(project.alpha, forecast.alpha),
+        }, synchronize_session=False)
+        if updated:
+            return
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(project(
+                    name=forecast.project_name,
+                    created_at=forecast.created_at,
+                    created_by=username,
+                    alpha=forecast.alpha,
+                    forecast_count=1,
+                    mape_sum=forecast.mape if has_mape else 0.0,
+                    mape_count=int(has_mape),
+                ))
+        except IntegrityError:
+            # Another request created the row first; fold into it instead
+            self._add_to_project(forecast)
+
+    def get_project_summaries(self) -> List[dict]:
+        """Get summary of all forecast projects (one scan of forecast_projects)."""
+        projects = self.db.query(models.ForecastProject).order_by(models.ForecastProject.name).all()
 
         return [{
-            "project_name": p.project_name,
+            "project_name": p.name,
             "created_at": p.created_at.isoformat() if p.created_at else None,
             "created_by": p.created_by,
             "alpha": p.alpha,
             "forecast_count": p.forecast_count,
-            "overall_mape": p.overall_mape
+            "overall_mape": p.mape_sum / p.mape_count if p.mape_count else None
         } for p in projects]
 
+    def rebuild_projects(self) -> int:
+        """Recompute forecast_projects from the forecasts table; returns the number of projects."""
+        forecast, project = models.Forecast, models.ForecastProject
+        summaries = select(
+            forecast.project_name,
+            func.min(forecast.created_at),
+            func.min(models.User.username),
+            func.min(forecast.alpha),
+            func.count(forecast.id),
+            func.coalesce(func.sum(forecast.mape), 0.0),
+            func.count(forecast.mape),
+        ).join(
+            models.User, models.User.id == forecast.created_by
+        ).where(
+            forecast.project_name.isnot(None)
+        ).group_by(forecast.project_name)
+
+        self.db.query(project).delete()
+        self.db.execute(insert(project).from_select(
+            ["name", "created_at", "created_by", "alpha", "forecast_count", "mape_sum", "mape_count"],
+            summaries
+        ))
+        self.db.commit()
+        return self.db.query(project).count()
+
     def update_project_name(self, project_name: str, new_name: str) -> bool:
-        forecasts = self.get_by_project(project_name)
-        if not forecasts:
+        forecast, project = models.Forecast, models.ForecastProject
+        renamed = self.db.query(forecast).filter(
+            forecast.project_name == project_name
+        ).update({forecast.project_name: new_name}, synchronize_session=False)
+        if not renamed:
             return False
-        for f in forecasts:
-            f.project_name = new_name
+
+        source = self.db.query(project).filter(project.name == project_name).first()
+        target = self.db.query(project).filter(project.name == new_name).first()
+        if source is not None and target is not None and source is not target:
+            # Renaming onto an existing project merges the two summaries
+            target.forecast_count += source.forecast_count
+            target.mape_sum += source.mape_sum
+            target.mape_count += source.mape_count
+            target.created_at = _min(target.created_at, source.created_at)
+            target.created_by = _min(target.created_by, source.created_by)
+            target.alpha = _min(target.alpha, source.alpha)
+            self.db.delete(source)
+        elif source is not None:
+            source.name = new_name
         self.db.commit()
         return True
 
     def delete_project(self, project_name: str) -> int:
-        forecasts = self.get_by_project(project_name)
-        if not forecasts:
+        count = self.db.query(models.Forecast).filter(
+            models.Forecast.project_name == project_name
+        ).delete(synchronize_session=False)
+        if not count:
             return 0
-        count = len(forecasts)
-        for f in forecasts:
-            self.db.delete(f)
+        self.db.query(models.ForecastProject).filter(
+            models.ForecastProject.name == project_name
+        ).delete(synchronize_session=False)
+        self.delete_orphan_results()
         self.db.commit()
         return count
 
     def delete_all(self) -> int:
         count = self.db.query(models.Forecast).delete()
+        self.db.query(models.ForecastProject).delete()
+        self.db.query(models.ForecastResult).delete()
         self.db.commit()
         return count
@@ -1,5 +1,6 @@
-from typing import List, Union
+from typing import Iterator, List, Optional, Tuple, Union
 from datetime import date
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 import models
 from repositories.base import BaseRepository
@@ -18,6 +19,52 @@ class SaleRepository(BaseRepository):
             models.Sale.product_name == product_name
         ).order_by(models.Sale.date.desc()).all()
 
+    def _series_filters(self, product_name: Optional[str], date_from: Optional[date], date_to: Optional[date]) -> list:
+        conditions = []
+        if product_name:
+            conditions.append(models.Sale.product_name == product_name)
+        if date_from:
+            conditions.append(models.Sale.date >= date_from)
+        if date_to:
+            conditions.append(models.Sale.date <= date_to)
+        return conditions
+
+    def get_series_rows(
+        self,
+        product_name: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> List[Tuple[str, date, int]]:
+        """
+        (product_name, date, qty) rows for forecasting, filtered in SQL and ordered
+        by product then date so callers can partition them in a single pass.
+        """
+        query = self.db.query(models.Sale.product_name, models.Sale.date, models.Sale.qty)
+        query = query.filter(*self._series_filters(product_name, date_from, date_to))
+        return query.order_by(models.Sale.product_name, models.Sale.date, models.Sale.id).all()
+
+    def stream_series_rows(
+        self,
+        product_name: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        batch_size: int = 5000
+    ) -> Iterator[List[Tuple[str, date, int]]]:
+        """
+        The rows of get_series_rows in batches of up to `batch_size`, read through a
+        server-side cursor so only one batch is in memory at a time. The session
+        must not run other statements until the iterator is exhausted or closed.
+        """
+        statement = select(models.Sale.product_name, models.Sale.date, models.Sale.qty).where(
+            *self._series_filters(product_name, date_from, date_to)
+        ).order_by(models.Sale.product_name, models.Sale.date, models.Sale.id)
+        result = self.db.execute(statement, execution_options={"yield_per": batch_size})
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+
     def create_sale(self, date: Union[str, date], product_name: str, qty: int) -> models.Sale:
         sale = models.Sale(date=date, product_name=product_name, qty=qty)
         self.db.add(sale)
@@ -25,6 +72,13 @@ class SaleRepository(BaseRepository):
         self.db.refresh(sale)
         return sale
 
+    def create_sales(self, rows: List[dict]) -> int:
+        """Insert many sales (dicts of date/product_name/qty) in one transaction."""
+        if rows:
+            self.db.execute(insert(models.Sale), rows)
+        self.db.commit()
+        return len(rows)
+
     def delete_all(self) -> int:
         count = self.db.query(models.Sale).delete()
         self.db.commit()
@@ -33,8 +87,7 @@ class SaleRepository(BaseRepository):
     def get_recent(self, limit: int = 10) -> List[models.Sale]:
         return self.db.query(models.Sale).order_by(models.Sale.date.desc()).limit(limit).all()
 
-    def get_filtered(self, product_name: str = None, date_from: str = None, date_to: str = None) -> List[models.Sale]:
-        """Get sales with optional filters by product name and date range."""
+    def _filtered_query(self, product_name: str = None, date_from: str = None, date_to: str = None):
         query = self.db.query(models.Sale)
 
         if product_name:
@@ -46,4 +99,21 @@ class SaleRepository(BaseRepository):
         if date_to:
             query = query.filter(models.Sale.date <= date_to)
 
+        return query
+
+    def get_filtered(self, product_name: str = None, date_from: str = None, date_to: str = None) -> List[models.Sale]:
+        """Get sales with optional filters by product name and date range."""
+        query = self._filtered_query(product_name, date_from, date_to)
         return query.order_by(models.Sale.date.desc()).all()
+
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        product_name: str = None,
+        date_from: str = None,
+        date_to: str = None
+    ) -> Tuple[List[models.Sale], Optional[str]]:
+        """Get one page of sales, newest first, with the same filters as get_filtered."""
+        query = self._filtered_query(product_name, date_from, date_to)
+        return self.paginate(query, models.Sale.date, limit, cursor)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Literal, Optional
 from datetime import date, datetime
 
 
@@ -18,6 +18,20 @@ class AlphaCompareRequest(BaseModel):
     end_date: Optional[date | str] = None
 
 
+class BacktestRequest(BaseModel):
+    alphas: List[float] = Field(default_factory=lambda: [round(0.1 * i, 1) for i in range(1, 10)], min_length=1, max_length=50)
+    product_name: Optional[str] = None
+    start_date: Optional[date | str] = None
+    end_date: Optional[date | str] = None
+    horizon: int = Field(7, ge=1, le=365)
+    min_train: int = Field(14, ge=1)
+    # None = expanding window
+    window: Optional[int] = Field(None, ge=1)
+    origin_step: int = Field(1, ge=1)
+    metric: Literal["mae", "rmse", "mape", "smape", "mase", "bias"] = "mape"
+    include_errors: bool = False
+
+
 class CalculationStep(BaseModel):
     period: int
     date: str
@@ -0,0 +1,220 @@
+"""
+Forecast accuracy metrics: MAE, RMSE, MAPE, sMAPE, MASE and bias.
+
+Every metric is a ratio of additive sums, all taken from one error array
+e = A - F per call: |e|, e², e, |e|/|A| and 2|e|/(|A| + |F|) plus their
+counts, and |A(t) - A(t-1)| for the naive scale. Arrays are batched: the last
+axis is time, leading axes are products, alphas or anything else, and
+actuals broadcast against forecasts (one series, many alphas).
+
+ErrorAccumulator keeps the sums, so a long series can be fed in chunks and
+sums for different series, chunks or horizons combine by adding;
+accuracy() is the one-shot form.
+
+Zero actuals count towards MAE, RMSE, sMAPE and bias but are left out of MAPE,
+as calculate_mape always did, and MAPE is 0 when every actual is 0. sMAPE
+leaves out periods where actual and forecast are both 0. MASE divides MAE by
+the in-sample MAE of the one-step naive forecast F(t) = A(t-1) over the same
+actuals (NaN for a constant series). NaN in either array marks a missing
+period and is skipped.
+"""
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+ACCURACY_METRICS = ("mae", "rmse", "mape", "smape", "mase", "bias")
+
+_SUMS = ("n", "abs", "sq", "sum", "ape", "ape_n", "sape", "sape_n", "naive_abs", "naive_n")
+
+
+class ErrorAccumulator:
+    """
+    Running sums behind ACCURACY_METRICS for a batch of series.
+
+    Args:
+        shape: Batch shape, e.g. (alphas, products); () for a single series
+    """
+
+    def __init__(self, shape: Tuple[int, ...] = ()):
+        import numpy as np  # deferred: keeps numpy off the app's startup path
+        self.shape = tuple(shape)
+        self.sums = {name: np.zeros(self.shape) for name in _SUMS}
+        # Last actual seen by update_scale, so the naive step spans chunk boundaries
+        self._last: Any = None
+
+    def update(self, actuals, forecasts, scale: bool = True) -> "ErrorAccumulator":
+        """
+        Fold in the next chunk of periods.
+
+        Args:
+            actuals: (..., t) actual values, broadcastable against forecasts
+            forecasts: (..., t) forecasts; the batch shape of the pair must match the accumulator's
+            scale: Also feed `actuals` to update_scale (turn off when they are not one series in time order)
+        """
+        import numpy as np
+        a = np.asarray(actuals, dtype=float)
+        f = np.asarray(forecasts, dtype=float)
+        e = a - f
+        missing = np.isnan(e)
+        has_missing = missing.any()
+        if has_missing:
+            np.copyto(e, 0.0, where=missing)
+        abs_e = np.abs(e)
+        abs_a = np.abs(a)
+        scored = abs_a > 0
+        # NaN where either side is missing; NaN > 0 is False, so those periods get weight 0
+        denominator = abs_a + np.abs(f)
+        inverse_actual = np.divide(1.0, abs_a, out=np.zeros(abs_a.shape), where=scored)
+        inverse_symmetric = np.divide(2.0, denominator, out=np.zeros(denominator.shape), where=denominator > 0)
+        if has_missing:
+            n = e.shape[-1] - _count(missing)
+            ape_n = _count(scored & ~missing)
+        else:
+            n = e.shape[-1]
+            ape_n = _count(scored)
+
+        s = self.sums
+        s["n"] += n
+        s["abs"] += abs_e.sum(axis=-1)
+        s["sq"] += _inner(e, e)
+        s["sum"] += e.sum(axis=-1)
+        s["ape"] += _inner(abs_e, inverse_actual)
+        s["ape_n"] += ape_n
+        s["sape"] += _inner(abs_e, inverse_symmetric)
+        s["sape_n"] += _count(denominator > 0)
+        if scale:
+            self.update_scale(a)
+        return self
+
+    def update_scale(self, actuals) -> "ErrorAccumulator":
+        """Fold in the next chunk of actuals for the MASE scale (one-step naive MAE)."""
+        import numpy as np
+        a = np.asarray(actuals, dtype=float)
+        if a.shape[-1] == 0:
+            return self
+        steps = np.abs(np.diff(a, axis=-1))
+        if self._last is not None:
+            steps = np.concatenate((np.abs(a[..., :1] - self._last[..., None]), steps), axis=-1)
+        missing = np.isnan(steps)
+        if missing.any():
+            steps[missing] = 0.0
+        self.sums["naive_abs"] += steps.sum(axis=-1)
+        self.sums["naive_n"] += steps.shape[-1] - _count(missing)
+        self._last = a[..., -1]
+        return self
+
+    def merge(self, other: "ErrorAccumulator") -> "ErrorAccumulator":
+        """Add another accumulator's sums (other series, or other periods of the same ones)."""
+        for name in _SUMS:
+            self.sums[name] += other.sums[name]
+        return self
+
+    def total(self, axis=None) -> "ErrorAccumulator":
+        """New accumulator with the sums added up over `axis` (all batch axes by default)."""
+        out = ErrorAccumulator(())
+        out.sums = {name: value.sum(axis=axis) for name, value in self.sums.items()}
+        out.shape = out.sums["n"].shape
+        return out
+
+    @classmethod
+    def stack(cls, accumulators: Sequence["ErrorAccumulator"], axis: int = -1) -> "ErrorAccumulator":
+        """Join accumulators of equal shape along a new batch axis."""
+        import numpy as np
+        out = cls(())
+        out.sums = {name: np.stack([acc.sums[name] for acc in accumulators], axis=axis) for name in _SUMS}
+        out.shape = out.sums["n"].shape
+        return out
+
+    def result(self) -> Dict[str, Any]:
+        """
+        The metrics as arrays of the batch shape (floats for shape ()): MAE, RMSE,
+        MAPE and sMAPE in %, MASE, bias (mean actual - forecast) and the count n.
+        Every metric is NaN where n is 0.
+        """
+        import numpy as np
+        s = self.sums
+        if self.shape == ():
+            return _scalar_metrics({name: float(value) for name, value in s.items()})
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n = s["n"]
+            mae = s["abs"] / n
+            zero_if_counted = np.where(n > 0, 0.0, np.nan)
+            naive_mae = s["naive_abs"] / s["naive_n"]
+            metrics = {
+                "mae": mae,
+                "rmse": np.sqrt(s["sq"] / n),
+                "mape": np.where(s["ape_n"] > 0, s["ape"] / s["ape_n"] * 100, zero_if_counted),
+                "smape": np.where(s["sape_n"] > 0, s["sape"] / s["sape_n"] * 100, zero_if_counted),
+                "mase": np.where(naive_mae > 0, mae / naive_mae, np.nan),
+                "bias": s["sum"] / n,
+                "n": n.astype(int),
+            }
+        return metrics
+
+
+def _inner(x, y):
+    """Sum of x * y over the last axis, without materializing the product."""
+    import numpy as np
+    if x.ndim == 1 and y.ndim == 1:
+        return np.dot(x, y)
+    return np.einsum("...t,...t->...", x, y)
+
+
+def _count(x):
+    """Non-zero entries over the last axis."""
+    import numpy as np
+    return np.count_nonzero(x) if x.ndim == 1 else np.count_nonzero(x, axis=-1)
+
+
+def _scalar_metrics(s: Dict[str, float]) -> Dict[str, Any]:
+    """result() for a single series, in plain Python floats."""
+    nan = float("nan")
+    n = s["n"]
+    mae = s["abs"] / n if n else nan
+    naive_mae = s["naive_abs"] / s["naive_n"] if s["naive_n"] else nan
+    return {
+        "mae": mae,
+        "rmse": math.sqrt(s["sq"] / n) if n else nan,
+        "mape": s["ape"] / s["ape_n"] * 100 if s["ape_n"] else (0.0 if n else nan),
+        "smape": s["sape"] / s["sape_n"] * 100 if s["sape_n"] else (0.0 if n else nan),
+        "mase": mae / naive_mae if naive_mae > 0 else nan,
+        "bias": s["sum"] / n if n else nan,
+        "n": int(n),
+    }
+
+
+def accuracy(actuals, forecasts) -> Dict[str, Any]:
+    """
+    ACCURACY_METRICS for whole series in one call.
+
+    Args:
+        actuals: (..., t) actual values
+        forecasts: (..., t) forecasts, e.g. (alphas, t) against one (t,) series
+
+    Returns:
+        {metric: value} with arrays of the batch shape, or floats for a single series
+    """
+    import numpy as np
+    actuals = np.asarray(actuals, dtype=float)
+    forecasts = np.asarray(forecasts, dtype=float)
+    shape = np.broadcast_shapes(actuals.shape, forecasts.shape)[:-1]
+    return ErrorAccumulator(shape).update(actuals, forecasts).result()
+
+
+def percentage_errors(actuals, forecasts) -> "np.ndarray":
+    """Per-period |A - F| / A × 100, 0 where the actual is 0 (the step breakdown's error_pct)."""
+    import numpy as np
+    a, f = np.broadcast_arrays(np.asarray(actuals, dtype=float), np.asarray(forecasts, dtype=float))
+    return np.divide(np.abs(a - f), a, out=np.zeros_like(f), where=a != 0) * 100
+
+
+def plain_metrics(metrics: Dict[str, Any], index: Optional[tuple] = None) -> Dict[str, Any]:
+    """One batch entry of a result() as JSON-ready numbers (NaN becomes None)."""
+    out: Dict[str, Any] = {}
+    for name, value in metrics.items():
+        value = value[index] if index is not None else value
+        if name == "n":
+            out[name] = int(value)
+        else:
+            value = float(value)
+            out[name] = None if math.isnan(value) else value
+    return out
@@ -1,24 +1,32 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from fastapi import Request
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from config import get_settings
 
+# passlib/bcrypt and jose are imported on first use; together they add
+# noticeably to app startup and most processes (workers behind a session
+# cookie, scripts) rarely need them right away.
+
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache()
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -30,6 +38,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> Optional[dict]:
+    from jose import JWTError, jwt
     if token is None:
         return None
     try:
@@ -0,0 +1,259 @@
+"""
+Rolling-origin backtesting of SES: out-of-sample errors at many forecast
+origins and horizons per product, for many alphas at once.
+
+The in-sample MAPE stored with a forecast scores F(t), which already folds in
+A(t). Here a forecast is issued at origin o from A(1..o) only: the SES level
+L(o) is the flat forecast for every horizon h, scored against A(o+h). The
+window is either expanding (all history up to o) or sliding (the last
+`window` periods, restarting the level at the window's first value).
+
+Nothing is refitted per origin. SES is linear, so B consecutive steps of
+L(t) = a·A(t) + (1-a)·L(t-1) are one matrix product with a lower-triangular
+kernel a·(1-a)^(i-j) plus the carried-in level times (1-a)^(i+1): the
+levels of every origin, alpha and product in a chunk come out of T/B BLAS
+calls. A sliding-window level is the expanding one minus a correction,
+L_w(o) = L(o) - (1-a)^w · (L(o-w) - A(o-w+1)). Products are padded into
+(products, periods) matrices in chunks of similar length, and chunks run on
+a thread pool (the matrix products release the GIL).
+"""
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.accuracy import ACCURACY_METRICS, ErrorAccumulator, plain_metrics
+from services.metrics import observe_kernel
+
+BACKTEST_METRICS = ACCURACY_METRICS
+
+# Products per padded matrix, and periods per blocked recurrence step
+CHUNK_SIZE = 64
+BLOCK_SIZE = 64
+
+
+def ses_levels(values: "np.ndarray", alphas: Sequence[float], block: int = BLOCK_SIZE) -> "np.ndarray":
+    """
+    Expanding-window SES levels for every row of `values` and every alpha.
+
+    Args:
+        values: (products, periods) actuals
+        alphas: Smoothing coefficients in (0, 1]
+        block: Periods per matrix product
+
+    Returns:
+        (alphas, products, periods) array; [k, p, t] equals calculate_ses(values[p], alphas[k])[t]
+    """
+    import numpy as np  # deferred: keeps numpy off the app's startup path
+    values = np.asarray(values, dtype=float)
+    a = np.asarray(alphas, dtype=float)[:, None, None]
+    d = 1 - a
+    n_products, n_periods = values.shape
+
+    # kernel[k, j, i] = a·d^(i-j) for input period j <= output period i (row-vector layout for x @ kernel)
+    i = np.arange(block)
+    lag = i[None, :] - i[:, None]
+    kernel = np.where(lag >= 0, a * d ** np.maximum(lag, 0), 0.0)
+    carry_weight = d[:, :, 0] ** (i + 1)  # (alphas, block)
+
+    levels = np.empty((len(a), n_products, n_periods))
+    # L(-1) = A(0) makes L(0) = A(0), the same start as calculate_ses
+    carry = np.broadcast_to(values[:, 0], (len(a), n_products))
+    for start in range(0, n_periods, block):
+        x = values[:, start:start + block]
+        width = x.shape[1]
+        out = x @ kernel[:, :width, :width] + carry[:, :, None] * carry_weight[:, None, :width]
+        levels[:, :, start:start + width] = out
+        carry = out[:, :, -1]
+    return levels
+
+
+def sliding_levels(values: "np.ndarray", levels: "np.ndarray", alphas: Sequence[float], window: int) -> "np.ndarray":
+    """
+    Sliding-window SES levels (each origin sees only its last `window` periods) from expanding ones.
+
+    Origins with less than `window` periods of history are NaN.
+    """
+    import numpy as np
+    n_periods = values.shape[1]
+    d_w = ((1 - np.asarray(alphas, dtype=float)) ** window)[:, None, None]
+    out = np.full_like(levels, np.nan)
+    if window >= n_periods:
+        return out
+    # L_w(o) = L(o) - d^w · (L(o-w) - A(o-w+1)) for o >= window
+    out[:, :, window:] = levels[:, :, window:] - d_w * (levels[:, :, :-window] - values[None, :, 1:n_periods - window + 1])
+    # The first full window starts at period 0, which is exactly the expanding level
+    out[:, :, window - 1] = levels[:, :, window - 1]
+    return out
+
+
+def origin_actuals(values: "np.ndarray", lengths: "np.ndarray", origins: "np.ndarray", h: int) -> "np.ndarray":
+    """(products, origins) actuals A(o+h) each origin's forecast is scored against, NaN past a product's last period."""
+    import numpy as np
+    targets = origins + h
+    return np.where(targets < lengths[:, None], values[:, np.minimum(targets, values.shape[1] - 1)], np.nan)
+
+
+def _plain(values: "np.ndarray") -> List[Optional[float]]:
+    """Array as a list with NaN as None, so results serialize to JSON."""
+    return [None if math.isnan(value) else value for value in values.tolist()]
+
+
+def _backtest_chunk(
+    chunk: List[Tuple[str, List[str], List[float]]],
+    alphas: Sequence[float],
+    horizon: int,
+    min_train: int,
+    window: Optional[int],
+    origin_step: int,
+    include_errors: bool
+) -> Tuple[List[Tuple[str, Dict[str, Any]]], ErrorAccumulator]:
+    """Backtest one padded chunk; returns per-product results and the chunk's error sums pooled over products."""
+    import numpy as np
+    lengths = np.array([len(actuals) for _, _, actuals in chunk])
+    values = np.zeros((len(chunk), int(lengths.max())))
+    for p, (_, _, actuals) in enumerate(chunk):
+        # Missing quantities count as 0, as in lttb_indices
+        values[p, :lengths[p]] = np.nan_to_num(np.asarray(actuals, dtype=float))
+
+    levels = ses_levels(values, alphas)
+    if window is not None:
+        levels = sliding_levels(values, levels, alphas, window)
+
+    first_origin = max(min_train, window or 1) - 1
+    last_origin = max(first_origin, values.shape[1] - 1)
+    origins = np.arange(first_origin, last_origin, origin_step)
+    forecasts = levels[:, :, first_origin:last_origin:origin_step]
+    # One horizon at a time keeps the working set at (alphas, products, origins)
+    per_horizon, error_slices = [], []
+    for h in range(1, horizon + 1):
+        actuals = origin_actuals(values, lengths, origins, h)
+        per_horizon.append(ErrorAccumulator(forecasts.shape[:2]).update(actuals, forecasts, scale=False))
+        if include_errors:
+            error_slices.append(actuals - forecasts)
+    sums = ErrorAccumulator.stack(per_horizon)  # (alphas, products, horizons)
+    # MASE scale: each product's one-step naive MAE over its whole history
+    padded = np.where(np.arange(values.shape[1]) < lengths[:, None], values, np.nan)
+    sums.update_scale(padded[None, :, None, :])
+    if include_errors:
+        errors = np.stack(error_slices, axis=-1)
+    overall = sums.total(axis=2).result()
+    by_horizon = sums.result()
+
+    results = []
+    for p, (product_name, dates, _) in enumerate(chunk):
+        n_origins = int(np.count_nonzero(origins < lengths[p] - 1))
+        by_alpha: Dict[str, Any] = {}
+        for k, alpha in enumerate(alphas):
+            entry = {"alpha": alpha, **plain_metrics(overall, (k, p))}
+            entry["by_horizon"] = {
+                name: _plain(by_horizon[name][k, p]) for name in BACKTEST_METRICS
+            }
+            by_alpha[f"{alpha:g}"] = entry
+        result: Dict[str, Any] = {"periods": int(lengths[p]), "origins": n_origins, "by_alpha": by_alpha}
+        if include_errors:
+            kept = origins[:n_origins]
+            result["origin_dates"] = [dates[o] for o in kept]
+            result["errors"] = {
+                f"{alpha:g}": [_plain(row) for row in errors[k, p, :n_origins]]
+                for k, alpha in enumerate(alphas)
+            }
+        results.append((product_name, result))
+    # Pool over products for the catalog summary
+    return results, sums.total(axis=1)
+
+
+def _best_alpha(by_alpha: Dict[str, Any], metric: str) -> Optional[float]:
+    # Bias is signed: the best alpha is the one closest to zero
+    scored = [
+        (abs(entry[metric]) if metric == "bias" else entry[metric], entry["alpha"])
+        for entry in by_alpha.values() if entry[metric] is not None
+    ]
+    return min(scored)[1] if scored else None
+
+
+def backtest(
+    series: Iterable[Tuple[str, List[str], List[float]]],
+    alphas: Sequence[float],
+    horizon: int = 7,
+    min_train: int = 14,
+    window: Optional[int] = None,
+    origin_step: int = 1,
+    metric: str = "mape",
+    include_errors: bool = False,
+    jobs: int = 1,
+    chunk_size: int = CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Rolling-origin backtest of SES for every product and alpha.
+
+    Args:
+        series: (product_name, dates, actuals) per product, e.g. from partition_series
+        alphas: Smoothing coefficients in (0, 1] to evaluate
+        horizon: Forecast horizons 1..horizon scored at each origin
+        min_train: Periods of history before the first origin
+        window: Sliding-window length; None uses an expanding window
+        origin_step: Periods between consecutive origins
+        metric: Metric that picks the best alpha (one of BACKTEST_METRICS)
+        include_errors: Also return each product's origins x horizons error matrix per alpha
+        jobs: Worker threads; chunks of `chunk_size` products run in parallel
+        chunk_size: Products per padded matrix
+
+    Returns:
+        {"products": {name: {..., "by_alpha": {...}, "best_alpha": ...}}, "summary": {"by_alpha": ..., "best_alpha": ...}}
+        where each by_alpha entry holds the services.accuracy metrics (MAE, RMSE, MAPE,
+        sMAPE, MASE, bias, n), overall and by horizon. MASE is scaled by each product's
+        one-step naive MAE over its whole history. Errors are actual - forecast.
+    """
+    import numpy as np
+    if metric not in BACKTEST_METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; expected one of {', '.join(BACKTEST_METRICS)}")
+    series = [s for s in series if len(s[2]) > 0]
+    # Similar lengths in a chunk keep the padding small
+    ordered = sorted(series, key=lambda s: len(s[2]))
+    chunks = [ordered[i:i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+
+    def run(chunk):
+        started = time.perf_counter()
+        out = _backtest_chunk(chunk, alphas, horizon, min_train, window, origin_step, include_errors)
+        observe_kernel("backtest", started, series_length=max(len(s[2]) for s in chunk))
+        return out
+
+    jobs = min(jobs, os.cpu_count() or 1, len(chunks))
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            chunk_results = list(pool.map(run, chunks))
+    else:
+        chunk_results = [run(chunk) for chunk in chunks]
+
+    by_product: Dict[str, Any] = {}
+    totals = ErrorAccumulator((len(alphas), horizon))
+    for results, sums in chunk_results:
+        by_product.update(results)
+        totals.merge(sums)
+
+    for result in by_product.values():
+        result["best_alpha"] = _best_alpha(result["by_alpha"], metric)
+
+    overall = totals.total(axis=1).result()
+    by_horizon = totals.result()
+    summary_by_alpha: Dict[str, Any] = {}
+    for k, alpha in enumerate(alphas):
+        entry = {"alpha": alpha, **plain_metrics(overall, (k,))}
+        entry["by_horizon"] = {name: _plain(by_horizon[name][k]) for name in BACKTEST_METRICS}
+        summary_by_alpha[f"{alpha:g}"] = entry
+
+    return {
+        "alphas": list(alphas),
+        "horizons": list(range(1, horizon + 1)),
+        "window": window,
+        "metric": metric,
+        # Input order (partition_series yields products by name)
+        "products": {name: by_product[name] for name, _, _ in series},
+        "summary": {
+            "product_count": len(series),
+            "by_alpha": summary_by_alpha,
+            "best_alpha": _best_alpha(summary_by_alpha, metric),
+        },
+    }
@@ -0,0 +1,104 @@
+"""
+Chart series for stored forecasts, downsampled server-side.
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013) keeps the visual shape of
+a line with far fewer points: the interior is split into equal buckets and
+from each bucket the point forming the largest triangle with the previously
+kept point and the average of the next bucket is chosen. Bucket averages are
+computed for all buckets at once from cumulative sums and each bucket's
+triangle areas in one NumPy expression; only the walk from bucket to bucket,
+which depends on the previous pick, stays a Python loop (one step per output
+point, not per input point).
+"""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import models
+
+DEFAULT_MAX_POINTS = 500
+
+
+def lttb_indices(y: Sequence[float], max_points: int, x: Optional[Sequence[float]] = None) -> "np.ndarray":
+    """
+    Indices of the points LTTB keeps from the series `y`.
+
+    Args:
+        y: Values (NaN is treated as 0)
+        max_points: Point budget; series of this length or shorter are returned whole
+        x: Positions of the values (default: evenly spaced)
+
+    Returns:
+        Sorted index array of length min(len(y), max_points), always keeping the first and last point
+    """
+    import numpy as np  # deferred: keeps numpy off the app's startup path
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # max_points - 2 buckets over the interior points [1, n - 1); each is non-empty since max_points < n
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = np.diff(edges)
+    avg_x = (sum_x[edges[1:]] - sum_x[edges[:-1]]) / sizes
+    avg_y = (sum_y[edges[1:]] - sum_y[edges[:-1]]) / sizes
+    # The "next bucket" of the last bucket is the final point
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        area = np.abs(
+            (x[a] - avg_x[b]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y[b] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+def stored_series(calculation_steps: Any) -> Tuple[List[str], List[float], List[float]]:
+    """(dates, actuals, forecasts) from a calculation_steps value in any stored layout."""
+    if isinstance(calculation_steps, str):
+        calculation_steps = json.loads(calculation_steps)
+    if isinstance(calculation_steps, dict) and "actuals" in calculation_steps:
+        return (
+            calculation_steps.get("dates", []),
+            calculation_steps.get("actuals", []),
+            calculation_steps.get("forecasts", []),
+        )
+    # Older rows only kept the per-step list
+    steps = calculation_steps.get("steps", []) if isinstance(calculation_steps, dict) else (calculation_steps or [])
+    return (
+        [step.get("date") for step in steps],
+        [step.get("actual") for step in steps],
+        [step.get("forecast") for step in steps],
+    )
+
+
+def chart_series(forecast: models.Forecast, max_points: int = DEFAULT_MAX_POINTS) -> Dict[str, Any]:
+    """
+    Chart payload for one stored forecast, downsampled to `max_points`.
+
+    Points are picked by LTTB on the actuals and the same indices are applied
+    to dates and forecasts, so both lines share one x axis.
+    """
+    dates, actuals, forecasts = stored_series(forecast.steps_data)
+    keep = lttb_indices(actuals, max_points).tolist()
+    return {
+        "id": forecast.id,
+        "project_name": forecast.project_name,
+        "product_name": forecast.product_name,
+        "alpha": forecast.alpha,
+        "mape": forecast.mape,
+        "created_at": forecast.created_at.isoformat() if forecast.created_at else None,
+        "total_points": len(actuals),
+        "dates": [dates[i] for i in keep if i < len(dates)],
+        "actuals": [actuals[i] for i in keep],
+        "forecasts": [forecasts[i] for i in keep if i < len(forecasts)],
+    }
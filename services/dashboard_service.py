@@ -0,0 +1,126 @@
+"""
+Dashboard stats snapshot shared by the /dashboard, /forecasts and /chart pages.
+
+Building the dashboard took five queries per page load, one of them the
+project summary aggregate over every forecast. The snapshot fetches the three
+counters in one round trip, plus the recent sales and project summaries, and
+keeps the result in memory for `dashboard_cache_ttl_s` seconds.
+
+Any session that writes (unit-of-work flush or bulk insert/update/delete)
+invalidates the snapshot, both when the write happens and again when it
+commits, so a page never shows data older than the last committed write in
+this process. That only holds because the snapshot is loaded from the primary
+(get_db), never from a read replica: a reload from a lagging replica would be
+cached for the whole TTL and served to everyone, the writer included. Writes
+from other processes, or raw driver-level inserts such as
+SeedService.seed_synthetic, are only picked up when the TTL expires.
+"""
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+import models
+from config import get_settings
+from repositories.forecast_repository import ForecastRepository
+from repositories.sale_repository import SaleRepository
+from services.metrics import record_cache
+
+settings = get_settings()
+
+RECENT_SALES_LIMIT = 10
+
+
+def load_snapshot(db: Session) -> dict:
+    """Query the dashboard stats; counters come from a single SELECT of scalar subqueries."""
+    counts = db.execute(select(
+        select(func.count(models.Product.id)).scalar_subquery().label("products"),
+        select(func.count(models.Sale.id)).scalar_subquery().label("sales"),
+        select(func.count(models.Forecast.id)).scalar_subquery().label("forecasts"),
+    )).one()
+
+    # Plain dicts: the snapshot outlives the session that loaded it
+    recent_sales = [
+        {"id": s.id, "date": s.date, "product_name": s.product_name, "qty": s.qty}
+        for s in SaleRepository(db).get_recent(limit=RECENT_SALES_LIMIT)
+    ]
+    return {
+        "total_products": counts.products,
+        "total_sales": counts.sales,
+        "total_forecasts": counts.forecasts,
+        "recent_sales": recent_sales,
+        "projects": ForecastRepository(db).get_project_summaries(),
+    }
+
+
+class DashboardSnapshot:
+    """
+    Short-TTL in-memory copy of load_snapshot().
+
+    Args:
+        ttl_s: Seconds a snapshot is served before it is reloaded (0 disables caching)
+    """
+
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._snapshot: Optional[dict] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> dict:
+        """The cached snapshot, reloaded through `db` (a primary session) when expired or invalidated."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            record_cache("dashboard", hit=True)
+            return snapshot
+
+        record_cache("dashboard", hit=False)
+        generation = self._generation
+        snapshot = load_snapshot(db)
+        with self._lock:
+            # A write that landed while we were loading may not be in this snapshot; don't keep it
+            if self.ttl_s > 0 and generation == self._generation:
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + self.ttl_s
+        return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+
+dashboard_snapshot = DashboardSnapshot(settings.dashboard_cache_ttl_s)
+
+WROTE_KEY = "dashboard_wrote"
+
+
+def _mark_write(session: Session):
+    session.info[WROTE_KEY] = True
+    dashboard_snapshot.invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    if session.new or session.dirty or session.deleted:
+        _mark_write(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop(WROTE_KEY, False):
+        dashboard_snapshot.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(WROTE_KEY, None)
@@ -1,34 +1,109 @@
-from typing import List, Dict, Any
+import hashlib
+import json
+from itertools import groupby
+from operator import itemgetter
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime, timedelta
-import numpy as np
 
+# Keys compare_alphas can return; "dates"/"actuals" are top-level, the rest are per-alpha
+COMPARE_FIELDS = ("dates", "actuals", "forecasts", "error_pct", "mape", "metrics", "next_period_forecast")
 
-def calculate_ses_with_steps(series: List[float], dates: List[str], alpha: float) -> Dict[str, Any]:
+
+def partition_series(rows: Iterable[Tuple[str, Any, float]]) -> Iterator[Tuple[str, List[str], List[float]]]:
     """
-    Calculate Single Exponential Smoothing (SES) with detailed step-by-step calculations.
+    Split (product_name, date, qty) rows into per-product (product_name, dates, actuals).
 
-    Formula: F(t) = alpha × A(t) + (1-alpha) × F(t-1)
+    Rows must already be ordered by product then date (SaleRepository.get_series_rows
+    does this in SQL), so this is one pass with no sorting. Dates become ISO strings.
+    """
+    for product_name, group in groupby(rows, key=itemgetter(0)):
+        dates, actuals = [], []
+        for _, day, qty in group:
+            dates.append(day.isoformat() if hasattr(day, "isoformat") else day)
+            actuals.append(qty)
+        yield product_name, dates, actuals
 
-    Each row's forecast folds in that same period's actual value (matches the
-    reference Excel workbook), so F(t) also serves directly as the forecast
-    for period t+1 — no separate lookahead step is needed.
+
+# Bump when the stored result layout or the SES kernel changes, so old results stop matching
+FORECAST_HASH_VERSION = 1
+
+
+def forecast_input_hash(
+    dates: List[str],
+    actuals: List[float],
+    alpha: float,
+    future_start: str,
+    future_periods: int
+) -> str:
+    """
+    SHA-256 of everything a stored forecast result depends on: the series
+    content, alpha and the projection horizon (start date and periods).
+    The product name is not part of it; the result does not contain it.
+    """
+    payload = json.dumps(
+        [FORECAST_HASH_VERSION, alpha, future_start, future_periods, dates, actuals],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def calculate_ses(series: List[float], alpha: float) -> List[float]:
+    """
+    Run the SES recurrence and return only the forecast series.
+
+    Formula: F(t) = alpha × A(t) + (1-alpha) × F(t-1), with F(1) = A(1)
 
     Args:
         series: List of actual values
-        dates: List of date strings corresponding to each value
         alpha: Smoothing coefficient (0-1)
 
     Returns:
-        Dictionary with forecasts, steps, and MAPE
+        List of forecasts, one per actual value
     """
     if not series:
-        return {"forecasts": [], "steps": [], "mape": 0}
+        return []
 
     forecasts = [series[0]]
-    steps = []
+    for i in range(1, len(series)):
+        forecasts.append(alpha * series[i] + (1 - alpha) * forecasts[i - 1])
+    return forecasts
+
+
+def calculate_error_pct(series: List[float], forecasts: List[float]) -> List[float]:
+    """
+    Per-period absolute percentage error, 0 where the actual value is 0.
+
+    Args:
+        series: List of actual values
+        forecasts: List of forecasted values (same length as series)
+
+    Returns:
+        List of error percentages, one per period
+    """
+    return [
+        (abs(actual - forecast) / actual * 100) if actual != 0 else 0
+        for actual, forecast in zip(series, forecasts)
+    ]
+
+
+def build_steps(series: List[float], dates: List[str], forecasts: List[float], alpha: float) -> List[Dict[str, Any]]:
+    """
+    Build the human-readable step-by-step breakdown for an SES run.
+
+    Args:
+        series: List of actual values
+        dates: List of date strings corresponding to each value
+        forecasts: Forecasts returned by calculate_ses for the same series/alpha
+        alpha: Smoothing coefficient (0-1)
+
+    Returns:
+        List of step dicts (period, date, formula, calculation, error, ...)
+    """
+    if not series:
+        return []
 
     # Step 1: Initial forecast
-    steps.append({
+    steps = [{
         "period": 1,
         "date": dates[0] if dates else "N/A",
         "actual": series[0],
@@ -38,16 +113,13 @@ def calculate_ses_with_steps(series: List[float], dates: List[str], alpha: float
         "result": series[0],
         "error": 0,
         "error_pct": 0
-    })
+    }]
 
     # Subsequent steps
     for i in range(1, len(series)):
         current_actual = series[i]
         prev_forecast = forecasts[i - 1]
-
-        # Calculate forecast (folds in this period's own actual)
-        current_forecast = alpha * current_actual + (1 - alpha) * prev_forecast
-        forecasts.append(current_forecast)
+        current_forecast = forecasts[i]
 
         # Calculate error
         error = abs(current_actual - current_forecast)
@@ -65,17 +137,53 @@ def calculate_ses_with_steps(series: List[float], dates: List[str], alpha: float
             "error_pct": error_pct
         })
 
+    return steps
+
+
+def calculate_ses_with_steps(
+    series: List[float],
+    dates: List[str],
+    alpha: float,
+    include_steps: bool = True
+) -> Dict[str, Any]:
+    """
+    Calculate Single Exponential Smoothing (SES) with detailed step-by-step calculations.
+
+    Formula: F(t) = alpha × A(t) + (1-alpha) × F(t-1)
+
+    Each row's forecast folds in that same period's actual value (matches the
+    reference Excel workbook), so F(t) also serves directly as the forecast
+    for period t+1 — no separate lookahead step is needed.
+
+    Args:
+        series: List of actual values
+        dates: List of date strings corresponding to each value
+        alpha: Smoothing coefficient (0-1)
+        include_steps: Build the per-step breakdown; when False "steps" is an
+            empty list and no formula/calculation strings are formatted
+
+    Returns:
+        Dictionary with forecasts, steps, and MAPE
+    """
+    if not series:
+        return {"forecasts": [], "steps": [], "mape": 0}
+
+    forecasts = calculate_ses(series, alpha)
+
     return {
         "forecasts": forecasts,
         # First period has no real forecast error (F1 = A1 by definition), so it's excluded from MAPE
         "mape": calculate_mape(series[1:], forecasts[1:]),
-        "steps": steps
+        "steps": build_steps(series, dates, forecasts, alpha) if include_steps else []
     }
 
 
 def calculate_mape(actual: List[float], forecast: List[float]) -> float:
     """
-    Calculate Mean Absolute Percentage Error (MAPE).
+    Calculate Mean Absolute Percentage Error (MAPE) of one series.
+
+    services.accuracy computes MAPE together with the other metrics, batched
+    over many series or alphas; this is the lean single-metric form.
 
     Args:
         actual: List of actual values
@@ -84,6 +192,7 @@ def calculate_mape(actual: List[float], forecast: List[float]) -> float:
     Returns:
         MAPE as a percentage
     """
+    import numpy as np  # deferred: keeps numpy off the app's startup path
     actual_np = np.array(actual)
     forecast_np = np.array(forecast)
     mask = actual_np != 0
@@ -92,41 +201,69 @@ def calculate_mape(actual: List[float], forecast: List[float]) -> float:
     return float(np.mean(np.abs((actual_np[mask] - forecast_np[mask]) / actual_np[mask])) * 100)
 
 
-def compare_alphas(series: List[float], dates: List[str], alphas: List[float]) -> Dict[str, Any]:
+def compare_alphas(
+    series: List[float],
+    dates: List[str],
+    alphas: List[float],
+    fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
     """
     Run SES for multiple alpha values on the same series and compare MAPE.
 
+    The metrics and error_pct for all alphas come from one batched
+    services.accuracy call over an (alphas, periods) forecast matrix.
+
     Args:
         series: List of actual values
         dates: List of date strings corresponding to each value
         alphas: List of smoothing coefficients to compare
+        fields: Per-alpha keys to include (subset of COMPARE_FIELDS); None
+            includes everything. Omitted keys are never computed.
 
     Returns:
         Dictionary with per-alpha forecasts/MAPE/next-period forecast and the best alpha
     """
+    import numpy as np  # deferred: keeps numpy off the app's startup path
+    from services.accuracy import accuracy, percentage_errors, plain_metrics
+
+    wanted = set(COMPARE_FIELDS if fields is None else fields)
     by_alpha: Dict[str, Any] = {}
 
-    for alpha in alphas:
-        calc_result = calculate_ses_with_steps(series, dates, alpha)
-        forecasts = calc_result["forecasts"]
-        next_forecast = forecasts[-1] if forecasts else 0
-
-        by_alpha[f"{alpha:.1f}"] = {
-            "alpha": alpha,
-            "forecasts": forecasts,
-            "error_pct": [step["error_pct"] for step in calc_result["steps"]],
-            "mape": calc_result["mape"],
-            "next_period_forecast": next_forecast
-        }
+    forecasts_by_alpha = [calculate_ses(series, alpha) for alpha in alphas]
+    matrix = np.array(forecasts_by_alpha, dtype=float).reshape(len(alphas), len(series))
+    actuals = np.asarray(series, dtype=float)
+    # F1 = A1 by definition, so the first period is left out of the metrics
+    metrics = accuracy(actuals[1:], matrix[:, 1:])
+    error_pct = percentage_errors(actuals, matrix).tolist() if "error_pct" in wanted else None
+
+    for k, (alpha, forecasts) in enumerate(zip(alphas, forecasts_by_alpha)):
+        scores = plain_metrics(metrics, (k,))
+        entry: Dict[str, Any] = {"alpha": alpha, "mape": scores["mape"] or 0}
+        if "metrics" in wanted:
+            entry["metrics"] = scores
+        if "forecasts" in wanted:
+            entry["forecasts"] = forecasts
+        if "error_pct" in wanted:
+            entry["error_pct"] = error_pct[k]
+        if "next_period_forecast" in wanted:
+            entry["next_period_forecast"] = forecasts[-1] if forecasts else 0
+        by_alpha[f"{alpha:.1f}"] = entry
 
     best_key = min(by_alpha, key=lambda k: by_alpha[k]["mape"]) if by_alpha else None
 
-    return {
-        "dates": dates,
-        "actuals": series,
-        "by_alpha": by_alpha,
-        "best_alpha": by_alpha[best_key]["alpha"] if best_key else None
-    }
+    if "mape" not in wanted:
+        # MAPE is always needed to pick the best alpha, but only returned when asked for
+        for entry in by_alpha.values():
+            del entry["mape"]
+
+    result: Dict[str, Any] = {}
+    if "dates" in wanted:
+        result["dates"] = dates
+    if "actuals" in wanted:
+        result["actuals"] = series
+    result["by_alpha"] = by_alpha
+    result["best_alpha"] = by_alpha[best_key]["alpha"] if best_key else None
+    return result
 
 
 def generate_future_forecasts(last_forecast: float, start_date: str, periods: int = 3) -> List[Dict[str, Any]]:
@@ -0,0 +1,142 @@
+"""
+Readiness checks for /health/ready.
+
+/health only says the process is up. Readiness additionally answers "can this
+instance take more traffic right now?": the DB answers quickly, the pool is not
+saturated, the event loop is not lagging, and every registered background
+component (write buffers, caches, ...) reports healthy. A configured read
+replica is pinged like the primary and reported as the "replica" component.
+
+The endpoint is unauthenticated, so failures are reported as a fixed message;
+the driver's error text (host, user, SQL) only goes to the log.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import text
+
+import database
+from database import engine, pool_status
+
+logger = logging.getLogger(__name__)
+
+# name -> callable returning a dict with at least {"ok": bool}
+_components: Dict[str, Callable[[], dict]] = {}
+
+# Pings run on their own threads, one at a time per database: a ping stuck on a stalled DB
+# is reported by later probes instead of each probe tying up another worker and checkout
+_ping_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="readiness-ping")
+_pings: Dict[str, Future] = {}
+
+
+def register_component(name: str, check: Callable[[], dict]):
+    """Register a background worker or cache whose state is reported (and gated on) by readiness."""
+    _components[name] = check
+
+
+def unregister_component(name: str):
+    _components.pop(name, None)
+
+
+def _ping_db(bind) -> float:
+    started = time.perf_counter()
+    with bind.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return (time.perf_counter() - started) * 1000
+
+
+def _capacity(pool: dict) -> int:
+    return pool["size"] + max(pool["max_overflow"], 0) if pool else 0
+
+
+async def _check_database(name: str, bind, db_timeout_s: float) -> dict:
+    """SELECT 1 round trip on `bind`, waiting at most db_timeout_s."""
+    pool = pool_status(bind)
+    capacity = _capacity(pool)
+    if capacity > 0 and pool["checked_out"] >= capacity:
+        # A ping would only queue for a connection
+        return {"ok": False, "error": "no free pooled connection; ping skipped"}
+    ping = _pings.get(name)
+    if ping is not None and not ping.done():
+        return {"ok": False, "error": "previous ping still running"}
+
+    _pings[name] = ping = _ping_executor.submit(_ping_db, bind)
+    try:
+        # Shielded: on timeout stop waiting, but leave the ping to finish and clear itself
+        latency_ms = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(ping)), timeout=db_timeout_s)
+        return {"ok": True, "latency_ms": round(latency_ms, 2)}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"no response within {db_timeout_s}s"}
+    except Exception:
+        logger.warning("Readiness ping to the %s database failed", name, exc_info=True)
+        return {"ok": False, "error": "unavailable"}
+
+
+async def measure_loop_lag() -> float:
+    """Milliseconds between scheduling a callback and the event loop running it."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    scheduled = loop.time()
+    loop.call_soon(lambda: future.done() or future.set_result(loop.time()))
+    return (await future - scheduled) * 1000
+
+
+async def check_readiness(
+    db_timeout_s: float,
+    pool_saturation: float,
+    loop_lag_ms: float,
+    bind=None
+) -> Tuple[bool, dict]:
+    """
+    Run all readiness checks.
+
+    Args:
+        db_timeout_s: Max seconds for the SELECT 1 round trip (skipped while the pool
+            has no free connection or the previous ping has not returned)
+        pool_saturation: Fail when checked-out / (size + max_overflow) reaches this ratio
+        loop_lag_ms: Fail when event-loop scheduling lag exceeds this
+        bind: Engine to check (defaults to the app engine)
+
+    Returns:
+        (ready, report) where report holds the per-check details
+    """
+    bind = bind or engine
+    report: dict = {}
+    ready = True
+
+    pool = pool_status(bind)
+    if pool:
+        capacity = _capacity(pool)
+        saturation = pool["checked_out"] / capacity if capacity > 0 else 0.0
+        pool["saturation"] = round(saturation, 3)
+        pool["ok"] = saturation < pool_saturation
+
+    report["database"] = await _check_database("primary", bind, db_timeout_s)
+    ready &= report["database"]["ok"]
+
+    if pool:
+        ready &= pool["ok"]
+    report["pool"] = pool or {"ok": True, "note": "pool has no fixed size"}
+
+    lag = await measure_loop_lag()
+    report["event_loop"] = {"ok": lag < loop_lag_ms, "lag_ms": round(lag, 3)}
+    ready &= report["event_loop"]["ok"]
+
+    components = {}
+    if database.has_replica():
+        components["replica"] = await _check_database("replica", database.read_engine, db_timeout_s)
+        ready &= components["replica"]["ok"]
+    for name, check in list(_components.items()):
+        try:
+            state = check()
+        except Exception:
+            logger.warning("Readiness check of %s failed", name, exc_info=True)
+            state = {"ok": False, "error": "unavailable"}
+        components[name] = state
+        ready &= bool(state.get("ok"))
+    report["components"] = components
+
+    return ready, report
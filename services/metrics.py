@@ -0,0 +1,231 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are updated on the request path (a bisect plus a lock
+per observation); gauges that mirror other state, like the DB pool, are read
+by collectors only when /metrics is scraped.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.timing import Histogram
+
+# Latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# A sample is (metric name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _child(self, labels: Dict[str, str], factory: Callable[[], object]):
+        key = self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, factory())
+        return child
+
+    def _items(self) -> List[Tuple[Dict[str, str], object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        child = self._child(labels, _Value)
+        with self._lock:
+            child.value += amount
+
+    def value(self, **labels) -> float:
+        child = self._children.get(self._key(labels))
+        return child.value if child else 0.0
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, labels, child.value) for labels, child in self._items()]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        self._child(labels, _Value).value = value
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, labels, child.value) for labels, child in self._items()]
+
+
+class HistogramMetric(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        self._child(labels, lambda: Histogram(self.buckets)).observe(value)
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        for labels, histogram in self._items():
+            snapshot = histogram.snapshot()
+            for bound, count in snapshot["buckets"]:
+                le = "+Inf" if bound == "+Inf" else _format_value(bound)
+                samples.append((f"{self.name}_bucket", {**labels, "le": le}, count))
+            samples.append((f"{self.name}_sum", labels, snapshot["sum"]))
+            samples.append((f"{self.name}_count", labels, snapshot["count"]))
+        return samples
+
+
+class Registry:
+    """Holds metrics plus collectors that produce gauge samples at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Tuple[str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, name: str, help: str, collect: Callable[[], Iterable[Sample]]):
+        """`collect()` returns (sample name, labels, value) tuples for gauge family `name`."""
+        self._collectors.append((name, help, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help, collect in self._collectors:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            for sample_name, labels, value in collect():
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(HistogramMetric(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+))
+forecast_kernel_duration = registry.register(HistogramMetric(
+    "forecast_kernel_duration_seconds", "Time spent in forecast kernels.", ("kernel",)
+))
+forecast_series_length = registry.register(HistogramMetric(
+    "forecast_series_length", "Number of periods per forecast series.", ("kernel",),
+    buckets=(7, 14, 31, 90, 180, 365, 730, 1825, 3650)
+))
+forecast_product_count = registry.register(HistogramMetric(
+    "forecast_product_count", "Products per forecast request.", ("endpoint",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+))
+db_pool_checkout_wait = registry.register(HistogramMetric(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", ("engine",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result")
+))
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a lookup against an in-process cache."""
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _cache_hit_ratios() -> List[Sample]:
+    caches = {labels["cache"] for labels, _ in cache_requests._items()}
+    samples = []
+    for cache in sorted(caches):
+        hits = cache_requests.value(cache=cache, result="hit")
+        total = hits + cache_requests.value(cache=cache, result="miss")
+        samples.append(("cache_hit_ratio", {"cache": cache}, hits / total if total else 0.0))
+    return samples
+
+
+registry.register_collector("cache_hit_ratio", "Share of cache lookups that were hits.", _cache_hit_ratios)
+
+
+def observe_kernel(kernel: str, started: float, series_length: Optional[int] = None):
+    """Record a forecast kernel run that started at time.perf_counter() value `started`."""
+    forecast_kernel_duration.observe(time.perf_counter() - started, kernel=kernel)
+    if series_length is not None:
+        forecast_series_length.observe(series_length, kernel=kernel)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per (method, route template, status)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template; unmatched paths share one label to bound cardinality
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""), route=route, status=str(status["code"])
+            )
@@ -1,4 +1,7 @@
-from datetime import datetime
+import time
+from datetime import date, datetime
+from typing import Callable, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import models
 from services.auth_service import get_password_hash
@@ -88,13 +91,60 @@ class SeedService:
         """Seed May 2025 sales data if no sales exist."""
         if self.db.query(models.Sale).count() == 0:
             for row in MAY_DATA_RAW:
-                date = row[0]
+                # Raw rows use the spreadsheet's "DD-Mon-YY" format; the Date column needs real dates
+                sale_date = datetime.strptime(row[0], "%d-%b-%y").date()
                 for i, product in enumerate(PRODUCTS):
                     qty = row[i + 1]
-                    sale = models.Sale(date=date, product_name=product, qty=qty)
+                    sale = models.Sale(date=sale_date, product_name=product, qty=qty)
                     self.db.add(sale)
             self.db.commit()
 
+    def seed_synthetic(
+        self,
+        n_products: int,
+        n_days: int,
+        start: Optional[date] = None,
+        seed: int = 42,
+        chunk_rows: int = 50_000,
+        prefix: str = "Synthetic",
+        progress: Optional[Callable[[int, float], None]] = None,
+        **shape
+    ) -> int:
+        """
+        Bulk-insert a synthetic dataset of `n_products` × `n_days` (see services/synthetic_data.py).
+
+        Products that already exist are reused. Each chunk of sales is one
+        driver-level executemany (no ORM/bind processing per row) and one commit;
+        `progress(rows_so_far, elapsed_s)` is called after each chunk. Returns
+        the number of sales inserted.
+        """
+        # Deferred: synthetic_data pulls in numpy, which the app itself doesn't need at startup
+        from services.synthetic_data import SALE_COLUMNS, generate_sales, product_names
+
+        started = time.perf_counter()
+        names = product_names(n_products, prefix)
+        existing = {name for (name,) in self.db.query(models.Product.name).filter(models.Product.name.in_(names))}
+        new_products = [{"name": name, "created_at": datetime.utcnow()} for name in names if name not in existing]
+        if new_products:
+            self.db.execute(insert(models.Product), new_products)
+            self.db.commit()
+
+        connection = self.db.connection()
+        placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+        statement = (
+            f"INSERT INTO {models.Sale.__tablename__} ({', '.join(SALE_COLUMNS)}) "
+            f"VALUES ({', '.join([placeholder] * len(SALE_COLUMNS))})"
+        )
+
+        inserted = 0
+        for chunk in generate_sales(n_products, n_days, start=start, seed=seed, chunk_rows=chunk_rows, prefix=prefix, **shape):
+            self.db.connection().exec_driver_sql(statement, chunk)
+            self.db.commit()
+            inserted += len(chunk)
+            if progress:
+                progress(inserted, time.perf_counter() - started)
+        return inserted
+
     def seed_all(self):
         """Seed all initial data (users, products, sales)."""
         self.create_default_users()
@@ -108,3 +158,26 @@ def seed_database(db: Session) -> SeedService:
     service = SeedService(db)
     service.seed_all()
     return service
+
+
+def init_database(seed: bool = True, rebuild_projects: bool = False):
+    """
+    Create missing tables and optionally seed default data (init_db.py, or INIT_DB_ON_STARTUP).
+
+    forecast_projects is rebuilt from the forecasts table when asked to, or when
+    it is empty while forecasts exist (first run after the table was added).
+    """
+    from database import Base, SessionLocal, engine
+    from repositories.forecast_repository import ForecastRepository
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if seed:
+            seed_database(db)
+        if rebuild_projects or (
+            db.query(models.ForecastProject.id).first() is None
+            and db.query(models.Forecast.id).filter(models.Forecast.project_name.isnot(None)).first() is not None
+        ):
+            ForecastRepository(db).rebuild_projects()
+    finally:
+        db.close()
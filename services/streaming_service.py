@@ -0,0 +1,165 @@
+"""
+Constant-memory SES over (product_name, date, qty) rows read in batches.
+
+create_forecast materializes every row, each product's series and its step
+breakdown. Here rows arrive in product/date order in batches (e.g. from a
+server-side cursor, SaleRepository.stream_series_rows) and each product keeps
+only its running state: the last SES level, first and last date, period
+count and an ErrorAccumulator. A product's result is emitted as soon as the
+next product's first row shows up, so memory is bounded by the batch size,
+not by the length or width of the history.
+
+Within a batch the recurrence runs as a scan, not a Python loop. Unrolled,
+L(t) = d^t · (Σ_{j<=t} w_j · d^-j · A(j) + L(-1)) with d = 1 - a and w_j = a
+(w_j = 1 at a product's first period, where L = A), so a cumulative sum of
+w·d^-j·A gives every level of a block; a product starting inside the block
+subtracts the sum up to its first row. Blocks are short enough that d^-j
+stays far from overflow.
+"""
+import math
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from services.accuracy import ErrorAccumulator, plain_metrics
+from services.forecast_service import generate_future_forecasts
+from services.metrics import observe_kernel
+
+# Largest |d|^±j a scan block may reach
+_MAX_SCALE_LOG10 = 200
+
+
+def ses_scan(values: "np.ndarray", starts: "np.ndarray", alpha: float, carry: Optional[float] = None) -> "np.ndarray":
+    """
+    SES levels of consecutive rows that may span several products.
+
+    Args:
+        values: (n,) actuals in product/date order
+        starts: (n,) True where a product's first period is
+        alpha: Smoothing coefficient, normally in (0, 1]; other values follow calculate_ses
+        carry: Level before values[0], when values[0] continues a product from an earlier batch
+
+    Returns:
+        (n,) levels; a product's slice equals calculate_ses over its series
+    """
+    import numpy as np  # deferred: keeps numpy off the app's startup path
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if alpha == 1:
+        return values.copy()
+    d = 1 - alpha
+    weights = np.where(starts, 1.0, alpha)
+    # |d|^-j must stay finite over a block; with |d| = 1 (alpha 0 or 2) nothing grows
+    magnitude = abs(math.log10(abs(d)))
+    block = n if magnitude == 0 else int(_MAX_SCALE_LOG10 / magnitude)
+    block = max(1, min(n, block))
+    k = np.arange(block)
+    scale_down = d ** k
+    scale_up = 1 / scale_down
+    carry_weight = scale_down * d
+
+    levels = np.empty(n)
+    level = np.nan if carry is None else carry
+    for start in range(0, n, block):
+        x = values[start:start + block]
+        width = len(x)
+        sums = np.cumsum(weights[start:start + width] * x * scale_up[:width])
+        # Position of the latest product start at or before each row, -1 if none in this block
+        first = np.maximum.accumulate(np.where(starts[start:start + width], k[:width], -1))
+        prefix = np.concatenate(([0.0], sums))
+        out = (sums - prefix[np.maximum(first, 0)]) * scale_down[:width]
+        # Rows continuing the product carried in from the previous block
+        carried = first < 0
+        if carried.any():
+            out[carried] += carry_weight[:width][carried] * level
+        levels[start:start + width] = out
+        level = out[-1]
+    return levels
+
+
+class _ProductState:
+    """What stream_forecasts keeps of the product being read."""
+
+    __slots__ = ("name", "level", "periods", "start_date", "end_date", "errors")
+
+    def __init__(self, name: str, start_date: Any):
+        self.name = name
+        self.level = math.nan
+        self.periods = 0
+        self.start_date = start_date
+        self.end_date = start_date
+        self.errors = ErrorAccumulator()
+
+    def result(self, future_start: Optional[str], future_periods: int) -> Dict[str, Any]:
+        metrics = plain_metrics(self.errors.result())
+        end_date = _iso(self.end_date)
+        return {
+            "periods": self.periods,
+            "start_date": _iso(self.start_date),
+            "end_date": end_date,
+            # A single period has nothing to score; calculate_ses_with_steps reports 0 too
+            "mape": metrics["mape"] or 0,
+            "metrics": metrics,
+            "next_period_forecast": self.level,
+            "future_forecasts": generate_future_forecasts(self.level, future_start or end_date, future_periods),
+        }
+
+
+def _iso(day: Any) -> str:
+    return day.isoformat() if hasattr(day, "isoformat") else day
+
+
+def stream_forecasts(
+    batches: Iterable[Sequence[Tuple[str, Any, float]]],
+    alpha: float,
+    future_start: Optional[str] = None,
+    future_periods: int = 3
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    SES per product over batches of rows, yielding (product_name, result) as each product ends.
+
+    Args:
+        batches: Lists of (product_name, date, qty) rows, ordered by product then date across batches
+        alpha: Smoothing coefficient in (0, 1]
+        future_start: ISO date of the first projected period (default: each product's last date)
+        future_periods: Periods in future_forecasts
+
+    Results hold periods, start_date, end_date, mape, metrics, next_period_forecast
+    and future_forecasts. mape and next_period_forecast match calculate_ses_with_steps
+    on the product's whole series; metrics holds the services.accuracy metrics of
+    the same in-sample errors.
+    """
+    import numpy as np
+    current: Optional[_ProductState] = None
+    for batch in batches:
+        n = len(batch)
+        if n == 0:
+            continue
+        started = time.perf_counter()
+        names = np.array([row[0] for row in batch], dtype=object)
+        values = np.fromiter((row[2] for row in batch), dtype=float, count=n)
+        starts = np.empty(n, dtype=bool)
+        starts[0] = current is None or names[0] != current.name
+        starts[1:] = names[1:] != names[:-1]
+
+        levels = ses_scan(values, starts, alpha, carry=None if starts[0] else current.level)
+        # F(1) = A(1) by definition, so a product's first period is not scored
+        forecasts = levels.copy()
+        forecasts[starts] = np.nan
+
+        bounds: List[int] = np.flatnonzero(starts).tolist()
+        if not starts[0]:
+            bounds.insert(0, 0)
+        bounds.append(n)
+        for first, stop in zip(bounds, bounds[1:]):
+            if starts[first]:
+                if current is not None:
+                    yield current.name, current.result(future_start, future_periods)
+                current = _ProductState(names[first], batch[first][1])
+            current.errors.update(values[first:stop], forecasts[first:stop])
+            current.periods += stop - first
+            current.end_date = batch[stop - 1][1]
+            current.level = float(levels[stop - 1])
+        observe_kernel("ses_stream", started, series_length=n)
+
+    if current is not None:
+        yield current.name, current.result(future_start, future_periods)
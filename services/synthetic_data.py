@@ -0,0 +1,96 @@
+"""
+Synthetic daily sales for load and benchmark datasets.
+
+Each product gets its own level, trend, weekly and yearly seasonality and
+Poisson noise; a share of products is intermittent (many zero days) and some
+series have missing days or whole gaps, like a real POS export. Every product
+draws from its own generator seeded with (seed, product index), so the same
+arguments always produce the same rows regardless of chunk size.
+"""
+from datetime import date, timedelta
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+DEFAULT_START = date(2023, 1, 1)
+
+# Column order of the row tuples yielded by generate_sales
+SALE_COLUMNS = ("date", "product_name", "qty")
+
+# Series shape; any key can be overridden through **shape
+SHAPE_DEFAULTS = {
+    "mean_level": 20.0,          # median average daily qty across products
+    "weekly_amplitude": 0.4,     # up to ±40% swing across the week
+    "yearly_amplitude": 0.3,     # up to ±30% swing across the year
+    "intermittent_share": 0.2,   # share of products that sell on only some days
+    "zero_prob": 0.02,           # chance of a zero day for regular products
+    "missing_prob": 0.01,        # chance of a single missing day
+    "gap_prob": 0.1,             # chance a product has one multi-day gap (up to 30 days)
+}
+
+
+def product_names(n_products: int, prefix: str = "Synthetic") -> List[str]:
+    width = max(4, len(str(n_products)))
+    return [f"{prefix} {i:0{width}d}" for i in range(1, n_products + 1)]
+
+
+def product_series(index: int, n_days: int, seed: int = 42, **shape) -> np.ndarray:
+    """Daily qty for product `index` as a float array; NaN marks a day with no row."""
+    unknown = set(shape) - set(SHAPE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown shape options: {', '.join(sorted(unknown))}")
+    o = {**SHAPE_DEFAULTS, **shape}
+    rng = np.random.default_rng([seed, index])
+    t = np.arange(n_days)
+
+    level = rng.lognormal(np.log(o["mean_level"]), 0.8)
+    trend = rng.normal(0, 0.3 / 365)
+    weekly = 1 + rng.uniform(0, o["weekly_amplitude"]) * np.cos(2 * np.pi * (t + rng.integers(7)) / 7)
+    yearly = 1 + rng.uniform(0, o["yearly_amplitude"]) * np.sin(2 * np.pi * (t + rng.integers(365)) / 365)
+    mean = np.clip(level * (1 + trend * t) * weekly * yearly, 0, None)
+
+    qty = rng.poisson(mean).astype(float)
+
+    zero_prob = rng.uniform(0.3, 0.8) if rng.random() < o["intermittent_share"] else o["zero_prob"]
+    qty[rng.random(n_days) < zero_prob] = 0
+
+    qty[rng.random(n_days) < o["missing_prob"]] = np.nan
+    if n_days > 1 and rng.random() < o["gap_prob"]:
+        length = int(rng.integers(2, min(30, n_days) + 1))
+        begin = int(rng.integers(0, n_days - length + 1))
+        qty[begin:begin + length] = np.nan
+    return qty
+
+
+def generate_sales(
+    n_products: int,
+    n_days: int,
+    start: Optional[date] = None,
+    seed: int = 42,
+    chunk_rows: int = 100_000,
+    prefix: str = "Synthetic",
+    **shape
+) -> Iterator[List[tuple]]:
+    """
+    Yield sale rows as SALE_COLUMNS tuples in chunks of about `chunk_rows`.
+
+    Dates start at `start` (DEFAULT_START if None) and are ISO strings so
+    chunks can go straight to a DB-API executemany. Rows come product by
+    product in date order; memory stays bounded by the chunk size.
+    """
+    start = start or DEFAULT_START
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(n_days)]
+    names = product_names(n_products, prefix)
+    chunk: List[tuple] = []
+
+    for index, name in enumerate(names):
+        qty = product_series(index, n_days, seed, **shape)
+        present = np.flatnonzero(~np.isnan(qty))
+        values = qty[present].astype(int).tolist()
+        chunk.extend((dates[day], name, value) for day, value in zip(present.tolist(), values))
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
@@ -0,0 +1,60 @@
+"""
+Jinja2 environment with a compiled-template cache that works on Python 3.14.
+
+Jinja2's own cache is an LRUCache keyed by (weakref(loader), name); on 3.14
+hashing those keys breaks, so main.py used to run with cache_size=0 and every
+render re-read, re-parsed and re-compiled the page plus base.html and its
+partials. CachedEnvironment keeps compiled templates in a plain dict keyed by
+name instead (one loader per environment, and the template set is small and
+fixed, so no eviction is needed). A FileSystemBytecodeCache keeps the compiled
+code on disk so a fresh process skips the parse/compile step as well.
+"""
+from typing import Any, Dict, MutableMapping, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+
+class CachedEnvironment(Environment):
+    """Environment whose template cache is a plain dict instead of the weakref-keyed LRU."""
+
+    def __init__(self, **options):
+        super().__init__(**{**options, "cache_size": 0})
+        self.compiled: Dict[str, Template] = {}
+
+    def _load_template(self, name: str, globals: Optional[MutableMapping[str, Any]]) -> Template:
+        if self.loader is None:
+            raise TypeError("no loader for this environment specified")
+        template = self.compiled.get(name)
+        if template is not None and (not self.auto_reload or template.is_up_to_date):
+            # template.globals is a ChainMap; updating it only affects this template
+            if globals:
+                template.globals.update(globals)
+            return template
+
+        template = self.loader.load(self, name, self.make_globals(globals))
+        self.compiled[name] = template
+        return template
+
+
+def create_template_env(directory: str, bytecode_dir: Optional[str] = None, auto_reload: bool = True) -> CachedEnvironment:
+    """
+    Build the app's template environment.
+
+    Args:
+        directory: Template directory
+        bytecode_dir: On-disk bytecode cache directory (None = system temp dir)
+        auto_reload: Recompile a cached template when its file changes (one stat per render)
+    """
+    return CachedEnvironment(
+        loader=FileSystemLoader(directory),
+        bytecode_cache=FileSystemBytecodeCache(bytecode_dir),
+        auto_reload=auto_reload,
+    )
+
+
+def precompile(env: Environment) -> int:
+    """Load and compile every template up front; returns how many were loaded."""
+    names = env.list_templates(extensions=("html",))
+    for name in names:
+        env.get_template(name)
+    return len(names)
@@ -0,0 +1,222 @@
+"""
+Per-request phase timing.
+
+Wrap interesting phases in `span("name")` (or decorate with `@timed("name")`).
+While a request is being timed by TimingMiddleware, span durations are summed
+per name, folded into per-route histograms, optionally returned in a
+`Server-Timing` header and logged when the request is slower than the
+configured threshold.
+
+Outside a timed request (middleware disabled, scripts, tests) `span` only does
+a ContextVar lookup, so instrumented code pays next to nothing.
+"""
+import bisect
+import functools
+import inspect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is +Inf
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class RequestTimer:
+    """Accumulates span durations (ms) for one request, in first-seen order."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+
+    def add(self, name: str, elapsed_ms: float):
+        self.spans[name] = self.spans.get(name, 0.0) + elapsed_ms
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar("request_timer", default=None)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as phase `name` of the current request (no-op if untimed)."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, (time.perf_counter() - start) * 1000)
+
+
+def add_span(name: str, elapsed_ms: float):
+    """Record an already-measured duration as phase `name` of the current request (no-op if untimed)."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(name, elapsed_ms)
+
+
+def timed(name: str):
+    """Decorator form of span(); works on both sync and async functions."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Histogram:
+    """Thread-safe cumulative histogram (count/sum plus fixed bucket counts)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        cumulative, running = [], 0
+        for bound, n in zip(list(self.buckets) + ["+Inf"], counts):
+            running += n
+            cumulative.append((bound, running))
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+
+class PhaseHistograms:
+    """Histograms of phase durations keyed by (route, phase)."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, phase: str, elapsed_ms: float):
+        key = (route, phase)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.observe(elapsed_ms)
+
+    def items(self) -> List[Tuple[Tuple[str, str], Histogram]]:
+        with self._lock:
+            return list(self._histograms.items())
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        result: Dict[str, Dict[str, dict]] = {}
+        for (route, phase), histogram in self.items():
+            result.setdefault(route, {})[phase] = histogram.snapshot()
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+phase_histograms = PhaseHistograms()
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose body rendering is recorded as the "encode" phase."""
+
+    def render(self, content: Any) -> bytes:
+        with span("encode"):
+            return super().render(content)
+
+
+def route_label(scope: dict) -> str:
+    """'METHOD /path/{param}' for the matched route, or the raw path if none matched."""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+def server_timing_value(spans: Dict[str, float], total_ms: float) -> str:
+    parts = [f"{name};dur={elapsed:.2f}" for name, elapsed in spans.items()]
+    parts.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware that times each HTTP request.
+
+    Args:
+        app: The wrapped ASGI app
+        server_timing_header: Add a Server-Timing header with the spans recorded
+            before the response started
+        slow_request_ms: Log a warning with the phase breakdown for requests
+            slower than this (None disables)
+        histograms: Where per-route phase durations are recorded
+    """
+
+    def __init__(
+        self,
+        app,
+        server_timing_header: bool = False,
+        slow_request_ms: Optional[float] = None,
+        histograms: PhaseHistograms = phase_histograms
+    ):
+        self.app = app
+        self.server_timing_header = server_timing_header
+        self.slow_request_ms = slow_request_ms
+        self.histograms = histograms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+
+        async def send_wrapper(message):
+            if self.server_timing_header and message["type"] == "http.response.start":
+                value = server_timing_value(timer.spans, timer.total_ms())
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timer.reset(token)
+            total_ms = timer.total_ms()
+            route = route_label(scope)
+            for name, elapsed in timer.spans.items():
+                self.histograms.observe(route, name, elapsed)
+            self.histograms.observe(route, "total", total_ms)
+
+            if self.slow_request_ms is not None and total_ms > self.slow_request_ms:
+                logger.warning(
+                    "Slow request %s took %.1fms (%s)",
+                    route, total_ms, server_timing_value(timer.spans, total_ms)
+                )
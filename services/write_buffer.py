@@ -0,0 +1,150 @@
+"""
+Group commit for single-row inserts.
+
+Each POST /api/sales normally pays for its own transaction, and on SQLite all
+of those commits queue on one write lock. GroupCommitBuffer collects rows
+submitted by concurrent requests and writes them in one transaction, closing a
+batch when it reaches `max_batch` rows or `max_delay_ms` after its first row.
+Callers are only acknowledged once their batch has committed, so a 200 still
+means the row is durable.
+
+While one batch is being committed (in the threadpool), the next one fills up,
+so under load the batch size grows by itself and latency stays near one commit.
+"""
+import asyncio
+import time
+from typing import Callable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from services.metrics import HistogramMetric, registry
+
+write_batch_size = registry.register(HistogramMetric(
+    "write_buffer_batch_size", "Rows committed per group commit.", ("buffer",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+))
+write_batch_duration = registry.register(HistogramMetric(
+    "write_buffer_commit_seconds", "Time to commit one group of rows.", ("buffer",)
+))
+
+
+class GroupCommitBuffer:
+    """
+    Coalesce concurrent single-row writes into batched commits.
+
+    Args:
+        flush: Blocking callable writing a list of rows in one transaction; run in the threadpool
+        max_batch: Most rows per commit
+        max_delay_ms: Longest time the first row of a batch waits for company
+        name: Label for metrics and readiness
+    """
+
+    def __init__(self, flush: Callable[[List[dict]], None], max_batch: int = 100, max_delay_ms: float = 5.0, name: str = "default"):
+        self.flush = flush
+        self.max_batch = max_batch
+        self.max_delay_s = max_delay_ms / 1000
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self.last_error: Optional[str] = None
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            # (Re)bind to the running loop; a previous loop's worker cannot be reused
+            self._loop = loop
+            self._closing = False
+            self._has_rows = asyncio.Event()
+            self._full = asyncio.Event()
+            if self._pending:
+                self._has_rows.set()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, row: dict):
+        """Queue `row` and return once the batch containing it has committed (re-raises its error)."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._pending.append((row, future))
+        self._has_rows.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        await future
+
+    async def _run(self):
+        while True:
+            await self._has_rows.wait()
+            if not self._closing:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay_s)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if len(self._pending) < self.max_batch:
+                self._full.clear()
+            if not self._pending:
+                self._has_rows.clear()
+
+            if batch:
+                await self._commit(batch)
+            if self._closing and not self._pending:
+                return
+
+    async def _commit(self, batch: List[Tuple[dict, asyncio.Future]]):
+        started = time.perf_counter()
+        try:
+            await run_in_threadpool(self.flush, [row for row, _ in batch])
+        except Exception as e:
+            self.last_error = str(e)
+            if len(batch) == 1:
+                _resolve(batch[0][1], e)
+                return
+            # Retry row by row so one bad row only fails its own request
+            for row, future in batch:
+                try:
+                    await run_in_threadpool(self.flush, [row])
+                    _resolve(future)
+                except Exception as row_error:
+                    _resolve(future, row_error)
+            return
+
+        write_batch_size.observe(len(batch), buffer=self.name)
+        write_batch_duration.observe(time.perf_counter() - started, buffer=self.name)
+        self.batches += 1
+        self.rows += len(batch)
+        for _, future in batch:
+            _resolve(future)
+
+    async def close(self):
+        """Commit everything still queued and stop the worker."""
+        if self._task is None or self._task.done():
+            return
+        self._closing = True
+        self._has_rows.set()
+        self._full.set()
+        await self._task
+
+    def status(self) -> dict:
+        """Readiness report: not ok if rows are queued but no worker is running."""
+        worker_alive = self._task is not None and not self._task.done()
+        return {
+            "ok": worker_alive or not self._pending,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "rows": self.rows,
+            "last_error": self.last_error,
+        }
+
+
+def _resolve(future: asyncio.Future, error: Optional[BaseException] = None):
+    # The caller may have gone away (client disconnect); its row is written regardless
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
@@ -50,6 +50,21 @@ const api = {
         return this.request(url, { method: 'GET' });
     },
 
+    // GET one page of a keyset-paginated list endpoint.
+    // Resolves to { items, nextCursor }; nextCursor is null on the last page.
+    async getPage(url) {
+        const response = await fetch(url, { method: 'GET', credentials: 'same-origin' });
+        if (response.status === 401) {
+            window.location.href = '/login';
+            throw new Error('Unauthorized');
+        }
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.detail || data.message || 'Request failed');
+        }
+        return { items: data, nextCursor: response.headers.get('X-Next-Cursor') };
+    },
+
     post(url, data) {
         return this.request(url, {
             method: 'POST',
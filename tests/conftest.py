@@ -1,11 +1,14 @@
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from main import app
-from database import Base, get_db
+from database import Base, get_db, capture_queries, configure_read_engine
 from services.auth_service import get_password_hash
+from services.dashboard_service import dashboard_snapshot
 import models
 
 # Test database URL (in-memory SQLite)
@@ -14,7 +17,8 @@ SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
 # Create test engine
 engine = create_engine(
     SQLALCHEMY_TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -24,6 +28,8 @@ def db_session():
     """Create a test database session."""
     # Create tables
     Base.metadata.create_all(bind=engine)
+    # The snapshot outlives the dropped tables of the previous test
+    dashboard_snapshot.invalidate()
     db = TestingSessionLocal()
     try:
         yield db
@@ -125,3 +131,56 @@ def test_sales(client, db_session, test_products):
         db_session.add(s)
     db_session.commit()
     return sales
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert how many SQL statements a block issues against the test database.
+
+    Usage:
+        with query_budget(2):
+            client.get("/api/sales", headers=auth_headers)
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with capture_queries(engine) as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Expected at most {max_queries} queries, got {stats.count}:\n{stats.format()}"
+        )
+    return budget
+
+
+@pytest.fixture
+def replica(db_session):
+    """
+    Route read sessions to a second in-memory database standing in for a replica.
+
+    The replica only changes when the test calls `replica.sync()`, which copies
+    every table from the primary, so tests control the replication lag.
+    """
+    replica_engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=replica_engine)
+
+    def sync():
+        db_session.commit()
+        with engine.connect() as source, replica_engine.begin() as target:
+            for table in reversed(Base.metadata.sorted_tables):
+                target.execute(table.delete())
+            for table in Base.metadata.sorted_tables:
+                rows = [dict(row._mapping) for row in source.execute(table.select())]
+                if rows:
+                    target.execute(table.insert(), rows)
+
+    replica_engine.sync = sync
+    configure_read_engine(replica_engine)
+    try:
+        yield replica_engine
+    finally:
+        configure_read_engine(None)
+        replica_engine.dispose()
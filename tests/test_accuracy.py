@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+import pytest
+
+from services.accuracy import ErrorAccumulator, accuracy, percentage_errors, plain_metrics
+
+
+def reference_metrics(actuals, forecasts):
+    """Each metric computed on its own, straight from the definitions."""
+    errors = [a - f for a, f in zip(actuals, forecasts)]
+    nonzero = [(abs(e) / abs(a)) for a, e in zip(actuals, errors) if a != 0]
+    symmetric = [2 * abs(e) / (abs(a) + abs(f)) for a, f, e in zip(actuals, forecasts, errors) if abs(a) + abs(f) != 0]
+    naive = [abs(b - a) for a, b in zip(actuals, actuals[1:])]
+    mae = sum(abs(e) for e in errors) / len(errors)
+    return {
+        "mae": mae,
+        "rmse": math.sqrt(sum(e * e for e in errors) / len(errors)),
+        "mape": sum(nonzero) / len(nonzero) * 100 if nonzero else 0,
+        "smape": sum(symmetric) / len(symmetric) * 100 if symmetric else 0,
+        "mase": mae / (sum(naive) / len(naive)),
+        "bias": sum(errors) / len(errors),
+        "n": len(errors),
+    }
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    actuals = rng.poisson(4, 300).astype(float)
+    forecasts = np.stack([actuals + rng.normal(0, 1, 300), np.full(300, 4.0)])
+    return actuals, forecasts
+
+
+class TestAccuracy:
+    """Test the one-shot metrics."""
+
+    def test_matches_reference(self, series):
+        """Test every metric for a batch of two forecasts against one series."""
+        actuals, forecasts = series
+
+        metrics = accuracy(actuals, forecasts)
+
+        for k in range(2):
+            expected = reference_metrics(actuals.tolist(), forecasts[k].tolist())
+            assert plain_metrics(metrics, (k,)) == pytest.approx(expected)
+
+    def test_zero_actuals(self):
+        """Test that zero actuals are left out of MAPE only, and all-zero actuals give MAPE 0."""
+        metrics = accuracy([0, 10, 0, 20], [5, 5, 0, 10])
+
+        assert metrics["mape"] == pytest.approx((50 + 50) / 2)
+        assert metrics["mae"] == pytest.approx(20 / 4)
+        # The (0, 0) period is left out of sMAPE
+        assert metrics["smape"] == pytest.approx((200 + 2 * 5 / 15 * 100 + 2 * 10 / 30 * 100) / 3)
+        assert accuracy([0, 0], [1, 2])["mape"] == 0
+
+    def test_missing_and_empty(self):
+        """Test that NaN periods are skipped and no periods give NaN metrics."""
+        metrics = accuracy([1, float("nan"), 3], [2, 2, 2])
+        assert metrics["n"] == 2
+        assert metrics["mae"] == 1
+
+        empty = plain_metrics(accuracy([], []))
+        assert empty["n"] == 0
+        assert empty["mae"] is None and empty["mape"] is None
+
+    def test_constant_series_mase(self):
+        """Test that MASE is undefined when the naive forecast is perfect."""
+        assert math.isnan(accuracy([5, 5, 5], [4, 4, 4])["mase"])
+
+    def test_percentage_errors(self):
+        """Test per-period error percentages with a zero actual."""
+        assert percentage_errors([10, 0, 20], [5, 3, 25]).tolist() == [50, 0, 25]
+
+
+class TestErrorAccumulator:
+    """Test the streaming accumulator."""
+
+    def test_chunks_match_one_shot(self, series):
+        """Test that feeding uneven chunks gives the one-shot result, naive scale included."""
+        actuals, forecasts = series
+        acc = ErrorAccumulator((2,))
+        for start in range(0, 300, 37):
+            acc.update(actuals[start:start + 37], forecasts[:, start:start + 37])
+
+        chunked = acc.result()
+        whole = accuracy(actuals, forecasts)
+        for name in whole:
+            np.testing.assert_allclose(chunked[name], whole[name])
+
+    def test_merge_total_and_stack(self, series):
+        """Test that merged, stacked and totalled sums equal the pooled series."""
+        actuals, forecasts = series
+        first = ErrorAccumulator((2,)).update(actuals[:100], forecasts[:, :100])
+        second = ErrorAccumulator((2,)).update(actuals[100:], forecasts[:, 100:], scale=False)
+
+        stacked = ErrorAccumulator.stack([first, second])
+        assert stacked.shape == (2, 2)
+        pooled = stacked.total(axis=1).result()
+        merged = first.merge(second).result()
+        for name in ("mae", "rmse", "mape", "smape", "bias", "n"):
+            np.testing.assert_allclose(pooled[name], merged[name])
+            np.testing.assert_allclose(merged[name], accuracy(actuals, forecasts)[name])
@@ -162,3 +162,320 @@ class TestForecastsAPI:
 
         assert response.status_code == 200
         assert response.json()["status"] == "ok"
+
+    def test_create_forecast_fields(self, client: TestClient, admin_token, test_sales):
+        """Test that `fields` limits the per-product result keys."""
+        response = client.post(
+            "/api/forecast?fields=mape,next_period_forecast",
+            json={"alpha": 0.5, "product_name": "Test Product 1"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        result = response.json()["results"]["Test Product 1"]
+        assert set(result) == {"mape", "next_period_forecast"}
+
+    def test_create_forecast_unknown_field(self, client: TestClient, admin_token, test_sales):
+        """Test that unknown field names are rejected."""
+        response = client.post(
+            "/api/forecast?fields=mape,bogus",
+            json={"alpha": 0.5, "product_name": "Test Product 1"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 400
+
+    def test_create_forecast_compact(self, client: TestClient, admin_token, test_sales):
+        """Test the column-wise compact result shape."""
+        response = client.post(
+            "/api/forecast?fields=mape&compact=true",
+            json={"alpha": 0.5},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results["product_name"] == ["Test Product 1"]
+        assert len(results["mape"]) == 1
+
+    def test_compare_alpha_fields(self, client: TestClient, admin_token, test_sales):
+        """Test compare-alpha with only MAPE requested."""
+        response = client.post(
+            "/api/forecast/compare-alpha?fields=mape",
+            json={"product_name": "Test Product 1"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "dates" not in data
+        assert set(data["by_alpha"]["0.5"]) == {"alpha", "mape"}
+        assert data["best_alpha"] is not None
+
+    def test_backtest(self, client: TestClient, admin_token, test_sales):
+        """Test a rolling-origin backtest with error matrices."""
+        response = client.post(
+            "/api/forecast/backtest",
+            json={"alphas": [0.5, 1.0], "horizon": 2, "min_train": 1, "include_errors": True},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        product = data["products"]["Test Product 1"]
+        assert product["origin_dates"] == ["2025-05-01", "2025-05-02"]
+        # alpha=1 forecasts the origin's actual: 15-10, 20-10; 20-15
+        assert product["errors"]["1"] == [[5, 10], [5, None]]
+        assert product["by_alpha"]["1"]["mae"] == pytest.approx(20 / 3)
+        assert product["best_alpha"] == 1.0
+        assert data["summary"]["product_count"] == 1
+        assert set(data["summary"]["by_alpha"]) == {"0.5", "1"}
+
+    def test_backtest_validation(self, client: TestClient, admin_token, owner_token, test_sales):
+        """Test backtest input validation and admin-only access."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        assert client.post("/api/forecast/backtest", json={"alphas": [1.5]}, headers=headers).status_code == 400
+        assert client.post("/api/forecast/backtest", json={"horizon": 0}, headers=headers).status_code == 422
+        assert client.post(
+            "/api/forecast/backtest", json={"product_name": "Missing"}, headers=headers
+        ).status_code == 400
+        assert client.post(
+            "/api/forecast/backtest", json={}, headers={"Authorization": f"Bearer {owner_token}"}
+        ).status_code == 403
+
+    def test_get_latest_forecast_fields(self, client: TestClient, admin_token, test_sales):
+        """Test getting only scalar fields of the latest forecast."""
+        client.post(
+            "/api/forecast",
+            json={"alpha": 0.5, "product_name": "Test Product 1"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        response = client.get(
+            "/api/forecast/latest?fields=mape,next_period_forecast",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "steps" not in data
+        assert "mape" in data
+        assert data["product_name"] == "Test Product 1"
+
+    def test_get_forecast_project_compact(self, client: TestClient, admin_token, test_sales):
+        """Test the compact shape of a project's results."""
+        client.post(
+            "/api/forecast",
+            json={"alpha": 0.5, "project_name": "Compact Project"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        response = client.get(
+            "/api/forecast/project/Compact Project?fields=mape,actuals&compact=true",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert set(results) == {"product_name", "actuals", "mape"}
+        assert results["actuals"] == [[10, 15, 20]]
+
+    def test_create_forecast_stream(self, client: TestClient, admin_token, test_sales, db_session):
+        """Test NDJSON streaming: one line per product, then a summary line."""
+        import json
+        import models
+        from datetime import date
+
+        db_session.add(models.Sale(date=date(2025, 5, 1), product_name="Test Product 2", qty=5))
+        db_session.commit()
+
+        response = client.post(
+            "/api/forecast/stream?fields=mape",
+            json={"alpha": 0.5, "project_name": "Streamed"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["result", "result", "summary"]
+        assert [line["product_name"] for line in lines[:2]] == ["Test Product 1", "Test Product 2"]
+        assert lines[-1]["product_count"] == 2
+        assert lines[-1]["overall_mape"] == (lines[0]["mape"] + lines[1]["mape"]) / 2
+        assert db_session.query(models.Forecast).filter_by(project_name="Streamed").count() == 2
+
+    def test_create_forecast_stream_no_data(self, client: TestClient, admin_token, test_sales):
+        """Test that an empty filter is a plain 400 before streaming starts."""
+        response = client.post(
+            "/api/forecast/stream",
+            json={"alpha": 0.5, "product_name": "Nope"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 400
+
+    def test_create_forecast_stream_constant_memory(self, client: TestClient, admin_token, test_sales, db_session, monkeypatch):
+        """Test the cursor-backed mode across fetch batches: same MAPE and forecast as the regular run, rows saved."""
+        import json
+        import models
+        from datetime import date
+        from api.forecasts import settings
+
+        db_session.add(models.Sale(date=date(2025, 5, 1), product_name="Test Product 2", qty=5))
+        db_session.commit()
+        monkeypatch.setattr(settings, "forecast_stream_batch_size", 2)
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        body = {"alpha": 0.5, "project_name": "Lean", "next_period_date": "2025-05-04"}
+
+        response = client.post("/api/forecast/stream?constant_memory=true", json=body, headers=headers)
+
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["result", "result", "summary"]
+        first = lines[0]
+        assert first["product_name"] == "Test Product 1"
+        assert (first["periods"], first["start_date"], first["end_date"]) == (3, "2025-05-01", "2025-05-03")
+        assert first["next_period_date"] == "2025-05-04"
+        assert [f["date"] for f in first["future_forecasts"]] == ["2025-05-04", "2025-05-05", "2025-05-06"]
+        assert first["metrics"]["n"] == 2
+        assert lines[1]["mape"] == 0 and lines[1]["periods"] == 1
+        assert lines[-1]["product_count"] == 2
+
+        regular = client.post("/api/forecast?fields=mape,next_period_forecast", json=body, headers=headers).json()
+        expected = regular["results"]["Test Product 1"]
+        assert first["mape"] == pytest.approx(expected["mape"])
+        assert first["next_period_forecast"] == pytest.approx(expected["next_period_forecast"])
+        saved = db_session.query(models.Forecast).filter_by(project_name="Lean", product_name="Test Product 1").all()
+        assert len(saved) == 2
+
+    def test_create_forecast_stream_constant_memory_fields(self, client: TestClient, admin_token, test_sales):
+        """Test that per-period series are not offered in constant-memory mode, and no data or a bad alpha is a 400."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        response = client.post("/api/forecast/stream?constant_memory=true&fields=steps", json={"alpha": 0.5}, headers=headers)
+        assert response.status_code == 400
+
+        response = client.post(
+            "/api/forecast/stream?constant_memory=true",
+            json={"alpha": 0.5, "product_name": "Nope"},
+            headers=headers
+        )
+        assert response.status_code == 400
+
+        for alpha in (0, 1.5):
+            response = client.post("/api/forecast/stream?constant_memory=true", json={"alpha": alpha}, headers=headers)
+            assert response.status_code == 400
+
+    def test_create_forecast_orders_and_filters_in_sql(self, client: TestClient, admin_token, db_session):
+        """Test that out-of-order inserts come back per product in date order, within the date filter."""
+        import models
+        from datetime import date
+
+        for day, product, qty in [(3, "B", 30), (1, "A", 10), (2, "B", 20), (3, "A", 30), (2, "A", 20), (9, "A", 90)]:
+            db_session.add(models.Sale(date=date(2025, 5, day), product_name=product, qty=qty))
+        db_session.commit()
+
+        response = client.post(
+            "/api/forecast?fields=dates,actuals",
+            json={"alpha": 0.5, "end_date": "2025-05-03"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert list(results) == ["A", "B"]
+        assert results["A"] == {"dates": ["2025-05-01", "2025-05-02", "2025-05-03"], "actuals": [10, 20, 30]}
+        assert results["B"] == {"dates": ["2025-05-02", "2025-05-03"], "actuals": [20, 30]}
+
+    def test_chart_series(self, client: TestClient, admin_token, db_session):
+        """Test chart series by project and by id, downsampled to max_points."""
+        import models
+        from datetime import date, timedelta
+
+        start = date(2024, 1, 1)
+        for day in range(200):
+            db_session.add(models.Sale(date=start + timedelta(days=day), product_name="Long", qty=day % 17))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        client.post("/api/forecast", json={"alpha": 0.3, "project_name": "Chart"}, headers=headers)
+
+        response = client.get("/api/forecast/chart-series?project_name=Chart&max_points=50", headers=headers)
+
+        assert response.status_code == 200
+        series = response.json()["series"]
+        assert len(series) == 1
+        assert series[0]["total_points"] == 200
+        assert len(series[0]["dates"]) == len(series[0]["actuals"]) == len(series[0]["forecasts"]) == 50
+        assert series[0]["dates"][0] == "2024-01-01"
+
+        by_id = client.get(f"/api/forecast/chart-series?forecast_id={series[0]['id']}", headers=headers).json()
+        assert len(by_id["series"][0]["actuals"]) == 200
+
+    def test_chart_series_errors(self, client: TestClient, admin_token):
+        """Test the 400 without a selector and 404 for unknown forecasts."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        assert client.get("/api/forecast/chart-series", headers=headers).status_code == 400
+        assert client.get("/api/forecast/chart-series?forecast_id=999", headers=headers).status_code == 404
+
+    def test_repeated_forecast_reuses_stored_run(self, client: TestClient, admin_token, test_sales, db_session):
+        """Test that identical inputs link to one stored result, and changed inputs do not."""
+        import models
+        from datetime import date
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        body = {"alpha": 0.5, "product_name": "Test Product 1"}
+
+        first = client.post("/api/forecast", json={**body, "project_name": "Run 1"}, headers=headers).json()
+        second = client.post("/api/forecast", json={**body, "project_name": "Run 2"}, headers=headers).json()
+
+        assert second["results"] == first["results"]
+        forecasts = db_session.query(models.Forecast).order_by(models.Forecast.id).all()
+        assert len(forecasts) == 2
+        assert forecasts[0].result_id == forecasts[1].result_id is not None
+        assert forecasts[1].calculation_steps is None
+        assert db_session.query(models.ForecastResult).count() == 1
+        project = client.get("/api/forecast/project/Run 2?fields=forecasts", headers=headers).json()
+        assert project["results"]["Test Product 1"]["forecasts"] == first["results"]["Test Product 1"]["forecasts"]
+
+        # Different alpha, then changed sales: new runs
+        client.post("/api/forecast", json={**body, "alpha": 0.3}, headers=headers)
+        db_session.add(models.Sale(date=date(2025, 5, 4), product_name="Test Product 1", qty=5))
+        db_session.commit()
+        client.post("/api/forecast", json=body, headers=headers)
+        assert db_session.query(models.ForecastResult).count() == 3
+
+        # A result stays while any forecast links to it
+        client.delete("/api/forecast/project/Run 1", headers=headers)
+        assert db_session.query(models.ForecastResult).count() == 3
+        client.delete("/api/forecast/project/Run 2", headers=headers)
+        assert db_session.query(models.ForecastResult).count() == 2
+
+    def test_stored_run_deleted_before_link(self, client: TestClient, admin_token, test_sales, db_session, monkeypatch):
+        """Test that a run deleted with its project between find_result and the link is stored again."""
+        import models
+        from repositories.forecast_repository import ForecastRepository
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        body = {"alpha": 0.5, "product_name": "Test Product 1"}
+        first = client.post("/api/forecast?fields=forecasts", json={**body, "project_name": "Old"}, headers=headers).json()
+
+        find_result = ForecastRepository.find_result
+
+        def find_then_lose(self, input_hash):
+            # A concurrent project deletion removes the run right after it was found
+            stored = find_result(self, input_hash)
+            if stored is not None:
+                connection = self.db.connection()
+                connection.exec_driver_sql("DELETE FROM forecasts WHERE result_id = ?", (stored.id,))
+                connection.exec_driver_sql("DELETE FROM forecast_results WHERE id = ?", (stored.id,))
+            return stored
+
+        monkeypatch.setattr(ForecastRepository, "find_result", find_then_lose)
+        response = client.post("/api/forecast?fields=forecasts", json={**body, "project_name": "New"}, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["results"] == first["results"]
+        db_session.expire_all()
+        forecast = db_session.query(models.Forecast).filter_by(project_name="New").one()
+        assert forecast.result is not None
+        assert forecast.steps_data["forecasts"] == first["results"]["Test Product 1"]["forecasts"]
+        assert db_session.query(models.ForecastResult).count() == 1
@@ -77,3 +77,114 @@ class TestSalesAPI:
 
         assert response.status_code == 200
         assert response.json()["status"] == "ok"
+
+    def test_get_sales_paginated(self, client: TestClient, admin_token, test_sales):
+        """Test walking sales newest-first with the keyset cursor."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        first = client.get("/api/sales?limit=2", headers=headers)
+
+        assert first.status_code == 200
+        assert [s["date"] for s in first.json()] == ["2025-05-03", "2025-05-02"]
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = client.get(f"/api/sales?limit=2&cursor={cursor}", headers=headers)
+        assert [s["date"] for s in second.json()] == ["2025-05-01"]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_get_sales_paginated_same_date(self, client: TestClient, admin_token, db_session):
+        """Test that rows sharing a date are neither skipped nor repeated across pages."""
+        import models
+        from datetime import date
+        for qty in range(5):
+            db_session.add(models.Sale(date=date(2025, 5, 1), product_name="Same Day", qty=qty))
+        db_session.commit()
+
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        seen, cursor = [], None
+        while True:
+            url = "/api/sales?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            response = client.get(url, headers=headers)
+            seen.extend(s["id"] for s in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(set(seen))
+        assert len(seen) == 5
+
+    def test_get_sales_invalid_cursor(self, client: TestClient, admin_token):
+        """Test that a malformed cursor is rejected."""
+        response = client.get(
+            "/api/sales?cursor=not-a-cursor",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("payload", ['[{"a":1},1]', '[5,2]', '["2025-05-01",true]', '["not a date",1]', '["2025-05-01"]'])
+    def test_get_sales_forged_cursor(self, client: TestClient, admin_token, payload):
+        """Test that well-formed but forged cursors are a 400, not a database error."""
+        import base64
+
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        assert client.get(f"/api/sales?cursor={cursor}", headers=headers).status_code == 400
+        assert client.get(f"/api/forecast/history?cursor={cursor}", headers=headers).status_code == 400
+
+    def test_get_sales_query_budget(self, client: TestClient, auth_headers, test_sales, query_budget):
+        """Test that listing sales costs one user lookup plus one page query."""
+        with query_budget(2):
+            response = client.get("/api/sales", headers=auth_headers)
+
+        assert response.status_code == 200
+
+
+class TestReadRouting:
+    """Test that sales reads go to the replica except inside the read-your-writes window."""
+
+    def test_reads_use_replica(self, client: TestClient, auth_headers, test_sales, replica):
+        """Test that GET /api/sales only sees rows once they reach the replica."""
+        client.cookies.clear()
+        assert client.get("/api/sales", headers=auth_headers).json() == []
+
+        replica.sync()
+        assert len(client.get("/api/sales", headers=auth_headers).json()) == 3
+
+    def test_read_your_writes(self, client: TestClient, auth_headers, replica):
+        """Test that a client reads its own write from the primary before the replica catches up."""
+        client.cookies.clear()
+        sale = {"date": "2025-06-01", "product_name": "Fresh", "qty": 3}
+        assert client.post("/api/sales", json=sale, headers=auth_headers).status_code == 200
+
+        assert [s["product_name"] for s in client.get("/api/sales", headers=auth_headers).json()] == ["Fresh"]
+
+        # Another client (no session cookie) still reads the lagging replica
+        client.cookies.clear()
+        assert client.get("/api/sales", headers=auth_headers).json() == []
+
+
+class TestSaleWriteBuffer:
+    """Test POST /api/sales through the group-commit buffer."""
+
+    def test_buffered_create(self, client: TestClient, auth_headers, db_session, monkeypatch):
+        """Test that buffered sales are committed before the request is acknowledged."""
+        import api.sales
+        from repositories.sale_repository import SaleRepository
+        from services.write_buffer import GroupCommitBuffer
+
+        def flush(rows):
+            SaleRepository(db_session).create_sales(rows)
+
+        monkeypatch.setattr(api.sales, "sale_write_buffer", GroupCommitBuffer(flush, max_batch=10, max_delay_ms=1))
+
+        for qty in (1, 2):
+            response = client.post(
+                "/api/sales",
+                json={"date": "2025-06-01", "product_name": "Buffered", "qty": qty},
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+
+        data = client.get("/api/sales?product_name=Buffered", headers=auth_headers).json()
+        assert sorted(s["qty"] for s in data) == [1, 2]
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from services.backtest_service import backtest, ses_levels, sliding_levels
+from services.forecast_service import calculate_ses
+
+
+def reference_errors(actuals, alpha, horizon, min_train, window=None):
+    """Refit SES at every origin, the way the vectorized engine avoids: {(origin, h): actual - forecast}."""
+    errors = {}
+    for origin in range(max(min_train, window or 1) - 1, len(actuals) - 1):
+        history = actuals[:origin + 1] if window is None else actuals[origin - window + 1:origin + 1]
+        level = calculate_ses(history, alpha)[-1]
+        for h in range(1, horizon + 1):
+            if origin + h < len(actuals):
+                errors[(origin, h)] = actuals[origin + h] - level
+    return errors
+
+
+def make_series(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        (f"Product {i}", [str(day) for day in range(n)], rng.poisson(20, n).tolist())
+        for i, n in enumerate(lengths)
+    ]
+
+
+class TestLevels:
+    """Test the blocked SES recurrence."""
+
+    @pytest.mark.parametrize("n,block", [(1, 64), (63, 64), (200, 64), (200, 7)])
+    def test_matches_calculate_ses(self, n, block):
+        """Test levels for several alphas and products against the scalar kernel."""
+        values = np.random.default_rng(n).poisson(20, (3, n)).astype(float)
+        alphas = [0.1, 0.45, 1.0]
+
+        levels = ses_levels(values, alphas, block=block)
+
+        assert levels.shape == (3, 3, n)
+        for k, alpha in enumerate(alphas):
+            for p in range(3):
+                np.testing.assert_allclose(levels[k, p], calculate_ses(values[p].tolist(), alpha))
+
+    def test_sliding_window(self):
+        """Test that sliding levels equal SES restarted on the last `window` values."""
+        values = np.random.default_rng(1).poisson(20, (2, 50)).astype(float)
+        alphas = [0.2, 0.9]
+        window = 8
+
+        levels = sliding_levels(values, ses_levels(values, alphas), alphas, window)
+
+        assert np.isnan(levels[:, :, :window - 1]).all()
+        for k, alpha in enumerate(alphas):
+            for p in range(2):
+                expected = [calculate_ses(values[p, o - window + 1:o + 1].tolist(), alpha)[-1] for o in range(window - 1, 50)]
+                np.testing.assert_allclose(levels[k, p, window - 1:], expected)
+
+
+class TestBacktest:
+    """Test the rolling-origin backtest."""
+
+    @pytest.mark.parametrize("window", [None, 10])
+    def test_matches_refit_per_origin(self, window):
+        """Test error matrices and metrics against refitting SES at every origin."""
+        series = make_series([120, 45, 9])
+
+        result = backtest(series, [0.3, 0.7], horizon=4, min_train=5, window=window,
+                          include_errors=True, chunk_size=2)
+
+        for name, _, actuals in series:
+            product = result["products"][name]
+            for alpha in (0.3, 0.7):
+                expected = reference_errors(actuals, alpha, 4, 5, window)
+                got = {
+                    (int(day), h + 1): error
+                    for day, row in zip(product["origin_dates"], product["errors"][f"{alpha:g}"])
+                    for h, error in enumerate(row) if error is not None
+                }
+                assert got.keys() == expected.keys()
+                for key, error in expected.items():
+                    assert got[key] == pytest.approx(error)
+
+                entry = product["by_alpha"][f"{alpha:g}"]
+                if expected:
+                    errors = np.array(list(expected.values()))
+                    assert entry["n"] == len(errors)
+                    assert entry["mae"] == pytest.approx(np.mean(np.abs(errors)))
+                    assert entry["rmse"] == pytest.approx(np.sqrt(np.mean(errors ** 2)))
+                    assert entry["bias"] == pytest.approx(np.mean(errors))
+                else:
+                    assert entry["n"] == 0 and entry["mae"] is None
+
+    def test_horizon_metrics_and_mape_zero_actuals(self):
+        """Test per-horizon metrics and that zero actuals are left out of MAPE only."""
+        series = [("p", ["d0", "d1", "d2", "d3"], [10, 0, 20, 10])]
+
+        result = backtest(series, [1.0], horizon=2, min_train=1, include_errors=True)
+
+        entry = result["products"]["p"]["by_alpha"]["1"]
+        # alpha=1: forecast is the origin's actual. h=1 errors: -10, 20, -10; h=2 errors: 10, 10
+        assert result["products"]["p"]["errors"]["1"] == [[-10, 10], [20, 10], [-10, None]]
+        assert entry["by_horizon"]["mae"] == [pytest.approx(40 / 3), 10]
+        assert entry["mape"] == pytest.approx((100 + 50 + 100 + 100) / 4)
+        assert entry["n"] == 5
+
+    def test_parallel_chunks_match_serial(self):
+        """Test that chunking and worker threads do not change the results."""
+        series = make_series([30 + i for i in range(10)], seed=3)
+
+        serial = backtest(series, [0.2, 0.5], horizon=3, min_train=7)
+        parallel = backtest(series, [0.2, 0.5], horizon=3, min_train=7, jobs=4, chunk_size=3)
+
+        assert list(parallel["products"]) == [name for name, _, _ in series]
+        assert parallel["products"].keys() == serial["products"].keys()
+        for name in serial["products"]:
+            for key, entry in serial["products"][name]["by_alpha"].items():
+                assert parallel["products"][name]["by_alpha"][key]["mape"] == pytest.approx(entry["mape"])
+        for key, entry in serial["summary"]["by_alpha"].items():
+            assert parallel["summary"]["by_alpha"][key]["rmse"] == pytest.approx(entry["rmse"])
+
+    def test_best_alpha(self):
+        """Test that a trending series prefers a high alpha, product and catalog wide."""
+        series = [("trend", [str(i) for i in range(60)], list(range(1, 61)))]
+
+        result = backtest(series, [0.1, 0.5, 0.9], horizon=1, min_train=5, metric="mae")
+
+        assert result["products"]["trend"]["best_alpha"] == 0.9
+        assert result["summary"]["best_alpha"] == 0.9
+        assert result["summary"]["product_count"] == 1
+
+    def test_unknown_metric(self):
+        """Test that an unknown selection metric is rejected."""
+        with pytest.raises(ValueError):
+            backtest(make_series([20]), [0.5], metric="r2")
@@ -0,0 +1,51 @@
+from benchmarks.suite import compare_results, measure
+
+
+def report(**medians):
+    return {"results": {name: {"median_s": value} for name, value in medians.items()}}
+
+
+class TestCompareResults:
+    """Test regression detection against a saved baseline."""
+
+    def test_flags_regressions_beyond_threshold(self):
+        rows, regressions = compare_results(
+            report(a=1.0, b=1.0, c=1.0), report(a=1.05, b=1.5, c=0.5), threshold=0.1
+        )
+
+        assert regressions == ["b"]
+        assert {row["name"]: row["status"] for row in rows} == {"a": "ok", "b": "regression", "c": "improvement"}
+
+    def test_ignores_cases_missing_from_current(self):
+        rows, regressions = compare_results(report(a=1.0, gone=1.0), report(a=1.0, new=9.0), threshold=0.1)
+
+        assert [row["name"] for row in rows] == ["a"]
+        assert regressions == []
+
+
+def test_measure():
+    calls = []
+    stats = measure(lambda: calls.append(1), repeats=3, min_time=0.001)
+
+    assert stats["repeats"] == 3
+    assert stats["min_s"] <= stats["median_s"]
+    assert len(calls) >= 1 + stats["loops"] * 3
+
+
+class TestLoadTestSummary:
+    """Test per-route percentile and error-rate reporting."""
+
+    def test_summarize(self):
+        from benchmarks.loadtest import Recorder, summarize
+
+        rec = Recorder()
+        rec.latencies["GET /api/sales"] = [i / 1000 for i in range(1, 101)]
+        rec.errors["GET /api/sales"] = 5
+
+        report = summarize(rec, duration=10)["GET /api/sales"]
+
+        assert report["requests"] == 100
+        assert report["rps"] == 10
+        assert report["p50_ms"] == 51
+        assert report["p99_ms"] == 100
+        assert report["error_rate"] == 0.05
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pytest
+
+from services.chart_service import lttb_indices, stored_series
+
+
+def reference_lttb(y, threshold):
+    """Straightforward per-point LTTB (the original algorithm) to check the vectorized one against."""
+    n = len(y)
+    every = (n - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        lo, hi = int(math.floor(i * every)) + 1, int(math.floor((i + 1) * every)) + 1
+        next_lo, next_hi = hi, min(int(math.floor((i + 2) * every)) + 1, n)
+        if i == threshold - 3:
+            avg_x, avg_y = n - 1, y[n - 1]
+        else:
+            avg_x = sum(range(next_lo, next_hi)) / (next_hi - next_lo)
+            avg_y = sum(y[next_lo:next_hi]) / (next_hi - next_lo)
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((a - avg_x) * (y[j] - y[a]) - (a - j) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+class TestLttb:
+    """Test Largest-Triangle-Three-Buckets downsampling."""
+
+    def test_short_series_unchanged(self):
+        """Test that series within the budget come back whole."""
+        assert lttb_indices([1, 2, 3], 10).tolist() == [0, 1, 2]
+        assert lttb_indices([1, 2, 3, 4], 2).tolist() == [0, 1, 2, 3]
+
+    @pytest.mark.parametrize("n,budget", [(100, 10), (1000, 37), (3650, 500), (11, 10)])
+    def test_matches_reference(self, n, budget):
+        """Test size, endpoints and agreement with the per-point reference implementation."""
+        y = np.random.default_rng(n).poisson(20, n).astype(float).tolist()
+
+        indices = lttb_indices(y, budget).tolist()
+
+        assert len(indices) == budget
+        assert indices[0] == 0 and indices[-1] == n - 1
+        assert indices == sorted(set(indices))
+        assert indices == reference_lttb(y, budget)
+
+    def test_keeps_spike(self):
+        """Test that a single outlier survives heavy downsampling."""
+        y = [10.0] * 1000
+        y[617] = 500.0
+
+        assert 617 in lttb_indices(y, 20).tolist()
+
+    def test_none_values(self):
+        """Test that missing values do not break downsampling."""
+        assert len(lttb_indices([None, 1, 2, None, 5, 1, 0, 3], 4)) == 4
+
+
+class TestStoredSeries:
+    """Test reading series from calculation_steps layouts."""
+
+    def test_current_layout(self):
+        steps = {"dates": ["2025-05-01"], "actuals": [3], "forecasts": [3.0], "steps": []}
+        assert stored_series(steps) == (["2025-05-01"], [3], [3.0])
+
+    def test_step_list_layout(self):
+        steps = '[{"date": "2025-05-01", "actual": 3, "forecast": 2.5}]'
+        assert stored_series(steps) == (["2025-05-01"], [3], [2.5])
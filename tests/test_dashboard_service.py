@@ -0,0 +1,96 @@
+from datetime import date
+
+import models
+import services.dashboard_service as dashboard_service
+from services.dashboard_service import DashboardSnapshot, dashboard_snapshot, load_snapshot
+
+
+class TestLoadSnapshot:
+    """Test the dashboard stats query."""
+
+    def test_counts_and_recent_sales(self, db_session, test_sales, query_budget):
+        """Test counters, recent sales as plain dicts, and the query count."""
+        with query_budget(3):
+            snapshot = load_snapshot(db_session)
+
+        assert (snapshot["total_products"], snapshot["total_sales"], snapshot["total_forecasts"]) == (2, 3, 0)
+        assert snapshot["recent_sales"][0] == {
+            "id": test_sales[2].id, "date": date(2025, 5, 3), "product_name": "Test Product 1", "qty": 20
+        }
+        assert snapshot["projects"] == []
+
+
+class TestDashboardSnapshot:
+    """Test TTL reuse and write invalidation."""
+
+    def test_reused_within_ttl(self, db_session, test_sales, query_budget):
+        """Test that a second read inside the TTL issues no queries."""
+        cache = DashboardSnapshot(ttl_s=60)
+        first = cache.get(db_session)
+
+        with query_budget(0):
+            assert cache.get(db_session) is first
+
+    def test_zero_ttl_always_queries(self, db_session, test_sales):
+        """Test that ttl_s=0 disables caching."""
+        cache = DashboardSnapshot(ttl_s=0)
+
+        assert cache.get(db_session) is not cache.get(db_session)
+
+    def test_orm_write_invalidates(self, db_session, test_sales):
+        """Test that a committed ORM insert shows up immediately."""
+        assert dashboard_snapshot.get(db_session)["total_sales"] == 3
+
+        db_session.add(models.Sale(date=date(2025, 5, 4), product_name="Test Product 2", qty=1))
+        db_session.commit()
+
+        assert dashboard_snapshot.get(db_session)["total_sales"] == 4
+
+    def test_bulk_delete_invalidates(self, db_session, test_sales):
+        """Test that a bulk Query.delete() invalidates the snapshot."""
+        assert dashboard_snapshot.get(db_session)["total_sales"] == 3
+
+        db_session.query(models.Sale).delete()
+        db_session.commit()
+
+        assert dashboard_snapshot.get(db_session)["total_sales"] == 0
+
+    def test_write_during_load_is_not_cached(self, db_session, test_sales, monkeypatch):
+        """Test that a snapshot loaded across an invalidation is served once but not kept."""
+        cache = DashboardSnapshot(ttl_s=60)
+        load = dashboard_service.load_snapshot
+
+        def racing_load(db):
+            snapshot = load(db)
+            cache.invalidate()
+            return snapshot
+
+        monkeypatch.setattr(dashboard_service, "load_snapshot", racing_load)
+        cache.get(db_session)
+
+        assert cache._snapshot is None
+
+    def test_dashboard_page_uses_snapshot(self, client, test_users, test_sales):
+        """Test that /dashboard renders the snapshot counters for an admin session."""
+        client.post("/login", data={"username": "test_admin", "password": "admin123"})
+        response = client.get("/dashboard")
+
+        assert response.status_code == 200
+        assert "Test Product 1" in response.text
+
+    def test_pages_load_snapshot_from_primary(self, client, test_users, test_sales, replica, monkeypatch):
+        """Test that a lagging replica never feeds the shared snapshot."""
+        import database
+
+        client.post("/login", data={"username": "test_admin", "password": "admin123"})
+        # Outside the read-your-writes window the page's reads go to the replica
+        monkeypatch.setattr(database.settings, "read_your_writes_s", 0)
+        # The login redirect already rendered /dashboard inside the window
+        dashboard_snapshot.invalidate()
+
+        # The replica was never synced, so it holds no sales at all
+        response = client.get("/dashboard")
+
+        assert response.status_code == 200
+        assert "Test Product 1" in response.text
+        assert dashboard_snapshot._snapshot["total_sales"] == 3
@@ -0,0 +1,153 @@
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+
+import database
+from database import (
+    QueryStats, capture_queries, create_app_engine, instrument_engine, parameters_shape, track_queries
+)
+
+
+@pytest.fixture
+def instrumented_engine():
+    """A throwaway SQLite engine with the query hooks attached."""
+    engine = create_engine("sqlite:///:memory:")
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestParametersShape:
+    """Test the value-free description of bound parameters."""
+
+    def test_tuple(self):
+        assert parameters_shape(("a", 1)) == "(str, int)"
+
+    def test_dict(self):
+        assert parameters_shape({"name": "a"}) == "{name: str}"
+
+    def test_executemany(self):
+        assert parameters_shape([("a", 1), ("b", 2)], executemany=True) == "2 × (str, int)"
+
+
+class TestQueryTracking:
+    """Test per-context statement tracking and N+1 detection."""
+
+    def test_track_queries_counts_and_flags_repeats(self, instrumented_engine):
+        """Test that identical statements are grouped and reported past the threshold."""
+        with track_queries() as stats:
+            with instrumented_engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text("SELECT :x"), {"x": i})
+                conn.execute(text("SELECT 1"))
+
+        assert stats.count == 4
+        assert stats.repeated(3) == [("SELECT ?", 3)]
+        assert stats.repeated(4) == []
+
+    def test_untracked_queries_are_ignored(self, instrumented_engine):
+        """Test that statements outside track_queries don't fail or leak into later stats."""
+        with instrumented_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        with track_queries() as stats:
+            pass
+        assert stats.count == 0
+
+    def test_slow_query_logged(self, instrumented_engine, caplog, monkeypatch):
+        """Test that statements above the threshold are logged with parameter types only."""
+        monkeypatch.setattr(database.settings, "sql_slow_query_ms", -1.0)
+
+        with caplog.at_level(logging.WARNING, logger="database"):
+            with instrumented_engine.connect() as conn:
+                conn.execute(text("SELECT :name"), {"name": "secret"})
+
+        assert "Slow query" in caplog.text
+        assert "(str)" in caplog.text
+        assert "secret" not in caplog.text
+
+    def test_capture_queries_detaches(self):
+        """Test that capture_queries stops counting after the block."""
+        engine = create_engine("sqlite:///:memory:")
+        with capture_queries(engine) as stats:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert stats.count == 1
+
+
+class TestEngineProfiles:
+    """Test the named engine tuning profiles."""
+
+    def test_sqlite_file_balanced(self, tmp_path):
+        """Test that file SQLite gets WAL, the profile's pragmas and a sized pool."""
+        engine = create_app_engine(f"sqlite:///{tmp_path / 'p.db'}", "balanced")
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert engine.pool.size() == 10
+        finally:
+            engine.dispose()
+
+    def test_sqlite_file_baseline(self, tmp_path):
+        """Test that the baseline profile leaves SQLite's defaults alone."""
+        engine = create_app_engine(f"sqlite:///{tmp_path / 'p.db'}", "baseline")
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        finally:
+            engine.dispose()
+
+    def test_sqlite_memory(self):
+        """Test that in-memory SQLite skips journal/mmap pragmas but still connects."""
+        engine = create_app_engine("sqlite:///:memory:", "throughput")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 10000
+
+    def test_mysql_options(self):
+        """Test pool sizing and recycle for MySQL (no connection is opened)."""
+        engine = create_app_engine("mysql+pymysql://u:p@localhost/db", "balanced")
+
+        assert engine.pool.size() == 10
+        assert engine.pool._recycle == 1800
+        assert engine.pool._pre_ping is True
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            create_app_engine("sqlite:///:memory:", "turbo")
+
+
+class TestReadRouting:
+    """Test read engine selection and the read-your-writes window."""
+
+    class FakeRequest:
+        def __init__(self, session=None):
+            self.scope = {"session": session} if session is not None else {}
+
+    def test_no_replica_by_default(self):
+        assert not database.has_replica()
+        assert database.ReadSessionLocal is database.SessionLocal
+
+    def test_configure_read_engine(self):
+        replica = create_engine("sqlite:///:memory:")
+        try:
+            database.configure_read_engine(replica)
+            assert database.has_replica()
+            assert database.ReadSessionLocal.kw["bind"] is replica
+        finally:
+            database.configure_read_engine(None)
+            replica.dispose()
+        assert not database.has_replica()
+
+    def test_wrote_recently(self):
+        import time
+        now = time.time()
+
+        assert database.wrote_recently(self.FakeRequest({database.LAST_WRITE_KEY: now - 1}), 5)
+        assert not database.wrote_recently(self.FakeRequest({database.LAST_WRITE_KEY: now - 10}), 5)
+        assert not database.wrote_recently(self.FakeRequest({}), 5)
+        assert not database.wrote_recently(self.FakeRequest(), 5)
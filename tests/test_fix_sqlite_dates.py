@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+from fix_sqlite_dates import fix_column
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, date TEXT, product_name TEXT, qty INTEGER)")
+    rows = [(f"{day}-May-25", "A", day) for day in range(1, 26)]
+    rows += [("2025-06-01", "A", 1), ("not a date", "A", 1), (None, "A", 1)]
+    conn.executemany("INSERT INTO sales (date, product_name, qty) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def dates(conn):
+    return [row[0] for row in conn.execute("SELECT date FROM sales ORDER BY id")]
+
+
+class TestFixColumn:
+    """Test the chunked date normalizer."""
+
+    def test_converts_in_chunks(self, conn):
+        """Test conversion across several chunks, leaving ISO/unparseable/NULL rows alone."""
+        messages = []
+        scanned, updated = fix_column(conn, "sales", "date", chunk_size=4, log=messages.append)
+
+        assert (scanned, updated) == (26, 25)
+        assert len(messages) == 7
+        assert dates(conn)[:2] == ["2025-05-01", "2025-05-02"]
+        assert dates(conn)[24:] == ["2025-05-25", "2025-06-01", "not a date", None]
+
+    def test_dry_run_only_counts(self, conn):
+        """Test that a dry run reports the rows but writes nothing."""
+        before = dates(conn)
+
+        assert fix_column(conn, "sales", "date", chunk_size=10, dry_run=True, log=lambda msg: None) == (26, 25)
+        assert dates(conn) == before
+
+    def test_idempotent(self, conn):
+        """Test that a second run finds nothing to change."""
+        fix_column(conn, "sales", "date", log=lambda msg: None)
+
+        assert fix_column(conn, "sales", "date", log=lambda msg: None) == (1, 0)
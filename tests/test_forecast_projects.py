@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import models
+from repositories.forecast_repository import ForecastRepository
+
+
+def add_forecast(repo, user, project, product, mape, alpha=0.3, day=1):
+    return repo.create_forecast(
+        project_name=project, created_at=datetime(2025, 6, day), created_by=user.id, alpha=alpha,
+        product_name=product, next_period_forecast=1.0, next_period_date=None, mape=mape, calculation_steps={}
+    )
+
+
+def summaries(repo):
+    return {p["project_name"]: p for p in repo.get_project_summaries()}
+
+
+class TestForecastProjects:
+    """Test the write-maintained forecast_projects summary table."""
+
+    def test_create_maintains_summary(self, db_session, test_users):
+        """Test counts, MAPE average and min created_at/alpha as forecasts are added."""
+        repo = ForecastRepository(db_session)
+        add_forecast(repo, test_users["admin"], "P", "A", 10.0, alpha=0.5, day=3)
+        add_forecast(repo, test_users["admin"], "P", "B", 20.0, alpha=0.2, day=1)
+        add_forecast(repo, test_users["admin"], None, "C", 5.0)
+
+        project = summaries(repo)["P"]
+        assert set(summaries(repo)) == {"P"}
+        assert project["forecast_count"] == 2
+        assert project["overall_mape"] == 15.0
+        assert project["alpha"] == 0.2
+        assert project["created_at"] == "2025-06-01T00:00:00"
+        assert project["created_by"] == "test_admin"
+
+    def test_listing_is_one_query(self, db_session, test_users, query_budget):
+        """Test that listing projects does not aggregate the forecasts table."""
+        repo = ForecastRepository(db_session)
+        for i in range(5):
+            add_forecast(repo, test_users["admin"], f"P{i}", "A", 10.0)
+
+        with query_budget(1) as stats:
+            assert len(repo.get_project_summaries()) == 5
+        assert "forecasts " not in stats.format()
+
+    def test_rename_and_merge(self, db_session, test_users):
+        """Test renaming a project, and renaming onto an existing one merging the stats."""
+        repo = ForecastRepository(db_session)
+        add_forecast(repo, test_users["admin"], "Old", "A", 10.0)
+        add_forecast(repo, test_users["owner"], "Other", "B", 30.0, alpha=0.1)
+
+        assert repo.update_project_name("Old", "New")
+        assert set(summaries(repo)) == {"New", "Other"}
+
+        assert repo.update_project_name("New", "Other")
+        merged = summaries(repo)
+        assert set(merged) == {"Other"}
+        assert merged["Other"]["forecast_count"] == 2
+        assert merged["Other"]["overall_mape"] == 20.0
+        assert merged["Other"]["created_by"] == "test_admin"
+        assert not repo.update_project_name("Missing", "X")
+
+    def test_delete_project(self, db_session, test_users):
+        """Test that deleting a project removes its forecasts and its summary row."""
+        repo = ForecastRepository(db_session)
+        add_forecast(repo, test_users["admin"], "P", "A", 10.0)
+        add_forecast(repo, test_users["admin"], "P", "B", 10.0)
+
+        assert repo.delete_project("P") == 2
+        assert summaries(repo) == {}
+        assert db_session.query(models.Forecast).count() == 0
+        assert repo.delete_project("P") == 0
+
+    def test_rebuild_matches_maintained(self, db_session, test_users):
+        """Test that a rebuild from the forecasts table gives the same summaries."""
+        repo = ForecastRepository(db_session)
+        add_forecast(repo, test_users["admin"], "P", "A", 10.0, alpha=0.4, day=2)
+        add_forecast(repo, test_users["owner"], "P", "B", 25.0, alpha=0.6, day=1)
+        add_forecast(repo, test_users["admin"], "Q", "A", 5.0)
+        maintained = summaries(repo)
+
+        db_session.query(models.ForecastProject).delete()
+        db_session.commit()
+        assert repo.rebuild_projects() == 2
+        assert summaries(repo) == maintained
+
+    def test_forecasts_without_creator_are_not_listed(self, db_session, test_users):
+        """Test that, as with the old join to users, forecasts with no or a missing creator stay out of the list."""
+        repo = ForecastRepository(db_session)
+        add_forecast(repo, test_users["admin"], "P", "A", 10.0)
+        for created_by in (None, 9999):
+            for name in ("P", "Orphan"):
+                repo.create_forecast(
+                    project_name=name, created_at=datetime(2025, 6, 1), created_by=created_by, alpha=0.3,
+                    product_name="B", next_period_forecast=1.0, next_period_date=None, mape=90.0,
+                    calculation_steps={}
+                )
+        maintained = summaries(repo)
+
+        assert set(maintained) == {"P"}
+        assert maintained["P"]["forecast_count"] == 1
+        assert maintained["P"]["overall_mape"] == 10.0
+        assert repo.rebuild_projects() == 1
+        assert summaries(repo) == maintained
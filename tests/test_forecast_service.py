@@ -1,5 +1,9 @@
 import pytest
-from services.forecast_service import calculate_ses_with_steps, calculate_mape, calculate_next_period_forecast
+from datetime import date
+from services.forecast_service import (
+    calculate_ses_with_steps, calculate_mape, calculate_next_period_forecast, compare_alphas, forecast_input_hash,
+    partition_series
+)
 
 
 class TestCalculateSES:
@@ -69,6 +73,95 @@ class TestCalculateSES:
         assert "error" in step
         assert "error_pct" in step
 
+    def test_without_steps(self):
+        """Test that include_steps=False skips the breakdown but keeps the numbers."""
+        series = [10.0, 20.0, 30.0]
+        dates = ["2025-05-01", "2025-05-02", "2025-05-03"]
+        full = calculate_ses_with_steps(series, dates, 0.5)
+        lean = calculate_ses_with_steps(series, dates, 0.5, include_steps=False)
+
+        assert lean["steps"] == []
+        assert lean["forecasts"] == full["forecasts"]
+        assert lean["mape"] == full["mape"]
+
+
+class TestCompareAlphas:
+    """Test multi-alpha comparison."""
+
+    def test_error_pct_matches_steps(self):
+        """Test that per-alpha error_pct matches the step breakdown."""
+        series = [10.0, 0.0, 30.0, 25.0]
+        dates = ["2025-05-01", "2025-05-02", "2025-05-03", "2025-05-04"]
+        result = compare_alphas(series, dates, [0.3])
+        steps = calculate_ses_with_steps(series, dates, 0.3)["steps"]
+
+        assert result["by_alpha"]["0.3"]["error_pct"] == [s["error_pct"] for s in steps]
+
+    def test_metrics_match_single_alpha_mape(self):
+        """Test that the batched per-alpha metrics agree with calculate_mape per alpha."""
+        series = [12.0, 0.0, 30.0, 25.0, 18.0, 22.0]
+        dates = [f"2025-05-0{i + 1}" for i in range(6)]
+        result = compare_alphas(series, dates, [0.1, 0.5, 0.9])
+
+        for key, entry in result["by_alpha"].items():
+            forecasts = calculate_ses_with_steps(series, dates, entry["alpha"], include_steps=False)["forecasts"]
+            assert entry["mape"] == pytest.approx(calculate_mape(series[1:], forecasts[1:]))
+            assert entry["metrics"]["mape"] == pytest.approx(entry["mape"])
+            assert set(entry["metrics"]) == {"mae", "rmse", "mape", "smape", "mase", "bias", "n"}
+            assert entry["metrics"]["n"] == 5
+
+    def test_fields_subset(self):
+        """Test that only requested keys are returned while best_alpha is still chosen."""
+        series = [10.0, 20.0, 30.0]
+        dates = ["2025-05-01", "2025-05-02", "2025-05-03"]
+        result = compare_alphas(series, dates, [0.1, 0.9], fields=("next_period_forecast",))
+
+        assert set(result) == {"by_alpha", "best_alpha"}
+        assert set(result["by_alpha"]["0.9"]) == {"alpha", "next_period_forecast"}
+        assert result["best_alpha"] == 0.9
+
+
+class TestPartitionSeries:
+    """Test splitting product/date-ordered rows into per-product series."""
+
+    def test_partition(self):
+        rows = [
+            ("A", date(2025, 5, 1), 10),
+            ("A", date(2025, 5, 2), 12),
+            ("B", date(2025, 5, 1), 3),
+        ]
+
+        assert list(partition_series(rows)) == [
+            ("A", ["2025-05-01", "2025-05-02"], [10, 12]),
+            ("B", ["2025-05-01"], [3]),
+        ]
+
+    def test_string_dates_pass_through(self):
+        assert list(partition_series([("A", "2025-05-01", 1)])) == [("A", ["2025-05-01"], [1])]
+
+    def test_empty(self):
+        assert list(partition_series([])) == []
+
+
+class TestForecastInputHash:
+    """Test the content hash used to reuse stored forecast runs."""
+
+    def test_same_inputs_same_hash(self):
+        args = (["2025-05-01", "2025-05-02"], [10, 12], 0.5, "2025-05-03", 3)
+        assert forecast_input_hash(*args) == forecast_input_hash(*args)
+        assert len(forecast_input_hash(*args)) == 64
+
+    @pytest.mark.parametrize("changed", [
+        (["2025-05-01", "2025-05-03"], [10, 12], 0.5, "2025-05-03", 3),
+        (["2025-05-01", "2025-05-02"], [10, 13], 0.5, "2025-05-03", 3),
+        (["2025-05-01", "2025-05-02"], [10, 12], 0.4, "2025-05-03", 3),
+        (["2025-05-01", "2025-05-02"], [10, 12], 0.5, "2025-05-04", 3),
+        (["2025-05-01", "2025-05-02"], [10, 12], 0.5, "2025-05-03", 4),
+    ])
+    def test_any_input_changes_hash(self, changed):
+        base = forecast_input_hash(["2025-05-01", "2025-05-02"], [10, 12], 0.5, "2025-05-03", 3)
+        assert forecast_input_hash(*changed) != base
+
 
 class TestCalculateMAPE:
     """Test MAPE calculation."""
@@ -0,0 +1,131 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from services.health import check_readiness, register_component, unregister_component
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """A file-backed SQLite engine, which gets a sized QueuePool."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'ready.db'}", pool_size=2, max_overflow=0)
+    yield engine
+    engine.dispose()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestCheckReadiness:
+    """Test the readiness checks directly."""
+
+    def test_ready(self, file_engine):
+        """Test a healthy engine with an idle pool."""
+        ready, report = run(check_readiness(1.0, 0.9, 1000.0, bind=file_engine))
+
+        assert ready is True
+        assert report["database"]["ok"] is True
+        assert report["pool"]["size"] == 2
+        assert report["pool"]["saturation"] == 0
+
+    def test_pool_saturated(self, file_engine):
+        """Test that a pool at the saturation threshold fails readiness."""
+        held = [file_engine.connect(), file_engine.connect()]
+        try:
+            ready, report = run(check_readiness(0.2, 0.9, 1000.0, bind=file_engine))
+        finally:
+            for conn in held:
+                conn.close()
+
+        assert ready is False
+        assert report["pool"]["ok"] is False
+        assert report["pool"]["checked_out"] == 2
+        assert report["database"]["ok"] is False
+        assert "skipped" in report["database"]["error"]
+
+    def test_stalled_ping_is_not_repeated(self, file_engine, monkeypatch):
+        """Test that probes during a stuck ping report it instead of starting another one."""
+        import services.health as health
+
+        release = threading.Event()
+        calls = []
+
+        def stalled_ping(bind):
+            calls.append(bind)
+            release.wait(5)
+            return 1.0
+
+        monkeypatch.setattr(health, "_ping_db", stalled_ping)
+        try:
+            _, first = run(check_readiness(0.05, 0.9, 1000.0, bind=file_engine))
+            _, second = run(check_readiness(0.05, 0.9, 1000.0, bind=file_engine))
+        finally:
+            release.set()
+        health._pings["primary"].result(timeout=5)
+        ready, third = run(check_readiness(1.0, 0.9, 1000.0, bind=file_engine))
+
+        assert "no response" in first["database"]["error"]
+        assert second["database"]["error"] == "previous ping still running"
+        assert ready is True and third["database"]["ok"] is True
+        assert len(calls) == 2
+
+    def test_error_text_is_not_exposed(self, caplog):
+        """Test that a failing ping reports a fixed message and only the log gets the driver's error."""
+        def refuse():
+            raise sqlite3.OperationalError("access denied for user 'app'@'db.internal' (password: YES)")
+
+        broken = create_engine("sqlite://", creator=refuse)
+        ready, report = run(check_readiness(1.0, 0.9, 1000.0, bind=broken))
+
+        assert ready is False
+        assert report["database"] == {"ok": False, "error": "unavailable"}
+        assert "db.internal" in caplog.text
+
+    def test_replica_is_checked(self, file_engine, replica, monkeypatch):
+        """Test that a configured read replica is pinged and gates readiness."""
+        import database
+
+        ready, report = run(check_readiness(1.0, 0.9, 1000.0, bind=file_engine))
+        assert ready is True
+        assert report["components"]["replica"]["ok"] is True
+
+        monkeypatch.setattr(database, "read_engine", create_engine(
+            "sqlite://", creator=lambda: sqlite3.connect("/nonexistent/dir/replica.db")
+        ))
+        ready, report = run(check_readiness(1.0, 0.9, 1000.0, bind=file_engine))
+        assert ready is False
+        assert report["components"]["replica"] == {"ok": False, "error": "unavailable"}
+
+    def test_failing_component(self, file_engine):
+        """Test that a registered component reporting not-ok fails readiness."""
+        register_component("test_worker", lambda: {"ok": False, "queued": 10})
+        try:
+            ready, report = run(check_readiness(1.0, 0.9, 1000.0, bind=file_engine))
+        finally:
+            unregister_component("test_worker")
+
+        assert ready is False
+        assert report["components"]["test_worker"] == {"ok": False, "queued": 10}
+
+
+class TestReadinessEndpoint:
+    """Test /health/ready on the app."""
+
+    def test_ready_endpoint(self, client: TestClient, monkeypatch):
+        """Test a healthy app against the test database."""
+        import services.health as health
+        from tests.conftest import engine
+
+        monkeypatch.setattr(health, "engine", engine)
+        response = client.get("/health/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ok"
+        assert data["database"]["ok"] is True
+        assert "lag_ms" in data["event_loop"]
@@ -0,0 +1,84 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.metrics import Counter, HistogramMetric, MetricsMiddleware, Registry
+
+
+class TestRegistry:
+    """Test Prometheus text rendering."""
+
+    def test_counter_and_histogram_render(self):
+        """Test TYPE lines, labels and cumulative buckets."""
+        registry = Registry()
+        requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+        latency = registry.register(HistogramMetric("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1)))
+
+        requests.inc(route="/a")
+        requests.inc(2, route="/a")
+        latency.observe(0.05, route="/a")
+        latency.observe(0.5, route="/a")
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 3' in text
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+        assert 'latency_seconds_count{route="/a"} 2' in text
+
+    def test_collector_and_label_escaping(self):
+        """Test scrape-time collectors and escaping of quotes in label values."""
+        registry = Registry()
+        registry.register_collector("queue_depth", "Depth.", lambda: [("queue_depth", {"name": 'a"b'}, 4)])
+
+        text = registry.render()
+        assert "# TYPE queue_depth gauge" in text
+        assert 'queue_depth{name="a\\"b"} 4' in text
+
+
+class TestMetricsMiddleware:
+    """Test request latency recording."""
+
+    def test_records_route_template_and_status(self, monkeypatch):
+        """Test that requests are labelled by route template, not raw path."""
+        import services.metrics as metrics
+        histogram = HistogramMetric("test_http_seconds", "Test.", ("method", "route", "status"))
+        monkeypatch.setattr(metrics, "http_request_duration", histogram)
+
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        def read_item(item_id: int):
+            return {"item_id": item_id}
+
+        app.add_middleware(MetricsMiddleware)
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/nope")
+
+        samples = {(name, tuple(sorted(labels.items()))): value for name, labels, value in histogram.samples()}
+        assert samples[("test_http_seconds_count", (("method", "GET"), ("route", "/items/{item_id}"), ("status", "200")))] == 2
+        assert samples[("test_http_seconds_count", (("method", "GET"), ("route", "<unmatched>"), ("status", "404")))] == 1
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics endpoint on the real app."""
+
+    def test_metrics_endpoint(self, client: TestClient, admin_token, test_sales):
+        """Test that forecast kernel metrics show up after a forecast."""
+        client.post(
+            "/api/forecast",
+            json={"alpha": 0.5},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'forecast_kernel_duration_seconds_count{kernel="ses"}' in response.text
+        assert 'forecast_product_count_count{endpoint="create"}' in response.text
+        assert "http_request_duration_seconds_bucket" in response.text
@@ -0,0 +1,149 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+
+import migrate_to_mysql
+from database import Base
+from migrate_to_mysql import migrate
+
+
+@pytest.fixture
+def source_db(tmp_path):
+    """SQLite source in the app schema, with legacy DD-Mon-YY sale dates."""
+    path = str(tmp_path / "source.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users (id, username, hashed_password, role) VALUES (1, 'admin', 'x', 'admin')")
+    conn.executemany(
+        "INSERT INTO products (name, created_at) VALUES (?, ?)",
+        [(f"Product {i}", "2025-01-01 00:00:00") for i in range(5)]
+    )
+    conn.executemany(
+        "INSERT INTO sales (date, product_name, qty) VALUES (?, ?, ?)",
+        [(f"{day:02d}-May-25", f"Product {i}", day * i) for i in range(5) for day in range(1, 32)]
+    )
+    conn.execute(
+        "INSERT INTO forecasts (project_name, created_at, created_by, alpha, product_name, next_period_forecast, "
+        "next_period_date, mape, calculation_steps) VALUES ('p', '2025-06-01 00:00:00', 1, 0.3, 'Product 1', 5.0, "
+        "'01-Jun-25', 10.0, '[]')"
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def table_rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+class TestMigrate:
+    """Test the streaming SQLite -> target migration (SQLite target)."""
+
+    def test_copies_all_tables(self, source_db, tmp_path, capsys):
+        """Test row counts, ISO date conversion, post-load indexes and that progress goes only to `log`."""
+        target = str(tmp_path / "target.db")
+        checkpoint = str(tmp_path / "checkpoint.json")
+
+        copied = migrate(source_db, f"sqlite:///{target}", chunk_size=7, jobs=2,
+                         checkpoint_path=checkpoint, log=lambda msg: None)
+
+        assert capsys.readouterr().out == ""
+        assert copied == {"users": 1, "products": 5, "sales": 155, "forecasts": 1, "forecast_results": 0, "forecast_projects": 0}
+        sales = table_rows(target, "sales")
+        assert [row[0] for row in sales] == list(range(1, 156))
+        assert sales[0][1:] == ("2025-05-01", "Product 0", 0)
+        assert table_rows(target, "forecasts")[0][7] == "2025-06-01"
+
+        conn = sqlite3.connect(target)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert {"idx_date", "idx_date_id", "idx_product", "idx_created_at_id"} <= indexes
+        # The checkpoint is removed once everything is loaded
+        assert not (tmp_path / "checkpoint.json").exists()
+
+    def test_resume_after_failure(self, source_db, tmp_path, monkeypatch):
+        """Test that --resume continues a failed table without duplicating rows."""
+        target = str(tmp_path / "target.db")
+        checkpoint = str(tmp_path / "checkpoint.json")
+        parse_date = migrate_to_mysql.parse_date
+        calls = {"n": 0}
+
+        def failing_parse_date(value):
+            calls["n"] += 1
+            if calls["n"] > 50:
+                raise RuntimeError("connection lost")
+            return parse_date(value)
+
+        monkeypatch.setattr(migrate_to_mysql, "parse_date", failing_parse_date)
+        with pytest.raises(RuntimeError):
+            migrate(source_db, f"sqlite:///{target}", chunk_size=10, jobs=1,
+                    checkpoint_path=checkpoint, log=lambda msg: None)
+
+        with open(checkpoint) as f:
+            state = json.load(f)
+        assert state["tables"]["sales"]["last_id"] == 50
+        assert not state["tables"]["sales"]["loaded"]
+        assert state["tables"]["users"]["indexed"]
+
+        monkeypatch.setattr(migrate_to_mysql, "parse_date", parse_date)
+        copied = migrate(source_db, f"sqlite:///{target}", chunk_size=10, jobs=1, resume=True,
+                         checkpoint_path=checkpoint, log=lambda msg: None)
+
+        assert copied["sales"] == 105
+        assert copied["users"] == 0
+        assert table_rows(target, "sales") == [
+            (row[0], f"2025-05-{row[1][:2]}", row[2], row[3]) for row in table_rows(source_db, "sales")
+        ]
+
+    def test_resume_without_checkpoint_keeps_target(self, source_db, tmp_path):
+        """Test that --resume with no checkpoint fails instead of dropping the loaded tables."""
+        target = str(tmp_path / "target.db")
+        migrate(source_db, f"sqlite:///{target}", checkpoint_path=str(tmp_path / "checkpoint.json"),
+                log=lambda msg: None)
+
+        with pytest.raises(FileNotFoundError):
+            migrate(source_db, f"sqlite:///{target}", resume=True,
+                    checkpoint_path=str(tmp_path / "missing.json"), log=lambda msg: None)
+
+        assert len(table_rows(target, "sales")) == 155
+
+    def test_foreign_keys_wait_for_every_table(self, source_db, tmp_path, monkeypatch):
+        """Test that a child table finishing before its parent gets its foreign keys only after both load."""
+        copy_table = migrate_to_mysql.copy_table
+        forecasts_done = threading.Event()
+        events = []
+
+        def ordered_copy(table, *args):
+            if table == "users":
+                # The parent of forecasts.created_by finishes last
+                assert forecasts_done.wait(timeout=10)
+            copied = copy_table(table, *args)
+            events.append(f"loaded {table}")
+            if table == "forecasts":
+                forecasts_done.set()
+            return copied
+
+        def recorded_foreign_keys(table, dialect):
+            if not migrate_to_mysql.TABLES[table].get("foreign_keys"):
+                return []
+            events.append(f"foreign keys {table}")
+            return ["SELECT 1"]
+
+        monkeypatch.setattr(migrate_to_mysql, "copy_table", ordered_copy)
+        monkeypatch.setattr(migrate_to_mysql, "foreign_key_statements", recorded_foreign_keys)
+        migrate(source_db, f"sqlite:///{tmp_path / 'target.db'}", jobs=2,
+                checkpoint_path=str(tmp_path / "checkpoint.json"), log=lambda msg: None)
+
+        assert events.index("loaded forecasts") < events.index("loaded users")
+        assert events[-1] == "foreign keys forecasts"
+        assert len(events) == len(migrate_to_mysql.TABLES) + 1
@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_startup import HEAVY_MODULES
+
+
+def test_heavy_modules_load_lazily():
+    """
+    Test that importing the app does not import pandas, numpy, passlib, jose or bcrypt.
+
+    Pinned to SQLite: on the default MySQL URL the engine imports PyMySQL, which
+    loads cryptography and, through it, bcrypt.
+    """
+    probe = f"import json, sys, main; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    env = {**os.environ, "DATABASE_URL": "sqlite://"}
+    output = subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True).stdout
+
+    assert json.loads(output.strip().splitlines()[-1]) == []
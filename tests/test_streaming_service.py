@@ -0,0 +1,129 @@
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from services.forecast_service import calculate_ses, calculate_ses_with_steps
+from services.streaming_service import ses_scan, stream_forecasts
+
+
+def make_rows(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    start = date(2024, 1, 1)
+    return [
+        (f"Product {p}", start + timedelta(days=t), int(qty))
+        for p, n in enumerate(lengths)
+        for t, qty in enumerate(rng.poisson(20, n))
+    ]
+
+
+def generated_batches(products, periods, batch_size):
+    """Rows made on the fly, batch by batch, the way a server-side cursor hands them out."""
+    start = date(2024, 1, 1)
+    batch = []
+    for p in range(products):
+        for t in range(periods):
+            batch.append((f"Product {p}", start + timedelta(days=t), (t * 7 + p) % 23 + 1))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def batched(rows, size):
+    return (rows[i:i + size] for i in range(0, len(rows), size))
+
+
+class TestScan:
+    """Test the batched SES recurrence."""
+
+    @pytest.mark.parametrize("alpha", [0.001, 0.3, 0.9, 0.999, 1.0])
+    def test_matches_calculate_ses_across_products(self, alpha):
+        """Test levels of several products in one array, including long and one-period series."""
+        lengths = [1, 40, 2500, 2, 700]
+        rng = np.random.default_rng(1)
+        series = [rng.poisson(20, n).astype(float) for n in lengths]
+        starts = np.zeros(sum(lengths), dtype=bool)
+        starts[np.cumsum([0] + lengths[:-1])] = True
+
+        levels = ses_scan(np.concatenate(series), starts, alpha)
+
+        expected = np.concatenate([calculate_ses(s.tolist(), alpha) for s in series])
+        np.testing.assert_allclose(levels, expected, rtol=1e-10)
+
+    @pytest.mark.parametrize("alpha", [0.0, 1.0, 1.5, 2.0])
+    def test_boundary_alphas(self, alpha):
+        """Test alpha 0 (|1 - alpha| = 1, one block), exactly 1, and above 1 against calculate_ses."""
+        values = np.array([3.0, 5.0, 7.0, 2.0, 4.0, 9.0])
+        starts = np.array([True, False, False, True, False, False])
+
+        levels = ses_scan(values, starts, alpha)
+
+        expected = calculate_ses(values[:3].tolist(), alpha) + calculate_ses(values[3:].tolist(), alpha)
+        np.testing.assert_allclose(levels, expected)
+
+    def test_carry(self):
+        """Test that a carried-in level continues the recurrence of an earlier batch."""
+        values = np.array([10.0, 20.0, 30.0, 40.0])
+        starts = np.array([True, False, False, False])
+        head = ses_scan(values[:2], starts[:2], 0.4)
+
+        tail = ses_scan(values[2:], starts[2:], 0.4, carry=head[-1])
+
+        np.testing.assert_allclose(np.concatenate([head, tail]), calculate_ses(values.tolist(), 0.4))
+
+
+class TestStreamForecasts:
+    """Test per-product results from batched rows."""
+
+    @pytest.mark.parametrize("batch_size", [1, 7, 10000])
+    def test_matches_whole_series(self, batch_size):
+        """Test that any batching gives the regular kernel's MAPE and next-period forecast."""
+        lengths = [30, 1, 200, 5]
+        rows = make_rows(lengths)
+
+        results = list(stream_forecasts(batched(rows, batch_size), 0.3))
+
+        assert [name for name, _ in results] == [f"Product {p}" for p in range(len(lengths))]
+        for (name, result), n in zip(results, lengths):
+            actuals = [qty for product, _, qty in rows if product == name]
+            expected = calculate_ses_with_steps(actuals, [""] * n, 0.3, include_steps=False)
+            assert result["periods"] == n
+            assert result["mape"] == pytest.approx(expected["mape"])
+            assert result["next_period_forecast"] == pytest.approx(expected["forecasts"][-1])
+            assert result["metrics"]["n"] == n - 1
+
+    def test_dates_and_projection(self):
+        """Test the date range and the flat projection from the last date or a given start."""
+        rows = make_rows([3])
+
+        (_, result), = stream_forecasts([rows], 0.5)
+        (_, projected), = stream_forecasts([rows], 0.5, future_start="2024-02-01", future_periods=2)
+
+        assert (result["start_date"], result["end_date"]) == ("2024-01-01", "2024-01-03")
+        assert [f["date"] for f in result["future_forecasts"]] == ["2024-01-03", "2024-01-04", "2024-01-05"]
+        assert projected["future_forecasts"] == [
+            {"date": "2024-02-01", "forecast": result["next_period_forecast"]},
+            {"date": "2024-02-02", "forecast": result["next_period_forecast"]},
+        ]
+
+    def test_peak_memory_independent_of_row_count(self):
+        """Test that ten times the rows, as longer and as more products, leave the peak allocation flat."""
+        def peak(products, periods):
+            tracemalloc.start()
+            try:
+                count = sum(1 for _ in stream_forecasts(generated_batches(products, periods, 500), 0.3))
+                return count, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        peak(2, 500)  # warm up imports and caches outside the measurement
+        _, small = peak(4, 1000)
+        long_count, longer = peak(4, 10000)
+        wide_count, wider = peak(40, 1000)
+
+        assert (long_count, wide_count) == (4, 40)
+        assert longer < small * 1.5
+        assert wider < small * 1.5
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from datetime import date
+
+import models
+from services.seed_service import SeedService
+from services.synthetic_data import generate_sales, product_names, product_series
+
+
+def all_rows(*args, **kwargs):
+    return [row for chunk in generate_sales(*args, **kwargs) for row in chunk]
+
+
+class TestGenerateSales:
+    """Test the synthetic series generator."""
+
+    def test_deterministic_regardless_of_chunking(self):
+        """Test that the same seed gives the same rows for any chunk size."""
+        assert all_rows(5, 60, seed=1, chunk_rows=7) == all_rows(5, 60, seed=1, chunk_rows=1000)
+        assert all_rows(5, 60, seed=1) != all_rows(5, 60, seed=2)
+
+    def test_row_shape(self):
+        """Test row layout, date range and product order."""
+        rows = all_rows(3, 30, start=date(2025, 1, 1))
+
+        assert 0 < len(rows) <= 90
+        assert {r[1] for r in rows} == set(product_names(3))
+        assert min(r[0] for r in rows) >= "2025-01-01"
+        assert max(r[0] for r in rows) <= "2025-01-30"
+        assert all(isinstance(r[2], int) and r[2] >= 0 for r in rows)
+        # Product by product, each in date order
+        assert rows == sorted(rows, key=lambda r: (r[1], r[0]))
+
+    def test_intermittent_zeros(self):
+        """Test that intermittent products have many zero days."""
+        series = product_series(0, 365, intermittent_share=1.0, missing_prob=0, gap_prob=0)
+        assert (series == 0).mean() >= 0.25
+
+    def test_gaps(self):
+        """Test that gap_prob=1 always removes a multi-day span."""
+        series = product_series(0, 365, gap_prob=1.0, missing_prob=0)
+        missing = np.flatnonzero(np.isnan(series))
+        assert len(missing) >= 2
+        assert np.all(np.diff(missing) == 1)
+
+    def test_unknown_shape_option(self):
+        with pytest.raises(ValueError):
+            product_series(0, 10, seasonality=2)
+
+
+class TestSeedSynthetic:
+    """Test bulk loading of synthetic data."""
+
+    def test_inserts_products_and_sales(self, db_session):
+        progress = []
+        inserted = SeedService(db_session).seed_synthetic(
+            4, 20, chunk_rows=25, progress=lambda rows, elapsed: progress.append(rows)
+        )
+
+        assert db_session.query(models.Product).count() == 4
+        assert db_session.query(models.Sale).count() == inserted
+        assert progress[-1] == inserted
+        sale = db_session.query(models.Sale).order_by(models.Sale.id).first()
+        assert isinstance(sale.date, date)
+
+    def test_reuses_existing_products(self, db_session):
+        service = SeedService(db_session)
+        service.seed_synthetic(2, 5)
+        service.seed_synthetic(2, 5, seed=9)
+
+        assert db_session.query(models.Product).count() == 2
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from services.templating import create_template_env, precompile
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "base.html").write_text("<main>{% block body %}{% endblock %}</main>")
+    (tmp_path / "page.html").write_text('{% extends "base.html" %}{% block body %}Hi {{ name }}{% endblock %}')
+    return tmp_path
+
+
+class TestCachedEnvironment:
+    """Test the dict-backed compiled template cache."""
+
+    def test_reuses_compiled_template(self, template_dir, tmp_path):
+        """Test that a second lookup returns the same compiled template."""
+        env = create_template_env(str(template_dir), bytecode_dir=str(tmp_path))
+
+        assert env.get_template("page.html") is env.get_template("page.html")
+        assert env.get_template("page.html").render(name="Ana") == "<main>Hi Ana</main>"
+        assert set(env.compiled) == {"page.html", "base.html"}
+
+    def test_auto_reload_picks_up_changes(self, template_dir, tmp_path):
+        """Test that an edited template file is recompiled when auto_reload is on."""
+        env = create_template_env(str(template_dir), bytecode_dir=str(tmp_path))
+        env.get_template("base.html")
+
+        path = template_dir / "base.html"
+        path.write_text("<section>{% block body %}{% endblock %}</section>")
+        mtime = os.path.getmtime(path) + 10
+        os.utime(path, (mtime, mtime))
+
+        assert env.get_template("page.html").render(name="Ana") == "<section>Hi Ana</section>"
+
+    def test_bytecode_cache_and_precompile(self, template_dir, tmp_path):
+        """Test that precompiling writes bytecode a fresh environment can load."""
+        cache_dir = tmp_path / "bytecode"
+        cache_dir.mkdir()
+        env = create_template_env(str(template_dir), bytecode_dir=str(cache_dir))
+
+        assert precompile(env) == 2
+        assert len(list(cache_dir.iterdir())) == 2
+
+        fresh = create_template_env(str(template_dir), bytecode_dir=str(cache_dir))
+        assert fresh.get_template("page.html").render(name="Budi") == "<main>Hi Budi</main>"
+
+    def test_app_templates_compile(self):
+        """Test that every app template compiles."""
+        from main import templates
+
+        assert precompile(templates.env) >= 10
@@ -0,0 +1,104 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.timing import (
+    Histogram, PhaseHistograms, RequestTimer, TimingMiddleware, TimedJSONResponse,
+    span, timed, _current_timer
+)
+
+
+def make_app(**middleware_kwargs):
+    """Tiny app with two timed phases."""
+    app = FastAPI(default_response_class=TimedJSONResponse)
+
+    @timed("compute")
+    def compute():
+        return 42
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with span("load"):
+            value = compute()
+        return {"item_id": item_id, "value": value}
+
+    app.add_middleware(TimingMiddleware, **middleware_kwargs)
+    return app
+
+
+class TestSpan:
+    """Test span/timed recording."""
+
+    def test_span_without_timer_is_noop(self):
+        """Test that spans outside a timed request record nothing and don't fail."""
+        with span("anything"):
+            pass
+        assert _current_timer.get() is None
+
+    def test_spans_accumulate(self):
+        """Test that repeated spans with the same name are summed."""
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        try:
+            with span("a"):
+                pass
+            with span("a"):
+                pass
+            with span("b"):
+                pass
+        finally:
+            _current_timer.reset(token)
+
+        assert list(timer.spans) == ["a", "b"]
+        assert timer.spans["a"] >= 0
+
+
+class TestHistogram:
+    """Test histogram bucketing."""
+
+    def test_cumulative_buckets(self):
+        """Test count, sum and cumulative bucket counts."""
+        histogram = Histogram(buckets=(1, 10))
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 4
+        assert snapshot["sum"] == 56.5
+        assert snapshot["buckets"] == [(1, 2), (10, 3), ("+Inf", 4)]
+
+
+class TestTimingMiddleware:
+    """Test the ASGI middleware end to end."""
+
+    def test_server_timing_header_and_histograms(self):
+        """Test that phases show up in Server-Timing and in per-route histograms."""
+        histograms = PhaseHistograms()
+        client = TestClient(make_app(server_timing_header=True, histograms=histograms))
+
+        response = client.get("/items/1")
+
+        assert response.status_code == 200
+        header = response.headers["server-timing"]
+        assert "load;dur=" in header
+        assert "compute;dur=" in header
+        assert "encode;dur=" in header
+        assert "total;dur=" in header
+        routes = histograms.snapshot()
+        assert set(routes["GET /items/{item_id}"]) == {"load", "compute", "encode", "total"}
+
+    def test_no_header_by_default(self):
+        """Test that the header is opt-in."""
+        client = TestClient(make_app(histograms=PhaseHistograms()))
+        assert "server-timing" not in client.get("/items/1").headers
+
+    def test_slow_request_logged(self, caplog):
+        """Test that requests above the threshold are logged with their breakdown."""
+        client = TestClient(make_app(slow_request_ms=0, histograms=PhaseHistograms()))
+
+        with caplog.at_level(logging.WARNING, logger="services.timing"):
+            client.get("/items/1")
+
+        assert "Slow request GET /items/{item_id}" in caplog.text
+        assert "load;dur=" in caplog.text
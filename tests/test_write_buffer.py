@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+
+from services.write_buffer import GroupCommitBuffer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class RecordingFlush:
+    """Flush callable that records each batch and can reject chosen rows."""
+
+    def __init__(self, reject=None):
+        self.batches = []
+        self.reject = reject
+
+    def __call__(self, rows):
+        if self.reject is not None and any(self.reject(row) for row in rows):
+            raise ValueError("rejected")
+        self.batches.append(list(rows))
+
+
+class TestGroupCommitBuffer:
+    """Test batching, acknowledgement and error isolation."""
+
+    def test_concurrent_submits_are_batched(self):
+        """Test that concurrent rows share commits bounded by max_batch."""
+        flush = RecordingFlush()
+        buffer = GroupCommitBuffer(flush, max_batch=10, max_delay_ms=50)
+
+        async def scenario():
+            await asyncio.gather(*(buffer.submit({"n": i}) for i in range(25)))
+            await buffer.close()
+
+        run(scenario())
+
+        assert sorted(row["n"] for batch in flush.batches for row in batch) == list(range(25))
+        assert len(flush.batches) == 3
+        assert max(len(batch) for batch in flush.batches) == 10
+        assert buffer.rows == 25
+
+    def test_single_submit_flushes_after_delay(self):
+        """Test that a lone row is committed once max_delay elapses."""
+        flush = RecordingFlush()
+        buffer = GroupCommitBuffer(flush, max_batch=100, max_delay_ms=5)
+
+        async def scenario():
+            await asyncio.wait_for(buffer.submit({"n": 1}), timeout=2)
+            await buffer.close()
+
+        run(scenario())
+        assert flush.batches == [[{"n": 1}]]
+
+    def test_ack_after_commit(self):
+        """Test that submit does not return before its row is flushed."""
+        flush = RecordingFlush()
+        buffer = GroupCommitBuffer(flush, max_batch=100, max_delay_ms=20)
+
+        async def scenario():
+            await buffer.submit({"n": 1})
+            committed = [row for batch in flush.batches for row in batch]
+            await buffer.close()
+            return committed
+
+        assert run(scenario()) == [{"n": 1}]
+
+    def test_bad_row_only_fails_its_caller(self):
+        """Test that a failing batch is retried row by row."""
+        flush = RecordingFlush(reject=lambda row: row["n"] == 3)
+        buffer = GroupCommitBuffer(flush, max_batch=10, max_delay_ms=20)
+
+        async def scenario():
+            results = await asyncio.gather(
+                *(buffer.submit({"n": i}) for i in range(5)), return_exceptions=True
+            )
+            await buffer.close()
+            return results
+
+        results = run(scenario())
+
+        assert isinstance(results[3], ValueError)
+        assert all(r is None for i, r in enumerate(results) if i != 3)
+        assert sorted(row["n"] for batch in flush.batches for row in batch) == [0, 1, 2, 4]
+        assert buffer.last_error == "rejected"
+
+    def test_status(self):
+        """Test the readiness report before and after use."""
+        buffer = GroupCommitBuffer(RecordingFlush(), max_batch=5, max_delay_ms=1)
+        assert buffer.status()["ok"]
+
+        async def scenario():
+            await buffer.submit({"n": 1})
+            await buffer.close()
+
+        run(scenario())
+        assert buffer.status() == {"ok": True, "pending": 0, "batches": 1, "rows": 1, "last_error": None}